@@ -27,7 +27,14 @@ class ChessVar:
         self._white_falcon_stored = True
         self._black_hunter_stored = True
         self._white_hunter_stored = True
+        self._white_major_lost = 0  # queens, rooks, bishops, knights (and kings) lost, for fairy eligibility
+        self._black_major_lost = 0
+        self._white_home_empty = 0  # bitsets of empty spots on each player's home ranks
+        self._black_home_empty = 0
         self._game_state = 'UNFINISHED'
+        self._move_cache = None  # optional shared MoveCache for fast accept/reject
+        self._mirror = None  # FastBoard copy of this game, kept only while a move cache is attached
+        self._observers = None  # list of [callback, batch_size, pending events] once an observer is added
         self.initialize_board()
 
     def initialize_board(self):
@@ -108,12 +115,51 @@ class ChessVar:
 
         return self._game_state
 
+    def get_turn(self):
+        """Return whose turn it is.
+            Parameters: None
+            Returns: 'WHITE' or 'BLACK'"""
+        return self._turn
+
+    def get_square(self, square):
+        """Return the chess piece at a spot on the board, or None if the spot is empty.
+            Parameters: square
+            Returns: ChessPiece object or None"""
+        return self._board[square]
+
+    def get_lost_pieces(self, color):
+        """Return a copy of the list of pieces a player has lost.
+            Parameters: color ('w' or 'b')
+            Returns: list of ChessPiece objects"""
+        if color == 'w':
+            return list(self._white_lost_pieces)
+        return list(self._black_lost_pieces)
+
+    def get_fairy_stored(self, piece_type):
+        """Return whether a fairy piece is still stored (off the board and not yet entered).
+            Parameters: piece_type ('F', 'H', 'f', or 'h')
+            Returns: True or False"""
+        stored = {'F': self._white_falcon_stored, 'H': self._white_hunter_stored,
+                  'f': self._black_falcon_stored, 'h': self._black_hunter_stored}
+        return stored[piece_type]
+
     def make_move(self, moved_from, move_to):
         """Move chess piece from moved_from to move_to and update game state (if a king is taken during the move)
             and player turn (at the end of the move) accordingly. If the move isn't possible, for any reason,
             it will return False. Otherwise, it'll return True.
             Parameters: moved_from and move_to
             Returns: True or False"""
+        if self._observers is not None:
+            return self._observed_call('make_move', moved_from, move_to)
+
+        # with a move cache attached, the cached legal moves decide the move instead of walking the board
+        if self._move_cache is not None:
+            if moved_from not in self._board or move_to not in self._board:
+                return False
+            if not self._move_cache.is_legal(self._mirror, self._mirror.to_move(moved_from, move_to)):
+                return False
+            return self._commit_move(moved_from, move_to)
+
         # check for basics: if game has ended, if anything isn't on the board, if there's no piece being moved, etc.
         if self._game_state != 'UNFINISHED':
             return False
@@ -134,6 +180,20 @@ class ChessVar:
 
         # if the piece being moved matches the person's turn
         if (piece_color == 'w' and self._turn == 'WHITE') or (piece_color == 'b' and self._turn == 'BLACK'):
+
+            # reject moves the piece couldn't make even on an empty board with one table lookup, then moves onto
+            # the player's own piece or through another piece by checking only the spots in between
+            square_index, reach_masks, between_squares, piece_codes = _move_tables()
+            from_sq = square_index[moved_from]
+            to_sq = square_index[move_to]
+            if not reach_masks[piece_codes[piece_color + piece_type]][from_sq] >> to_sq & 1:
+                return False
+            if other_piece is not None and other_piece.get_color() == piece_color:
+                return False
+            for spot in between_squares[from_sq * 64 + to_sq]:
+                if self._board[spot] is not None:
+                    return False
+
             possible_moves = []
             start_let = ord(moved_from[0])  # converts to ASCII value for incrementing
             start_num = int(moved_from[1])  # converts to int for arithmetic
@@ -189,32 +249,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    piece.change_pawn_move()
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -271,31 +306,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -371,31 +382,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -471,31 +458,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -521,31 +484,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -671,31 +610,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -802,31 +717,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -933,31 +824,7 @@ class ChessVar:
 
                 # if the desired move is possible
                 if move_to in possible_moves:
-
-                    # check if the game ended and switch turns if black
-                    if piece_color == 'b':
-                        if other_piece is not None:
-                            self._white_lost_pieces.append(other_piece)
-                            for index in self._white_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'BLACK_WON'
-                                    return True
-                        self._turn = 'WHITE'
-
-                    # check if the game ended and switch turns if white
-                    if piece_color == 'w':
-                        if other_piece is not None:
-                            self._black_lost_pieces.append(other_piece)
-                            for index in self._black_lost_pieces:
-                                if index.get_piece_type() == 'K':
-                                    self._game_state = 'WHITE_WON'
-                                    return True
-                        self._turn = 'BLACK'
-
-                    # move piece
-                    self._board[move_to] = self._board[moved_from]
-                    self._board[moved_from] = None
-                    return True
+                    return self._commit_move(moved_from, move_to)
 
                 # if not possible
                 return False
@@ -966,11 +833,175 @@ class ChessVar:
             else:
                 return False
 
+    def _commit_move(self, moved_from, move_to):
+        """Make a move that is already known to be legal: remove any captured piece, update the game state if a
+            king was taken, and otherwise move the piece and switch turns.
+            Parameters: moved_from and move_to
+            Returns: True"""
+        piece = self._board[moved_from]
+        piece_color = piece.get_color()
+        other_piece = self._board[move_to]
+        if self._mirror is not None:
+            self._mirror.make_move(self._mirror.to_move(moved_from, move_to))
+
+        # count lost pieces that make a player eligible for fairy pieces
+        if other_piece is not None and other_piece.get_piece_type() not in ('p', 'f', 'h'):
+            if other_piece.get_color() == 'w':
+                self._white_major_lost += 1
+            else:
+                self._black_major_lost += 1
+
+        # check if the game ended and switch turns if black
+        if piece_color == 'b':
+            if other_piece is not None:
+                self._white_lost_pieces.append(other_piece)
+                for index in self._white_lost_pieces:
+                    if index.get_piece_type() == 'K':
+                        self._game_state = 'BLACK_WON'
+                        return True
+            self._turn = 'WHITE'
+
+        # check if the game ended and switch turns if white
+        if piece_color == 'w':
+            if other_piece is not None:
+                self._black_lost_pieces.append(other_piece)
+                for index in self._black_lost_pieces:
+                    if index.get_piece_type() == 'K':
+                        self._game_state = 'WHITE_WON'
+                        return True
+            self._turn = 'BLACK'
+
+        # move piece
+        self._board[move_to] = self._board[moved_from]
+        self._board[moved_from] = None
+        self._set_home_empty(moved_from, True)
+        self._set_home_empty(move_to, False)
+        if piece.get_piece_type() == 'p':
+            piece.change_pawn_move()
+        return True
+
+    def snapshot(self):
+        """Return an immutable, hashable Position snapshot of the game that can be shared between threads.
+            Parameters: None
+            Returns: Position"""
+        from movegen import SQUARE_INDEX
+        from position import Position, PIECE_CODES
+
+        codes = bytearray(64)
+        pawn_flags = 0
+        for name, piece in self._board.items():
+            if piece is not None:
+                index = SQUARE_INDEX[name]
+                piece_type = piece.get_piece_type()
+                codes[index] = PIECE_CODES[piece.get_color() + piece_type]
+                if piece_type == 'p' and piece.get_pawn_move():
+                    pawn_flags |= 1 << index
+        reserve = (self._white_falcon_stored | self._white_hunter_stored << 1
+                   | self._black_falcon_stored << 2 | self._black_hunter_stored << 3)
+        return Position(codes, 0 if self._turn == 'WHITE' else 1,
+                        ('UNFINISHED', 'WHITE_WON', 'BLACK_WON').index(self._game_state), reserve,
+                        [PIECE_CODES[str(piece)] for piece in self._white_lost_pieces],
+                        [PIECE_CODES[str(piece)] for piece in self._black_lost_pieces], pawn_flags)
+
+    @classmethod
+    def from_snapshot(cls, position):
+        """Create a game from a Position snapshot. Pieces other than unmoved pawns never change, so they are
+            shared between games instead of being created again.
+            Parameters: position (Position)
+            Returns: ChessVar"""
+        from movegen import SQUARE_NAMES
+        from position import CODE_NAMES
+
+        game = cls.__new__(cls)
+        board = position.get_board()
+        pawn_flags = position.get_pawn_flags()
+        game._board = {}
+        for rank_start in range(56, -1, -8):
+            for index in range(rank_start, rank_start + 8):
+                code = board[index]
+                if not code:
+                    piece = None
+                elif pawn_flags >> index & 1:
+                    piece = PawnPiece(CODE_NAMES[code][0])
+                else:
+                    piece = _shared_piece(CODE_NAMES[code])
+                game._board[SQUARE_NAMES[index]] = piece
+        game._turn = 'BLACK' if position.get_turn() else 'WHITE'
+        game._game_state = position.get_game_state()
+        game._white_lost_pieces = [_shared_piece(CODE_NAMES[code]) for code in position.get_lost(0)]
+        game._black_lost_pieces = [_shared_piece(CODE_NAMES[code]) for code in position.get_lost(1)]
+        reserve = position.get_reserve()
+        game._white_falcon_stored = bool(reserve & 1)
+        game._white_hunter_stored = bool(reserve & 2)
+        game._black_falcon_stored = bool(reserve & 4)
+        game._black_hunter_stored = bool(reserve & 8)
+        game._white_fairy_count = 2 - game._white_falcon_stored - game._white_hunter_stored
+        game._black_fairy_count = 2 - game._black_falcon_stored - game._black_hunter_stored
+        game._white_major_lost = sum(1 for piece in game._white_lost_pieces
+                                     if piece.get_piece_type() not in ('p', 'f', 'h'))
+        game._black_major_lost = sum(1 for piece in game._black_lost_pieces
+                                     if piece.get_piece_type() not in ('p', 'f', 'h'))
+        game._white_home_empty = 0
+        game._black_home_empty = 0
+        for index in range(16):
+            if not board[index]:
+                game._white_home_empty |= 1 << index
+            if not board[48 + index]:
+                game._black_home_empty |= 1 << index
+        game._move_cache = None
+        game._mirror = None
+        game._observers = None
+        return game
+
+    def clone(self):
+        """Return an independent copy of the game. Only the board dictionary, the lost piece lists, and unmoved
+            pawns (whose pawn_move flag can still change) are copied; every other piece is shared, since pieces
+            never change. A move cache stays shared with the copy, but observers are not copied.
+            Parameters: None
+            Returns: ChessVar"""
+        game = ChessVar.__new__(ChessVar)
+        game.__dict__.update(self.__dict__)
+        game._board = {name: PawnPiece(piece.get_color()) if piece is not None and piece.get_piece_type() == 'p'
+                       and piece.get_pawn_move() else piece for name, piece in self._board.items()}
+        game._white_lost_pieces = self._white_lost_pieces[:]
+        game._black_lost_pieces = self._black_lost_pieces[:]
+        if self._mirror is not None:
+            game._mirror = self._mirror.copy()
+        game._observers = None
+        return game
+
+    def set_move_cache(self, cache):
+        """Attach a MoveCache (which can be shared by many games) so make_move and enter_fairy_piece accept or
+            reject moves from the cached legal moves of the position. Passing None detaches it.
+            Parameters: cache (MoveCache or None)
+            Returns: None"""
+        from movegen import FastBoard
+
+        self._move_cache = cache
+        self._mirror = FastBoard.from_game(self) if cache is not None else None
+
+    def _fairy_entered(self, piece_type, move_to):
+        """Keep the move cache's copy of the game up to date after a fairy piece enters.
+            Parameters: piece_type and move_to
+            Returns: True"""
+        if self._mirror is not None:
+            self._mirror.make_move(self._mirror.to_drop(piece_type, move_to))
+        return True
+
     def enter_fairy_piece(self, piece_type, move_to):
         """Enter a falcon/hunter piece at move_to if it is legal to do so, then update the player turn accordingly
             and return True. If that isn't possible, for any reason, it will return False.
             Parameters: piece_type and move_to
             Returns: True or False"""
+        if self._observers is not None:
+            return self._observed_call('enter_fairy_piece', piece_type, move_to)
+
+        # with a move cache attached, reject entries that are not in the cached legal moves
+        if self._move_cache is not None:
+            if move_to not in self._board or piece_type not in ('F', 'H', 'f', 'h'):
+                return False
+            if not self._move_cache.is_legal(self._mirror, self._mirror.to_drop(piece_type, move_to)):
+                return False
 
         # check for basics: if game has ended, if anything isn't on the board, if the spot isn't empty, etc.
         if self._game_state != 'UNFINISHED':
@@ -980,133 +1011,202 @@ class ChessVar:
         if self._board[move_to] is not None:
             return False
 
-        # white fairy piece
+        # white fairy pieces are uppercase and black ones are lowercase, and only the player whose turn it is may
+        # enter one
         if (piece_type == 'F' or piece_type == 'H') and self._turn == 'WHITE':
+            color = 'w'
+        elif (piece_type == 'f' or piece_type == 'h') and self._turn == 'BLACK':
+            color = 'b'
+        else:
+            return False
 
-            # if the max fairies have already been placed
-            if self._white_fairy_count == 2:
-                return False
-
-            # counts how many special pieces have already been lost
-            temp_count = 0
-            for piece in self._white_lost_pieces:
-                if piece.get_piece_type() != 'p' and piece.get_piece_type() != 'h' and piece.get_piece_type() != 'f':
-                    temp_count += 1
-
-            # if it's the first fairy, placed in home ranks, and at least one special piece has been lost
-            if (self._white_fairy_count == 0) and (int(move_to[1]) <= 2) and (temp_count >= 1):
-
-                # if a falcon piece is available and has been picked
-                if piece_type == 'F' and self._white_falcon_stored is True:
-                    wf1 = ChessPiece('w', 'f')
-                    self._board[move_to] = wf1
-                    self._white_falcon_stored = False
-
-                # if a hunter piece is available and has been picked
-                elif piece_type == 'H' and self._white_hunter_stored is True:
-                    wh1 = ChessPiece('w', 'h')
-                    self._board[move_to] = wh1
-                    self._white_hunter_stored = False
-
-                else:
-                    return False
-
-                # change turn and add to fairy count
-                self._turn = 'BLACK'
-                self._white_fairy_count += 1
-                return True
-
-            # if it's the second fairy, placed in home ranks, and at least two special pieces have been lost
-            elif (self._white_fairy_count == 1) and (int(move_to[1]) <= 2) and (temp_count >= 2):
-
-                # if a falcon piece is available and has been picked
-                if piece_type == 'F' and self._white_falcon_stored is True:
-                    wf1 = ChessPiece('w', 'f')
-                    self._board[move_to] = wf1
-                    self._white_falcon_stored = False
-
-                # if a hunter piece is available and has been picked
-                elif piece_type == 'H' and self._white_hunter_stored is True:
-                    wh1 = ChessPiece('w', 'h')
-                    self._board[move_to] = wh1
-                    self._white_hunter_stored = False
-
-                else:
-                    return False
+        # it has to be one of the player's empty home rank spots, and the player has to be eligible
+        home_bit = self._home_bit(move_to)
+        if home_bit is None or home_bit[0] != color:
+            return False
+        if not self.get_fairy_stored(piece_type) or not self._fairy_eligible(color):
+            return False
 
-                # notify the user of reaching limit, change turn, and add to fairy count
+        # place the piece, change turn, and add to fairy count
+        self._board[move_to] = ChessPiece(color, piece_type.lower())
+        self._set_fairy_stored(piece_type, False)
+        self._set_home_empty(move_to, False)
+        if color == 'w':
+            self._white_fairy_count += 1
+            if self._white_fairy_count == 2:
                 print("White cannot place anymore fairy pieces.")
-                self._turn = 'BLACK'
-                self._white_fairy_count += 1
-                return True
-
-            else:
-                return False
-
-        # black fairy piece
-        elif (piece_type == 'f' or piece_type == 'h') and self._turn == 'BLACK':
-
-            # if the max fairies have already been placed
+            self._turn = 'BLACK'
+        else:
+            self._black_fairy_count += 1
             if self._black_fairy_count == 2:
-                return False
-
-            # counts how many special pieces have already been lost
-            temp_count = 0
-            for piece in self._black_lost_pieces:
-                if piece.get_piece_type() != 'p' and piece.get_piece_type() != 'h' and piece.get_piece_type() != 'f':
-                    temp_count += 1
-
-            # if it's the first fairy, placed in home ranks, and at least one special piece has been lost
-            if (self._black_fairy_count == 0) and (int(move_to[1]) >= 7) and (temp_count >= 1):
-
-                # if a falcon piece is available and has been picked
-                if piece_type == 'f' and self._black_falcon_stored is True:
-                    bf1 = ChessPiece('b', 'f')
-                    self._board[move_to] = bf1
-                    self._black_falcon_stored = False
-
-                # if a hunter piece is available and has been picked
-                elif piece_type == 'h' and self._black_hunter_stored is True:
-                    bh1 = ChessPiece('b', 'h')
-                    self._board[move_to] = bh1
-                    self._black_hunter_stored = False
-
-                else:
-                    return False
-
-                # change turn and add to fairy count
-                self._turn = 'WHITE'
-                self._black_fairy_count += 1
-                return True
-
-            # if it's the second fairy, placed in home ranks, and at least two special pieces have been lost
-            elif (self._black_fairy_count == 1) and (int(move_to[1]) >= 7) and (temp_count >= 2):
-
-                # if a falcon piece is available and has been picked
-                if piece_type == 'f' and self._black_falcon_stored is True:
-                    bf1 = ChessPiece('b', 'f')
-                    self._board[move_to] = bf1
-                    self._black_falcon_stored = False
-
-                # if a hunter piece is available and has been picked
-                elif piece_type == 'h' and self._black_hunter_stored is True:
-                    bh1 = ChessPiece('b', 'h')
-                    self._board[move_to] = bh1
-                    self._black_hunter_stored = False
+                print("Black cannot place anymore fairy pieces.")
+            self._turn = 'WHITE'
+        return self._fairy_entered(piece_type, move_to)
+
+    def _fairy_eligible(self, color):
+        """Return whether a player may enter a fairy piece. The first one needs one lost queen, rook, bishop, or
+            knight, and the second one needs two. The counters are kept up to date by _commit_move, so this
+            doesn't scan the lost piece lists.
+            Parameters: color ('w' or 'b')
+            Returns: True or False"""
+        if color == 'w':
+            return self._white_fairy_count < 2 and self._white_major_lost > self._white_fairy_count
+        return self._black_fairy_count < 2 and self._black_major_lost > self._black_fairy_count
 
-                else:
-                    return False
+    def _set_fairy_stored(self, piece_type, stored):
+        """Set whether a fairy piece is still stored.
+            Parameters: piece_type ('F', 'H', 'f', or 'h') and stored
+            Returns: None"""
+        if piece_type == 'F':
+            self._white_falcon_stored = stored
+        elif piece_type == 'H':
+            self._white_hunter_stored = stored
+        elif piece_type == 'f':
+            self._black_falcon_stored = stored
+        else:
+            self._black_hunter_stored = stored
+
+    def _home_bit(self, square):
+        """Return which player's home ranks a spot is in and its bit in that player's empty-spot bitset
+            (a1 is bit 0 and h2 is bit 15 for white, a7 is bit 0 and h8 is bit 15 for black).
+            Parameters: square
+            Returns: (color, bit), or None if the spot isn't in either player's home ranks"""
+        rank = int(square[1])
+        file = ord(square[0]) - ord('a')
+        if rank <= 2:
+            return 'w', 1 << ((rank - 1) * 8 + file)
+        if rank >= 7:
+            return 'b', 1 << ((rank - 7) * 8 + file)
+        return None
+
+    def _set_home_empty(self, square, empty):
+        """Update the empty-spot bitsets after a spot was emptied or filled.
+            Parameters: square and empty
+            Returns: None"""
+        home_bit = self._home_bit(square)
+        if home_bit is None:
+            return
+        color, bit = home_bit
+        if color == 'w':
+            self._white_home_empty = (self._white_home_empty | bit) if empty else (self._white_home_empty & ~bit)
+        else:
+            self._black_home_empty = (self._black_home_empty | bit) if empty else (self._black_home_empty & ~bit)
 
-                # notify the user of reaching limit, change turn, and add to fairy count
-                print("Black cannot place anymore fairy pieces.")
-                self._turn = 'WHITE'
-                self._black_fairy_count += 1
-                return True
+    def get_legal_drops(self):
+        """Return every fairy piece entry the player whose turn it is can make right now, in one pass over the
+            empty spots of their home ranks.
+            Parameters: None
+            Returns: list of (piece_type, square) tuples"""
+        if self._game_state != 'UNFINISHED':
+            return []
+        if self._turn == 'WHITE':
+            color, letters, empty, first_rank = 'w', ('F', 'H'), self._white_home_empty, 1
+        else:
+            color, letters, empty, first_rank = 'b', ('f', 'h'), self._black_home_empty, 7
+        if not self._fairy_eligible(color):
+            return []
+        letters = [letter for letter in letters if self.get_fairy_stored(letter)]
+        drops = []
+        while empty:
+            bit = empty & -empty
+            index = bit.bit_length() - 1
+            square = chr(ord('a') + index % 8) + str(first_rank + index // 8)
+            for letter in letters:
+                drops.append((letter, square))
+            empty ^= bit
+        return drops
+
+    def add_observer(self, callback, batch_size=1):
+        """Register a callback for game events. Events are tuples:
+                ('move', moved_from, move_to) for an accepted move,
+                ('fairy', piece_type, square) for a fairy piece entering,
+                ('reject', method name, first argument, second argument, reason) for a rejected call, and
+                ('game_end', game state) when a king is captured.
+            The callback is called with a list of events once batch_size events are waiting, or when the game ends
+            or flush_observers is called. With no observers, make_move and enter_fairy_piece only check one
+            attribute.
+            Parameters: callback and batch_size
+            Returns: None"""
+        if self._observers is None:
+            self._observers = []
+        self._observers.append([callback, batch_size, []])
 
-            else:
-                return False
+    def remove_observer(self, callback):
+        """Deliver any waiting events to a callback and unregister it.
+            Parameters: callback
+            Returns: None"""
+        if self._observers is None:
+            return
+        for entry in self._observers:
+            if entry[0] is callback:
+                if entry[2]:
+                    callback(entry[2])
+                self._observers.remove(entry)
+                break
+        if not self._observers:
+            self._observers = None
+
+    def flush_observers(self):
+        """Deliver every waiting event to its callback.
+            Parameters: None
+            Returns: None"""
+        for entry in self._observers or ():
+            if entry[2]:
+                events, entry[2] = entry[2], []
+                entry[0](events)
+
+    def _observed_call(self, method, first, second):
+        """Run make_move or enter_fairy_piece with observers registered, then send out the events. The observers
+            are set aside during the call so the method runs its normal path.
+            Parameters: method ('make_move' or 'enter_fairy_piece'), first, and second
+            Returns: True or False"""
+        observers = self._observers
+        self._observers = None
+        try:
+            result = getattr(self, method)(first, second)
+        finally:
+            self._observers = observers
+        if result:
+            events = [('move' if method == 'make_move' else 'fairy', first, second)]
+            if self._game_state != 'UNFINISHED':
+                events.append(('game_end', self._game_state))
         else:
-            return False
+            events = [('reject', method, first, second, self._rejection_reason(method, first, second))]
+        for entry in observers:
+            entry[2].extend(events)
+            if len(entry[2]) >= entry[1] or self._game_state != 'UNFINISHED':
+                pending, entry[2] = entry[2], []
+                entry[0](pending)
+        return bool(result)
+
+    def _rejection_reason(self, method, first, second):
+        """Explain why a call was rejected. Only used for observers, after the call has already failed.
+            Parameters: method ('make_move' or 'enter_fairy_piece'), first, and second
+            Returns: str"""
+        if self._game_state != 'UNFINISHED':
+            return 'game over'
+        if method == 'make_move':
+            if first not in self._board or second not in self._board:
+                return 'off board'
+            if self._board[first] is None:
+                return 'no piece'
+            if (self._board[first].get_color() == 'w') != (self._turn == 'WHITE'):
+                return 'wrong turn'
+            return 'illegal move'
+        if first not in ('F', 'H', 'f', 'h'):
+            return 'not a fairy piece'
+        if second not in self._board:
+            return 'off board'
+        if (first in ('F', 'H')) != (self._turn == 'WHITE'):
+            return 'wrong turn'
+        if self._board[second] is not None:
+            return 'occupied'
+        home_bit = self._home_bit(second)
+        if home_bit is None or home_bit[0] != ('w' if first in ('F', 'H') else 'b'):
+            return 'not a home rank'
+        if not self.get_fairy_stored(first):
+            return 'already entered'
+        return 'not eligible'
 
     def display_board(self):
         """Print the current board with the pieces in play. It will do so by printing the string representation of each
@@ -1160,6 +1260,69 @@ class ChessVar:
         print(self._turn)
 
 
+def _shared_piece(name):
+    """Return a shared ChessPiece for a color and piece type, such as 'wq'. Since a ChessPiece never changes, one
+        object can stand for that piece in any number of games. Pawns are shared only once they have moved.
+        Parameters: name (color letter followed by piece type)
+        Returns: ChessPiece"""
+    piece = _SHARED_PIECES.get(name)
+    if piece is None:
+        if name[1] == 'p':
+            piece = PawnPiece(name[0])
+            piece.change_pawn_move()
+        else:
+            piece = ChessPiece(name[0], name[1])
+        _SHARED_PIECES[name] = piece
+    return piece
+
+
+_SHARED_PIECES = {}
+
+
+class _SpotsBetween(dict):
+    """A _SpotsBetween object maps from_sq * 64 + to_sq to the names of the spots strictly between two squares.
+        It is responsible for working out each entry from movegen's bitmasks the first time a move needs it, so
+        the first move does not pay for all 4096 of them."""
+
+    def __init__(self, between_masks, square_names):
+        """Initialize an empty map over the between masks.
+            Parameters: between_masks and square_names (from movegen)
+            Returns: None"""
+        super().__init__()
+        self._between_masks = between_masks
+        self._square_names = square_names
+
+    def __missing__(self, key):
+        """Work out and remember the spots for a pair of squares.
+            Parameters: key (from_sq * 64 + to_sq)
+            Returns: tuple of spot names"""
+        mask = self._between_masks[key]
+        spots = []
+        while mask:
+            low = mask & -mask
+            spots.append(self._square_names[low.bit_length() - 1])
+            mask ^= low
+        spots = self[key] = tuple(spots)
+        return spots
+
+
+def _move_tables():
+    """Return the tables make_move uses to reject impossible moves, importing them from movegen on first use so
+        importing ChessVar stays cheap.
+        Parameters: None
+        Returns: tuple of (square index by name, reachability masks by piece code, spots between two squares by
+            from_sq * 64 + to_sq, piece codes by color and type)"""
+    global _MOVE_TABLES
+    if _MOVE_TABLES is None:
+        from movegen import SQUARE_INDEX, REACH_MASKS, BETWEEN_MASKS, SQUARE_NAMES
+        from position import PIECE_CODES
+        _MOVE_TABLES = (SQUARE_INDEX, REACH_MASKS, _SpotsBetween(BETWEEN_MASKS, SQUARE_NAMES), PIECE_CODES)
+    return _MOVE_TABLES
+
+
+_MOVE_TABLES = None
+
+
 class ChessPiece:
     """A ChessPiece object represents a chess piece. It is responsible for keeping track of the color
         and type of chess piece. It will need to communicate with the ChessVar class in order to check if moves are
@@ -0,0 +1,300 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A streaming multi-PV analysis API for asyncio applications. An AnalysisEngine keeps one worker
+#              process with a warm transposition table and pawn hash table. analyze() sends it a position and returns
+#              an async iterator that yields the best few lines with their scores each time a depth completes.
+#              Starting a new analysis (for example after the user moves) or cancelling one stops the running
+#              search within a few milliseconds without restarting the worker: every job has a number, and the
+#              worker's search stops as soon as a newer number is posted.
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+
+from evaluation import EvalBoard, PawnHashTable, incremental_eval
+from movegen import FastBoard, move_name
+from search import Searcher, TranspositionTable
+
+DEFAULT_LINES = 3
+DEFAULT_MAX_DEPTH = 64
+DEFAULT_TABLE_ENTRIES = 1 << 18
+PV_LENGTH = 8
+LIVENESS_SECONDS = 0.5  # how often the reader thread checks that the worker is alive while no results come
+
+
+class _JobWatch:
+    """A _JobWatch object stands in for a stop event in the worker. It is responsible for reporting a job as
+        stopped once a newer job number has been posted."""
+
+    def __init__(self, latest, job):
+        """Initialize a watch for one job.
+            Parameters: latest (shared multiprocessing.Value of the newest job number) and job
+            Returns: None"""
+        self._latest = latest
+        self._job = job
+
+    def is_set(self):
+        """Return whether the job has been cancelled or replaced.
+            Parameters: None
+            Returns: True or False"""
+        return self._latest.value != self._job
+
+
+def _analysis_worker(requests, results, latest, table_entries):
+    """Run analysis jobs until told to exit. The tables are kept between jobs, so a new position that follows the
+        last one (the usual case after a move) starts warm.
+        Parameters: requests (queue of (job, board bytes, max_depth, lines, time_limit) or None), results (queue),
+            latest (shared newest job number), and table_entries
+        Returns: None"""
+    table = TranspositionTable(table_entries)
+    pawn_table = PawnHashTable()
+    while True:
+        request = requests.get()
+        if request is None:
+            results.put((None, 'exit', None))
+            return
+        job, data, max_depth, lines, time_limit = request
+        if latest.value != job:
+            results.put((job, 'done', {'stopped': True, 'nodes': 0}))
+            continue
+        searcher = Searcher(table, incremental_eval, _JobWatch(latest, job))
+        start = time.perf_counter()
+
+        def report(depth, found, nodes):
+            """Send the lines of a completed depth."""
+            results.put((job, 'depth', {
+                'depth': depth, 'nodes': nodes, 'seconds': time.perf_counter() - start,
+                'lines': [{'score': score, 'moves': [move_name(step) for step in
+                                                      searcher.principal_variation(board, move, PV_LENGTH)]}
+                          for score, move in found]}))
+
+        try:
+            board = EvalBoard.from_board(FastBoard.from_bytes(data), pawn_table)
+            searcher.search_lines(board, max_depth, lines, time_limit, report)
+        except Exception as error:
+            results.put((job, 'done', {'stopped': True, 'nodes': searcher.get_nodes(), 'error': repr(error)}))
+        else:
+            results.put((job, 'done', {'stopped': latest.value != job, 'nodes': searcher.get_nodes()}))
+
+
+class AnalysisStream:
+    """An AnalysisStream object is the async iterator of one analysis job. It is responsible for handing out the
+        engine's results for its job as they arrive, and for timing the first result and the cancellation."""
+
+    def __init__(self, engine, job):
+        """Initialize a stream for a job that has just been posted.
+            Parameters: engine (AnalysisEngine) and job
+            Returns: None"""
+        self._engine = engine
+        self._job = job
+        self._queue = asyncio.Queue()
+        self._started = time.perf_counter()
+        self._first_result = None
+        self._cancelled = None
+        self._stop_latency = None
+        self._finished = False
+        self._error = None
+
+    def get_job(self):
+        """Return the job number.
+            Parameters: None
+            Returns: int"""
+        return self._job
+
+    def get_time_to_first_result(self):
+        """Return the seconds from posting the job to its first completed depth.
+            Parameters: None
+            Returns: float, or None if no depth has completed"""
+        return self._first_result
+
+    def get_stop_latency(self):
+        """Return the seconds from cancelling the job to the worker stopping its search.
+            Parameters: None
+            Returns: float, or None if the job was not cancelled or has not stopped yet"""
+        return self._stop_latency
+
+    def get_error(self):
+        """Return why the job failed, if the worker raised or died while running it.
+            Parameters: None
+            Returns: str, or None if it did not fail"""
+        return self._error
+
+    def _deliver(self, kind, payload):
+        """Take one message from the worker. Called on the event loop.
+            Parameters: kind ('depth' or 'done') and payload
+            Returns: None"""
+        now = time.perf_counter()
+        if kind == 'depth':
+            if self._first_result is None:
+                self._first_result = now - self._started
+            payload['elapsed'] = now - self._started
+        else:
+            if self._cancelled is not None:
+                self._stop_latency = now - self._cancelled
+            self._error = payload.get('error')
+        if not self._finished:
+            self._queue.put_nowait((kind, payload))
+
+    def cancel(self):
+        """Stop the job. The stream ends at once; the worker stops searching within a few milliseconds.
+            Parameters: None
+            Returns: None"""
+        if self._cancelled is None and not self._finished:
+            self._cancelled = time.perf_counter()
+            self._engine._cancel(self._job)
+            self._finished = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(('done', None))
+
+    def __aiter__(self):
+        """Return the stream itself as its async iterator.
+            Parameters: None
+            Returns: AnalysisStream"""
+        return self
+
+    async def __anext__(self):
+        """Wait for the next completed depth. The stream ends when the job does; it raises RuntimeError instead if
+            the worker raised or died while running the job.
+            Parameters: None
+            Returns: dict with depth, lines (list of dicts with score and moves), nodes, seconds (in the worker),
+                and elapsed (since the job was posted)"""
+        kind, payload = await self._queue.get()
+        if kind == 'done':
+            self._finished = True
+            if payload is not None and payload.get('error'):
+                raise RuntimeError(f"analysis failed: {payload['error']}")
+            raise StopAsyncIteration
+        return payload
+
+    async def wait_stopped(self, timeout=5.0):
+        """Wait until the worker has stopped this job after a cancel.
+            Parameters: timeout (seconds)
+            Returns: the stop latency in seconds, or None if it did not stop in time"""
+        deadline = time.perf_counter() + timeout
+        while self._stop_latency is None and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+        return self._stop_latency
+
+
+class AnalysisEngine:
+    """An AnalysisEngine object owns the analysis worker process. It is responsible for posting jobs to it,
+        routing its results to the stream of each job on the event loop, and shutting it down."""
+
+    def __init__(self, table_entries=DEFAULT_TABLE_ENTRIES):
+        """Initialize an engine; start() launches the worker.
+            Parameters: table_entries (transposition table size in the worker)
+            Returns: None"""
+        self._table_entries = table_entries
+        self._requests = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._latest = multiprocessing.Value('q', 0, lock=False)
+        self._next_job = 0
+        self._streams = {}
+        self._process = None
+        self._reader = None
+        self._loop = None
+        self._dead = False
+
+    async def start(self):
+        """Start the worker process and the thread that reads its results.
+            Parameters: None
+            Returns: AnalysisEngine"""
+        self._loop = asyncio.get_running_loop()
+        self._process = multiprocessing.Process(target=_analysis_worker, daemon=True,
+                                                args=(self._requests, self._results, self._latest,
+                                                      self._table_entries))
+        self._process.start()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        return self
+
+    def _read_results(self):
+        """Pass every message from the worker to the event loop until the worker exits. If the worker dies
+            instead, every open stream is ended with an error.
+            Parameters: None
+            Returns: None"""
+        while True:
+            try:
+                job, kind, payload = self._results.get(timeout=LIVENESS_SECONDS)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                self._loop.call_soon_threadsafe(self._worker_died, self._process.exitcode)
+                return
+            if kind == 'exit':
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, job, kind, payload)
+
+    def _worker_died(self, exitcode):
+        """End every open stream after the worker died. Called on the event loop.
+            Parameters: exitcode
+            Returns: None"""
+        self._dead = True
+        for stream in list(self._streams.values()):
+            stream._deliver('done', {'stopped': True, 'nodes': 0,
+                                     'error': f"the analysis worker exited with code {exitcode}"})
+        self._streams.clear()
+
+    def _dispatch(self, job, kind, payload):
+        """Hand a message to its job's stream. Called on the event loop.
+            Parameters: job, kind, and payload
+            Returns: None"""
+        stream = self._streams.get(job)
+        if stream is not None:
+            stream._deliver(kind, payload)
+            if kind == 'done':
+                del self._streams[job]
+
+    def analyze(self, position, max_depth=DEFAULT_MAX_DEPTH, lines=DEFAULT_LINES, time_limit=None):
+        """Start analyzing a position, stopping whatever was being analyzed before (its stream ends).
+            Parameters: position (ChessVar or FastBoard), max_depth, lines (how many best moves to keep), and
+                time_limit (seconds)
+            Returns: AnalysisStream"""
+        if self._process is None or self._dead:
+            raise RuntimeError("the analysis engine is not running")
+        board = position if isinstance(position, FastBoard) else FastBoard.from_game(position)
+        for stream in list(self._streams.values()):
+            stream.cancel()
+        self._next_job += 1
+        job = self._next_job
+        stream = AnalysisStream(self, job)
+        self._streams[job] = stream
+        self._latest.value = job
+        self._requests.put((job, board.to_bytes(), max_depth, lines, time_limit))
+        return stream
+
+    def _cancel(self, job):
+        """Stop a job in the worker if it is the one running. Called by AnalysisStream.cancel.
+            Parameters: job
+            Returns: None"""
+        if self._latest.value == job:
+            self._next_job += 1
+            self._latest.value = self._next_job
+
+    async def close(self):
+        """Stop any running job and shut the worker down. Does nothing if the engine was never started.
+            Parameters: None
+            Returns: None"""
+        if self._process is None:
+            return
+        for stream in list(self._streams.values()):
+            stream.cancel()
+        self._requests.put(None)
+        await self._loop.run_in_executor(None, self._process.join)
+        await self._loop.run_in_executor(None, self._reader.join)
+
+    async def __aenter__(self):
+        """Start the engine for use in an async with statement.
+            Parameters: None
+            Returns: AnalysisEngine"""
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Close the engine at the end of an async with statement.
+            Parameters: exc_type, exc_value, and traceback
+            Returns: None"""
+        await self.close()
@@ -0,0 +1,91 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A text archive of finished ChessVar games. Each line is one JSON record with the game id, the players,
+#              the final get_game_state() result, and the moves in order ('e2e4' for make_move, 'F@c1' for
+#              enter_fairy_piece). Lines are flushed as each game is written, so an archive can be read while it is
+#              still growing.
+
+import json
+
+from ChessVar import ChessVar
+
+
+def parse_move_name(name):
+    """Convert an archived move name to the ChessVar call that makes it.
+        Parameters: name (such as 'e2e4' or 'F@c1')
+        Returns: ('make_move', from, to) or ('enter_fairy_piece', letter, square)"""
+    if name[1] == '@':
+        return 'enter_fairy_piece', name[0], name[2:]
+    return 'make_move', name[:2], name[2:]
+
+
+def replay(moves, game=None):
+    """Replay archived move names through ChessVar, yielding the game before each move. Nothing is yielded after
+        the last move, so the caller can read the final position from the game it passed in.
+        Parameters: moves (list of move names) and game (ChessVar, a new one by default)
+        Returns: generator of (ply, game, move name)"""
+    if game is None:
+        game = ChessVar()
+    for ply, name in enumerate(moves):
+        yield ply, game, name
+        method, first, second = parse_move_name(name)
+        if not getattr(game, method)(first, second):
+            raise ValueError(f"illegal archived move {name} at ply {ply}")
+
+
+class GameArchiveWriter:
+    """A GameArchiveWriter object appends finished games to a text archive. It is responsible for giving each game
+        its own line and flushing it right away, so readers never see half a game."""
+
+    def __init__(self, path):
+        """Initialize a writer that appends to the archive at path.
+            Parameters: path
+            Returns: None"""
+        self._file = open(path, 'a', encoding='utf-8')
+        self._count = 0
+
+    def write_game(self, game_id, white, black, result, moves, **extra):
+        """Append one game to the archive.
+            Parameters: game_id, white (player name), black (player name), result (from get_game_state), moves
+                (list of move names), and any extra fields to store with the game
+            Returns: None"""
+        record = {'id': game_id, 'white': white, 'black': black, 'result': result, 'moves': list(moves)}
+        record.update(extra)
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        self._count += 1
+
+    def get_count(self):
+        """Return how many games this writer has written.
+            Parameters: None
+            Returns: int"""
+        return self._count
+
+    def close(self):
+        """Close the archive file.
+            Parameters: None
+            Returns: None"""
+        self._file.close()
+
+    def __enter__(self):
+        """Return the writer for use in a with statement.
+            Parameters: None
+            Returns: GameArchiveWriter"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the archive at the end of a with statement.
+            Parameters: exc_type, exc_value, and traceback
+            Returns: None"""
+        self.close()
+
+
+def read_games(path):
+    """Read every game in an archive, in the order they were written.
+        Parameters: path
+        Returns: generator of game records (dicts)"""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
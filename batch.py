@@ -0,0 +1,236 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Batched board tensors for scoring many ChessVar positions at once with NumPy. A BoardBatch packs N
+#              positions into an N x 64 int8 array of FastBoard piece codes (a1 first) plus side to move, fairy
+#              reserve, game state, and lost major piece vectors, and the functions below evaluate the whole batch
+#              with array operations instead of a Python loop per position. NumPy is only needed by this module.
+
+import numpy as np
+
+from movegen import BLACK, TYPE_MASK, KING, HUNTER, MAJOR_TYPES, UNFINISHED, WHITE_WON, BLACK_WON
+from search import PIECE_VALUES, PIECE_SQUARE_TABLES
+from compact import RECORD_SIZE, TURN_BIT, STATE_MASK, STATE_SHIFT, RESERVE_MASK, RESERVE_SHIFT, LOST_SHIFT
+from position import CODE_NAMES
+
+
+def _build_lookup_tables():
+    """Build the piece value and piece-square lookup tables indexed directly by piece code, with black pieces
+        negative and their squares mirrored, so a batch can be scored with one fancy-indexing step.
+        Parameters: None
+        Returns: tuple of (int32 array of 32 values, int32 array of 32 x 64 bonuses)"""
+    values = np.zeros(BLACK * 2, dtype=np.int32)
+    bonuses = np.zeros((BLACK * 2, 64), dtype=np.int32)
+    for kind in range(1, len(PIECE_VALUES)):
+        values[kind] = PIECE_VALUES[kind]
+        values[kind | BLACK] = -PIECE_VALUES[kind]
+        for square in range(64):
+            bonuses[kind, square] = PIECE_SQUARE_TABLES[kind][square]
+            bonuses[kind | BLACK, square] = -PIECE_SQUARE_TABLES[kind][square ^ 56]
+    return values, bonuses
+
+
+VALUE_TABLE, PIECE_SQUARE_TABLE = _build_lookup_tables()
+PIECE_PLANE_CODES = np.array([kind | color for color in (0, BLACK) for kind in range(1, HUNTER + 1)], dtype=np.int8)
+
+# what each of the feature planes made by feature_planes holds, in order
+PLANE_NAMES = tuple(CODE_NAMES[code] for code in PIECE_PLANE_CODES.tolist()) + (
+    'black to move', 'F stored', 'H stored', 'f stored', 'h stored', 'white eligible', 'black eligible')
+# piece value plus bonus, flattened so one take() with code * 64 + square scores a whole batch
+EVAL_TABLE = (VALUE_TABLE[:, None] + PIECE_SQUARE_TABLE).ravel()
+SQUARES = np.arange(64, dtype=np.int16)
+
+
+class BoardBatch:
+    """A BoardBatch object holds many positions as arrays. It is responsible for packing positions from the other
+        representations (ChessVar games, Position snapshots, FastBoards, and CompactChessVar games) and for giving
+        the evaluation functions the arrays they work on."""
+
+    def __init__(self, boards, turns, reserves, states, lost):
+        """Initialize a batch from arrays that are already packed.
+            Parameters: boards (N x 64 int8 piece codes), turns (N int8, 1 when black is to move), reserves (N int8
+                fairy reserve bits), states (N int8 indexes into GAME_STATES), and lost (N x 2 int8 major pieces
+                lost by white and black)
+            Returns: None"""
+        self._boards = boards
+        self._turns = turns
+        self._reserves = reserves
+        self._states = states
+        self._lost = lost
+
+    @classmethod
+    def _pack(cls, rows):
+        """Build a batch from (board bytes, turn, reserve, state, white lost, black lost) rows.
+            Parameters: rows (list)
+            Returns: BoardBatch"""
+        count = len(rows)
+        boards = np.frombuffer(b''.join(row[0] for row in rows), dtype=np.int8).reshape(count, 64).copy()
+        fields = np.array([row[1:] for row in rows], dtype=np.int8).reshape(count, 5)
+        return cls(boards, fields[:, 0].copy(), fields[:, 1].copy(), fields[:, 2].copy(), fields[:, 3:].copy())
+
+    @classmethod
+    def from_positions(cls, positions):
+        """Build a batch from Position snapshots.
+            Parameters: positions (iterable of Position)
+            Returns: BoardBatch"""
+        rows = []
+        for position in positions:
+            lost = [sum(1 for code in position.get_lost(turn) if code & TYPE_MASK in MAJOR_TYPES) for turn in (0, 1)]
+            rows.append((position.get_board(), position.get_turn(), position.get_reserve(), position.get_state(),
+                         lost[0], lost[1]))
+        return cls._pack(rows)
+
+    @classmethod
+    def from_games(cls, games):
+        """Build a batch from ChessVar games.
+            Parameters: games (iterable of ChessVar)
+            Returns: BoardBatch"""
+        return cls.from_positions(game.snapshot() for game in games)
+
+    @classmethod
+    def from_fast_boards(cls, boards):
+        """Build a batch from FastBoards.
+            Parameters: boards (iterable of FastBoard)
+            Returns: BoardBatch"""
+        return cls._pack([(bytes(board.get_squares()), board.get_turn(), board.get_reserve(), board.get_state(),
+                           board.get_lost(0), board.get_lost(1)) for board in boards])
+
+    @classmethod
+    def from_records(cls, data):
+        """Build a batch from the RECORD_SIZE byte records made by CompactChessVar.to_bytes, laid end to end.
+            Parameters: data (bytes-like)
+            Returns: BoardBatch"""
+        records = np.frombuffer(data, dtype=np.uint8).reshape(-1, RECORD_SIZE)
+        flags = records[:, 64:68].copy().view('<u4').ravel()
+        lost = np.stack([(flags >> LOST_SHIFT[turn]) & 3 for turn in (0, 1)], axis=1)
+        return cls(records[:, :64].astype(np.int8), (flags & TURN_BIT).astype(np.int8),
+                   ((flags & RESERVE_MASK) >> RESERVE_SHIFT).astype(np.int8),
+                   ((flags & STATE_MASK) >> STATE_SHIFT).astype(np.int8), lost.astype(np.int8))
+
+    @classmethod
+    def from_compact_games(cls, games):
+        """Build a batch from CompactChessVar games.
+            Parameters: games (iterable of CompactChessVar)
+            Returns: BoardBatch"""
+        return cls.from_records(b''.join(game.to_bytes() for game in games))
+
+    def __len__(self):
+        """Return the number of positions in the batch.
+            Parameters: None
+            Returns: int"""
+        return len(self._boards)
+
+    def get_boards(self):
+        """Return the N x 64 int8 array of piece codes.
+            Parameters: None
+            Returns: numpy array"""
+        return self._boards
+
+    def get_turns(self):
+        """Return the side to move of each position (0 for white, 1 for black).
+            Parameters: None
+            Returns: numpy array"""
+        return self._turns
+
+    def get_reserves(self):
+        """Return the fairy reserve bits of each position.
+            Parameters: None
+            Returns: numpy array"""
+        return self._reserves
+
+    def get_states(self):
+        """Return the stored game state of each position as an index into GAME_STATES.
+            Parameters: None
+            Returns: numpy array"""
+        return self._states
+
+    def get_lost(self):
+        """Return the N x 2 array of major pieces lost by white and black.
+            Parameters: None
+            Returns: numpy array"""
+        return self._lost
+
+
+def _table_indexes(batch):
+    """Return code * 64 + square for every square of every position, to index the flattened tables.
+        Parameters: batch (BoardBatch)
+        Returns: N x 64 int16 array"""
+    return (batch.get_boards().astype(np.int16) << 6) | SQUARES
+
+
+def material(batch):
+    """Return the material balance of every position, from white's point of view.
+        Parameters: batch (BoardBatch)
+        Returns: array of N scores"""
+    return VALUE_TABLE.take(batch.get_boards()).sum(axis=1)
+
+
+def piece_square_scores(batch):
+    """Return the piece-square bonus balance of every position, from white's point of view.
+        Parameters: batch (BoardBatch)
+        Returns: array of N scores"""
+    return PIECE_SQUARE_TABLE.ravel().take(_table_indexes(batch)).sum(axis=1)
+
+
+def king_presence(batch):
+    """Return which kings are on the board in every position.
+        Parameters: batch (BoardBatch)
+        Returns: N x 2 bool array (white king, black king)"""
+    boards = batch.get_boards()
+    return np.stack(((boards == KING).any(axis=1), (boards == (KING | BLACK)).any(axis=1)), axis=1)
+
+
+def fairy_eligibility(batch):
+    """Return whether each player may enter a fairy piece in every position (whatever the turn), matching
+        FastBoard.fairy_eligible: the first one needs one lost major piece and the second needs two.
+        Parameters: batch (BoardBatch)
+        Returns: N x 2 bool array (white, black)"""
+    reserves = batch.get_reserves().astype(np.int16)
+    lost = batch.get_lost()
+    eligible = []
+    for turn in (0, 1):
+        stored = (reserves >> (2 * turn)) & 3
+        placed = 2 - (stored & 1) - (stored >> 1)
+        eligible.append((stored != 0) & (lost[:, turn] > placed))
+    return np.stack(eligible, axis=1)
+
+
+def feature_planes(batch):
+    """Build 8 x 8 feature planes for every position, for training models: one plane per piece (white pawn through
+        black hunter, falcon and hunter included), then planes filled with the side to move, each fairy reserve
+        bit, and each player's fairy eligibility. PLANE_NAMES lists them in order. Row 0 of a plane is rank 1.
+        Parameters: batch (BoardBatch)
+        Returns: N x len(PLANE_NAMES) x 8 x 8 uint8 array"""
+    boards = batch.get_boards()
+    count = len(boards)
+    pieces = len(PIECE_PLANE_CODES)
+    planes = np.zeros((count, len(PLANE_NAMES), 64), dtype=np.uint8)
+    planes[:, :pieces] = boards[:, None, :] == PIECE_PLANE_CODES[None, :, None]
+    planes[:, pieces] = batch.get_turns()[:, None]
+    reserves = batch.get_reserves()
+    for bit in range(4):
+        planes[:, pieces + 1 + bit] = ((reserves >> bit) & 1)[:, None]
+    planes[:, pieces + 5:pieces + 7] = fairy_eligibility(batch)[:, :, None]
+    return planes.reshape(count, len(PLANE_NAMES), 8, 8)
+
+
+def game_states(batch):
+    """Return the game state of every position: the stored state, or the winner if a king is missing from a
+        position that was built without one.
+        Parameters: batch (BoardBatch)
+        Returns: int8 array of N indexes into GAME_STATES"""
+    kings = king_presence(batch)
+    states = batch.get_states().copy()
+    unfinished = states == UNFINISHED
+    states[unfinished & ~kings[:, 0]] = BLACK_WON
+    states[unfinished & ~kings[:, 1]] = WHITE_WON
+    return states
+
+
+def evaluate(batch):
+    """Score every position by material and piece-square bonuses from the side to move's point of view, the same
+        as search.positional_eval does for one FastBoard.
+        Parameters: batch (BoardBatch)
+        Returns: array of N scores"""
+    scores = EVAL_TABLE.take(_table_indexes(batch)).sum(axis=1)
+    return np.where(batch.get_turns() == 1, -scores, scores)
@@ -0,0 +1,183 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Batched move generation for many ChessVar positions at once with NumPy. A BoardBatch is turned into
+#              64-bit bitboards (one uint64 per piece code per position), and pawn pushes and captures, knight and
+#              king jumps, sliding rays (including the falcon and hunter, whose rays flip with the player), and
+#              fairy piece entries are computed for every position together with shifts and masks. The moves come
+#              out in the same int encoding as FastBoard.generate_moves.
+
+import numpy as np
+
+from batch import BoardBatch, fairy_eligibility
+from movegen import BLACK, PAWN, KNIGHT, KING, FALCON, HUNTER, DROP_SHIFT, UNFINISHED, SLIDER_DIRECTIONS, \
+    RESERVE_BITS
+
+FULL = 0xFFFFFFFFFFFFFFFF
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+HOME_RANKS = (0xFFFF, 0xFFFF << 48)  # where white and black enter fairy pieces
+
+# (file step, rank step) -> (square delta, squares allowed to move that way without wrapping around the board)
+STEPS = {}
+for _file_step in (-2, -1, 0, 1, 2):
+    for _rank_step in (-2, -1, 0, 1, 2):
+        _allowed = FULL
+        if _file_step >= 1:
+            _allowed &= ~FILE_H
+        if _file_step == 2:
+            _allowed &= ~FILE_G
+        if _file_step <= -1:
+            _allowed &= ~FILE_A
+        if _file_step == -2:
+            _allowed &= ~FILE_B
+        STEPS[(_file_step, _rank_step)] = (_rank_step * 8 + _file_step, _allowed)
+
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_STEPS = ((1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1))
+
+# for each color, the sliding piece codes that walk each direction
+SLIDERS_BY_DIRECTION = tuple({direction: tuple(piece for piece, directions in SLIDER_DIRECTIONS.items()
+                                               if (piece & BLACK) == color and direction in directions)
+                              for direction in KING_STEPS} for color in (0, BLACK))
+
+
+def _shift(bitboards, delta, allowed):
+    """Move every bit of every bitboard by a square delta, dropping bits that would wrap around a board edge.
+        Parameters: bitboards (uint64 array), delta, and allowed (mask of squares that may move that way)
+        Returns: uint64 array"""
+    bitboards = bitboards & np.uint64(allowed)
+    if delta > 0:
+        return bitboards << np.uint64(delta)
+    return bitboards >> np.uint64(-delta)
+
+
+def piece_bitboards(batch):
+    """Build a bitboard for every piece code of every position in a batch (bit n set when square n holds it).
+        Parameters: batch (BoardBatch)
+        Returns: 32 x N uint64 array indexed by piece code"""
+    boards = batch.get_boards()
+    bitboards = np.zeros((BLACK * 2, len(boards)), dtype=np.uint64)
+    for kind in range(PAWN, HUNTER + 1):
+        for piece in (kind, kind | BLACK):
+            bits = np.packbits(boards == piece, axis=1, bitorder='little')
+            bitboards[piece] = bits.view('<u8').ravel()
+    return bitboards
+
+
+def _targets(side_pieces, own, enemy, color, eligible, reserve, records):
+    """Add (target bitboards, square delta, entered piece) records for every move of one color.
+        Parameters: side_pieces (32 x N bitboards already limited to positions where this color moves), own and
+            enemy (occupancy of each color), color (0 or BLACK), eligible (bool array of positions where this color
+            may enter a fairy piece), reserve (reserve bits), and records (list to add to)
+        Returns: None"""
+    empty = ~(own | enemy)
+
+    # pawns: pushes onto empty squares (two spaces from the starting rank) and diagonal captures
+    pawns = side_pieces[PAWN | color]
+    forward = -8 if color else 8
+    single = _shift(pawns, forward, FULL) & empty
+    records.append((single, forward, 0))
+    records.append((_shift(single & np.uint64(RANK_6 if color else RANK_3), forward, FULL) & empty, 2 * forward, 0))
+    for file_step in (-1, 1):
+        delta, allowed = STEPS[(file_step, -1 if color else 1)]
+        records.append((_shift(pawns, delta, allowed) & enemy, delta, 0))
+
+    # knights and kings jump to any square not holding one of their own pieces
+    for piece, steps in ((KNIGHT | color, KNIGHT_STEPS), (KING | color, KING_STEPS)):
+        jumpers = side_pieces[piece]
+        for step in steps:
+            delta, allowed = STEPS[step]
+            records.append((_shift(jumpers, delta, allowed) & ~own, delta, 0))
+
+    # sliders walk each ray one square at a time, stopping after a capture or before their own piece
+    for step, pieces in SLIDERS_BY_DIRECTION[1 if color else 0].items():
+        delta, allowed = STEPS[step]
+        frontier = side_pieces[pieces[0]]
+        for piece in pieces[1:]:
+            frontier = frontier | side_pieces[piece]
+        for distance in range(1, 8):
+            frontier = _shift(frontier, delta, allowed) & ~own
+            if not frontier.any():
+                break
+            records.append((frontier, delta * distance, 0))
+            frontier = frontier & empty
+
+    # fairy pieces enter on any empty home rank square while still stored and the player is eligible
+    home = np.uint64(HOME_RANKS[1 if color else 0])
+    for kind in (FALCON, HUNTER):
+        piece = kind | color
+        allowed = eligible & ((reserve & RESERVE_BITS[piece]) != 0)
+        records.append((np.where(allowed, empty & home, np.uint64(0)), 0, piece))
+
+
+def generate_move_arrays(batch):
+    """Generate every legal move of every position in a batch, as flat arrays.
+        Parameters: batch (BoardBatch)
+        Returns: tuple of (int array of batch indexes, int array of move ints), sorted by batch index"""
+    bitboards = piece_bitboards(batch)
+    occupancy = (np.bitwise_or.reduce(bitboards[:BLACK], axis=0), np.bitwise_or.reduce(bitboards[BLACK:], axis=0))
+    turns = batch.get_turns()
+    reserve = batch.get_reserves().astype(np.int64)
+    eligibility = fairy_eligibility(batch)
+    unfinished = batch.get_states() == UNFINISHED
+
+    records = []
+    for turn, color in ((0, 0), (1, BLACK)):
+        moving = unfinished & (turns == turn)
+        if not moving.any():
+            continue
+        side_pieces = np.where(moving, bitboards, np.uint64(0))
+        _targets(side_pieces, occupancy[turn], occupancy[1 - turn], color, moving & eligibility[:, turn], reserve,
+                 records)
+
+    records = [record for record in records if record[0].any()]
+    if not records:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int64)
+
+    # pull the set bits out of the nonzero bitboards one lowest bit at a time, all at once
+    targets = np.stack([record[0] for record in records])
+    deltas = np.array([record[1] for record in records], dtype=np.int64)
+    pieces = np.array([record[2] for record in records], dtype=np.int64)
+    kinds, indexes = np.nonzero(targets)
+    bits = targets[kinds, indexes]
+    found_indexes = []
+    found_kinds = []
+    found_squares = []
+    while len(bits):
+        lowest = bits & (~bits + np.uint64(1))
+        found_indexes.append(indexes)
+        found_kinds.append(kinds)
+        found_squares.append(np.frexp(lowest.astype(np.float64))[1] - 1)
+        bits = bits ^ lowest
+        left = bits != 0
+        bits, kinds, indexes = bits[left], kinds[left], indexes[left]
+    indexes = np.concatenate(found_indexes)
+    kinds = np.concatenate(found_kinds)
+    to_squares = np.concatenate(found_squares).astype(np.int64)
+
+    piece = pieces[kinds]
+    moves = np.where(piece != 0, piece << DROP_SHIFT, to_squares - deltas[kinds]) | (to_squares << 6)
+    order = np.argsort(indexes, kind='stable')
+    return indexes[order], moves[order]
+
+
+def generate_moves(batch):
+    """Generate every legal move of every position in a batch, the same moves FastBoard.generate_moves gives for
+        each position (possibly in a different order).
+        Parameters: batch (BoardBatch)
+        Returns: list of N lists of move ints"""
+    indexes, moves = generate_move_arrays(batch)
+    bounds = np.cumsum(np.bincount(indexes, minlength=len(batch)))[:-1]
+    return [part.tolist() for part in np.split(moves, bounds)]
+
+
+def generate_moves_for_boards(boards):
+    """Generate every legal move of a list of FastBoards in one batch.
+        Parameters: boards (list of FastBoard)
+        Returns: list of lists of move ints"""
+    return generate_moves(BoardBatch.from_fast_boards(boards))
@@ -0,0 +1,876 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Benchmarks for the ChessVar engine code. Run a single benchmark with "python benchmarks.py <name>",
+#              or run "python benchmarks.py" with no name to list the benchmarks. Each one prints its own numbers.
+
+import sys
+
+from movegen import FastBoard
+
+
+def bench_lazy_smp(max_depth=5, worker_counts=(1, 2, 4, 8, 16, 32)):
+    """Print nodes per second and time to each depth for Lazy SMP search from the starting position, for each
+        worker count. Speedups are relative to one worker, and only show up when there are enough CPU cores.
+        Parameters: max_depth and worker_counts
+        Returns: None"""
+    from search import lazy_smp_search
+
+    base = None
+    print(f"{'workers':>7} {'nodes':>10} {'nps':>10} {'seconds':>8} {'speedup':>7}  time to depth")
+    for workers in worker_counts:
+        result = lazy_smp_search(FastBoard(), max_depth, workers=workers)
+        if base is None:
+            base = result['seconds']
+        depths = ' '.join(f"d{depth}={seconds:.3f}s" for depth, seconds in sorted(result['depth_times'].items()))
+        print(f"{workers:>7} {result['nodes']:>10} {result['nps']:>10.0f} {result['seconds']:>8.3f} "
+              f"{base / result['seconds']:>7.2f}  {depths}")
+
+
+def bench_tournament(games=40, policy_a='greedy', policy_b='random'):
+    """Print the result and games/hour/core of a short tournament, for sizing evaluation batches.
+        Parameters: games, policy_a, and policy_b
+        Returns: None"""
+    from tournament import run_tournament, format_summary
+
+    print(format_summary(run_tournament(policy_a, policy_b, games)))
+
+
+def bench_mcts(seconds=5.0):
+    """Print MCTS playouts per second from the starting position.
+        Parameters: seconds
+        Returns: None"""
+    from mcts import MCTS
+    from movegen import move_name
+
+    engine = MCTS(seed=1)
+    result = engine.search(time_limit=seconds)
+    print(f"{result['playouts']} playouts in {result['seconds']:.2f}s: "
+          f"{result['playouts_per_second']:.0f} playouts/sec, best move {move_name(result['move'])}, "
+          f"{engine.get_free_nodes()} free nodes")
+
+
+def bench_move_cache(rounds=2000):
+    """Print the cost of probing illegal and legal moves in the starting position with and without a shared
+        MoveCache, plus the cache counters.
+        Parameters: rounds
+        Returns: None"""
+    import time
+    from ChessVar import ChessVar
+    from movecache import MoveCache
+
+    cache = MoveCache()
+    for label, attach in (('no cache', False), ('move cache', True)):
+        game = ChessVar()
+        if attach:
+            game.set_move_cache(cache)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            game.make_move('a1', 'a5')
+            game.make_move('b1', 'b3')
+            game.make_move('d1', 'h5')
+        seconds = time.perf_counter() - start
+        print(f"{label:>10}: {seconds / (rounds * 3) * 1e6:.2f} us per rejected move")
+    print(cache.get_stats())
+
+
+def bench_drops(rounds=2000):
+    """Print the cost of listing every legal fairy entry with ChessVar.get_legal_drops, after both sides have
+        traded pieces so entries are possible.
+        Parameters: rounds
+        Returns: None"""
+    import time
+    from ChessVar import ChessVar
+
+    game = ChessVar()
+    for moved_from, move_to in (('b1', 'c3'), ('g8', 'f6'), ('c3', 'd5'), ('f6', 'd5'), ('e2', 'e4'), ('d5', 'c3'),
+                                ('d2', 'c3')):
+        game.make_move(moved_from, move_to)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        drops = game.get_legal_drops()
+    seconds = time.perf_counter() - start
+    print(f"{len(drops)} legal entries, {seconds / rounds * 1e6:.2f} us per get_legal_drops call")
+
+
+def bench_shared_games(seconds=2.0, worker_counts=(1, 2, 4, 8), games=256, hot_games=4, hot_share=0.5):
+    """Print the committed moves per second of the shared-memory game table for each number of worker processes,
+        with half of the requests going to a few hot games, and how often commits and reads had to be retried.
+        The workers run on this machine, so throughput only grows with the worker count given enough CPU cores.
+        Parameters: seconds, worker_counts, games, hot_games, and hot_share
+        Returns: None"""
+    import multiprocessing
+    from sharedgames import measure_throughput
+
+    print(f"{games} games, {hot_share:.0%} of requests to {hot_games} hot games, "
+          f"{multiprocessing.cpu_count()} CPU cores")
+    print(f"{'workers':>7} {'commits/s':>10} {'conflicts':>9} {'read retries':>12} {'lost':>4}")
+    for workers in worker_counts:
+        result = measure_throughput(workers, seconds, games, hot_games, hot_share)
+        print(f"{workers:>7} {result['commits_per_second']:>10,.0f} {result['conflicts']:>9} "
+              f"{result['read_retries']:>12} {result['lost']:>4}")
+
+
+def bench_snapshot(rounds=10000):
+    """Print the cost of ChessVar.snapshot, ChessVar.from_snapshot, ChessVar.clone, and copy.deepcopy.
+        Parameters: rounds
+        Returns: None"""
+    import copy
+    import time
+    from ChessVar import ChessVar
+
+    game = ChessVar()
+    position = game.snapshot()
+    for label, function in (('snapshot', game.snapshot), ('from_snapshot', lambda: ChessVar.from_snapshot(position)),
+                            ('clone', game.clone), ('deepcopy', lambda: copy.deepcopy(game))):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            function()
+        print(f"{label:>13}: {(time.perf_counter() - start) / rounds * 1e6:.1f} us")
+
+
+def bench_contention(seconds=1.0, reader_counts=(1, 4, 16, 64)):
+    """Print reads and writes per second on one ThreadSafeChessVar with many reader threads polling the game
+        state and board while one writer thread plays random moves. On free-threaded builds the readers run in
+        parallel, since they never take the lock.
+        Parameters: seconds and reader_counts
+        Returns: None"""
+    import contextlib
+    import io
+    import random
+    import threading
+    import time
+    from threadsafe import ThreadSafeChessVar
+
+    for readers in reader_counts:
+        shared = ThreadSafeChessVar()
+        stop = threading.Event()
+        reads = [0] * readers
+        writes = [0]
+
+        def read(slot):
+            """Poll the game until told to stop."""
+            count = 0
+            while not stop.is_set():
+                shared.get_game_state()
+                shared.get_square('e1')
+                count += 1
+            reads[slot] = count
+
+        def write():
+            """Play random moves, starting a new game whenever one ends."""
+            rng = random.Random(1)
+            board = FastBoard()
+            with contextlib.redirect_stdout(io.StringIO()):
+                while not stop.is_set():
+                    if shared.get_game_state() != 'UNFINISHED':
+                        shared.reset()
+                        board = FastBoard()
+                    move = board.random_move(rng)
+                    method, first, second = board.to_chess_var_move(move)
+                    getattr(shared, method)(first, second)
+                    board.make_move(move)
+                    writes[0] += 1
+
+        threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+        threads.append(threading.Thread(target=write))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"{readers:>3} readers: {sum(reads) / elapsed:>10.0f} reads/sec, {writes[0] / elapsed:>8.0f} writes/sec")
+
+
+def bench_observers(rounds=20000):
+    """Print the cost of a make_move call with no observers, with a subclass that wraps make_move, and with a
+        registered observer (delivered one at a time and in batches of 100).
+        Parameters: rounds
+        Returns: None"""
+    import time
+    from ChessVar import ChessVar
+
+    class WrappedChessVar(ChessVar):
+        """The old way of listening to moves: wrap make_move in a subclass."""
+
+        def make_move(self, moved_from, move_to):
+            """Call make_move and pass the result to a listener that does nothing."""
+            result = super().make_move(moved_from, move_to)
+            (lambda *args: None)(moved_from, move_to, result)
+            return result
+
+    games = [('no observers', ChessVar()), ('subclass wrapper', WrappedChessVar())]
+    for label, batch_size in (('observer', 1), ('observer, batch 100', 100)):
+        game = ChessVar()
+        game.add_observer(lambda events: None, batch_size)
+        games.append((label, game))
+    for label, game in games:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            game.make_move('b1', 'b3')
+        print(f"{label:>20}: {(time.perf_counter() - start) / rounds * 1e6:.2f} us per make_move")
+
+
+def bench_memory(games=100000):
+    """Print the bytes per game measured with tracemalloc for a number of live games, with ChessVar and with
+        CompactChessVar. Each game has had a few moves played, including a capture.
+        Parameters: games
+        Returns: None"""
+    import tracemalloc
+    from ChessVar import ChessVar
+    from compact import CompactChessVar
+
+    moves = (('e2', 'e4'), ('d7', 'd5'), ('e4', 'd5'), ('g8', 'f6'))
+    for label, game_class in (('ChessVar', ChessVar), ('CompactChessVar', CompactChessVar)):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        live = []
+        for _ in range(games):
+            game = game_class()
+            for moved_from, move_to in moves:
+                game.make_move(moved_from, move_to)
+            live.append(game)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        print(f"{label:>15}: {used / games:>8.0f} bytes per game ({games} games)")
+        del live
+
+
+def bench_reject(rounds=20000):
+    """Print the latency of ChessVar.make_move for moves that are geometrically impossible, moves that are blocked,
+        and accepted moves (knights going back and forth), measured separately.
+        Parameters: rounds
+        Returns: None"""
+    import time
+    from ChessVar import ChessVar
+
+    game = ChessVar()
+    game.make_move('a1', 'a2')  # loads the move tables before timing
+    cases = (('impossible', (('b1', 'b4'), ('c1', 'c3'), ('a1', 'h8'), ('e2', 'e5'))),
+             ('blocked', (('a1', 'a5'), ('d1', 'd4'), ('c1', 'h6'), ('e1', 'e2'))),
+             ('accepted', (('g1', 'f3'), ('g8', 'f6'), ('f3', 'g1'), ('f6', 'g8'))))
+    for label, moves in cases:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for moved_from, move_to in moves:
+                game.make_move(moved_from, move_to)
+        print(f"{label:>10}: {(time.perf_counter() - start) / (rounds * len(moves)) * 1e6:.2f} us per make_move")
+
+
+def bench_batch_eval(positions=100000, seed=1):
+    """Print positions per second for scoring positions one FastBoard at a time with search.positional_eval, and
+        for scoring the same positions as a BoardBatch with NumPy (packing time reported separately).
+        Parameters: positions and seed
+        Returns: None"""
+    import random
+    import time
+    import batch
+    from movegen import FastBoard
+    from search import positional_eval
+
+    rng = random.Random(seed)
+    boards = []
+    board = FastBoard()
+    while len(boards) < positions:
+        if board.get_state() or board.get_ply() >= 150:
+            board = FastBoard()
+        board.make_move(board.random_move(rng))
+        boards.append(board.copy())
+
+    start = time.perf_counter()
+    expected = [positional_eval(board) for board in boards]
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    packed = batch.BoardBatch.from_fast_boards(boards)
+    pack_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = batch.evaluate(packed)
+    batch_seconds = time.perf_counter() - start
+    assert scores.tolist() == expected
+    print(f"   python loop: {positions / loop_seconds:>12,.0f} positions/s")
+    print(f"   numpy batch: {positions / batch_seconds:>12,.0f} positions/s "
+          f"({loop_seconds / batch_seconds:.0f}x, packing {positions / pack_seconds:,.0f} positions/s)")
+
+
+def bench_batch_movegen(positions=20000, seed=1):
+    """Print boards per second for generating every legal move one FastBoard at a time, and for generating them
+        for all boards at once with batchgen (with and without packing the boards into a BoardBatch).
+        Parameters: positions and seed
+        Returns: None"""
+    import random
+    import time
+    import batchgen
+    from batch import BoardBatch
+    from movegen import FastBoard
+
+    rng = random.Random(seed)
+    boards = []
+    board = FastBoard()
+    while len(boards) < positions:
+        if board.get_state() or board.get_ply() >= 150:
+            board = FastBoard()
+        board.make_move(board.random_move(rng))
+        boards.append(board.copy())
+
+    start = time.perf_counter()
+    expected = [board.generate_moves() for board in boards]
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    packed = BoardBatch.from_fast_boards(boards)
+    pack_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    moves = batchgen.generate_moves(packed)
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    batchgen.generate_move_arrays(packed)
+    array_seconds = time.perf_counter() - start
+    assert all(sorted(got) == sorted(want) for got, want in zip(moves, expected))
+    print(f"      python loop: {positions / loop_seconds:>10,.0f} boards/s")
+    print(f"   batch (lists): {positions / batch_seconds:>10,.0f} boards/s "
+          f"({positions / (batch_seconds + pack_seconds):,.0f} boards/s including packing)")
+    print(f"  batch (arrays): {positions / array_seconds:>10,.0f} boards/s")
+
+
+def bench_export(games=200, shard_size=4096, process_counts=(1, 2, 4)):
+    """Print the positions per second of exporting an archive of random games to training shards, for several
+        process counts.
+        Parameters: games, shard_size, and process_counts
+        Returns: None"""
+    import os
+    import tempfile
+    import export
+    from tournament import run_tournament
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, 'games.jsonl')
+        run_tournament('random', 'random', games, archive_path=archive_path, seed=1)
+        for processes in process_counts:
+            summary = export.export_archive(archive_path, os.path.join(directory, f"out{processes}"), shard_size,
+                                            processes)
+            print(f"{processes:>2} processes: {summary['positions_per_second']:>10,.0f} positions/s "
+                  f"({summary['positions']} positions in {summary['shards']} shards)")
+
+
+def bench_gamedb(games=500, queries=2000, seed=1):
+    """Print the build rate and size of a game database indexing an archive of random games, and the latency of
+        position and fairy entry queries against the memory-mapped index.
+        Parameters: games, queries, and seed
+        Returns: None"""
+    import os
+    import random
+    import tempfile
+    import time
+    from archive import read_games
+    from export import move_label
+    from gamedb import GameDatabase
+    from movegen import FastBoard
+    from tournament import run_tournament
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, 'games.jsonl')
+        run_tournament('random', 'random', games, archive_path=archive_path, seed=seed)
+        database = GameDatabase(os.path.join(directory, 'db'), flush_entries=20000)
+        database.ingest_archive(archive_path)
+        stats = database.get_stats()
+        print(f"build: {stats['positions_per_second']:,.0f} positions/s, {stats['entries']} entries in "
+              f"{stats['segments']} segments, {stats['bytes']:,} bytes ({stats['bytes_per_entry']:.1f} per entry)")
+        database.compact()
+
+        hashes = []
+        for record in read_games(archive_path):
+            board = FastBoard()
+            for name in record['moves']:
+                board.make_move(move_label(name))
+                hashes.append(board.get_hash())
+        database = GameDatabase(os.path.join(directory, 'db'))
+        start = time.perf_counter()
+        found = sum(len(database.find_position(rng.choice(hashes))) for _ in range(queries))
+        position_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(queries):
+            database.find_drops(rng.choice('FHfh'), rng.choice('abcdefgh') + rng.choice('1278'))
+        drop_seconds = time.perf_counter() - start
+        print(f"position query: {position_seconds / queries * 1000:.3f} ms ({found / queries:.1f} hits each)")
+        print(f"    drop query: {drop_seconds / queries * 1000:.3f} ms")
+
+
+def bench_checkpoint(games=500000, distinct=500, seed=1):
+    """Print the time to checkpoint and restore a number of live games, the latency of building a game on first
+        access, and for comparison the time to rebuild the same number of games by replaying their moves. The
+        live games are drawn from a smaller set of distinct random games to keep the benchmark's memory down.
+        Parameters: games, distinct, and seed
+        Returns: None"""
+    import os
+    import random
+    import tempfile
+    import time
+    from ChessVar import ChessVar
+    from checkpoint import write_checkpoint, RestoredGames
+    from movegen import FastBoard
+
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(distinct):
+        game = ChessVar()
+        history = []
+        for _ in range(rng.randrange(10, 80)):
+            board = FastBoard.from_game(game)
+            move = board.random_move(rng)
+            if move is None:
+                break
+            method, first, second = board.to_chess_var_move(move)
+            getattr(game, method)(first, second)
+            history.append((method, first, second))
+        samples.append((game, history))
+    live = {f"game-{index}": samples[index % distinct][0] for index in range(games)}
+
+    start = time.perf_counter()
+    for _, history in samples:
+        game = ChessVar()
+        for method, first, second in history:
+            getattr(game, method)(first, second)
+    replay_seconds = (time.perf_counter() - start) / distinct * games
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.ckpt')
+        summary = write_checkpoint(path, live)
+        start = time.perf_counter()
+        restored = RestoredGames(path)
+        open_seconds = time.perf_counter() - start
+        ids = rng.sample(list(live), min(10000, games))
+        start = time.perf_counter()
+        for game_id in ids:
+            restored[game_id]
+        access_seconds = (time.perf_counter() - start) / len(ids)
+        restored.close()
+    print(f"  checkpoint: {summary['seconds']:.2f} s for {games} games ({summary['bytes']:,} bytes)")
+    print(f"     restore: {open_seconds:.2f} s to open, {access_seconds * 1e6:.0f} us per game on first access "
+          f"({access_seconds * games:.1f} s if every game is touched)")
+    print(f"  replay all: {replay_seconds:.1f} s (estimated from {distinct} move histories)")
+
+
+def bench_fuzz(cases=20, processes=None):
+    """Print the calls per second of the differential fuzzer against each engine, and any failures found.
+        Parameters: cases (per engine) and processes
+        Returns: None"""
+    import fuzz
+
+    for engine in sorted(fuzz.ENGINES):
+        summary = fuzz.fuzz([engine], cases, processes=processes)
+        print(f"{engine:>11}: {summary['calls_per_second']:>8,.0f} calls/s, {len(summary['failures'])} failures")
+        for _, _, reproducer in summary['failures']:
+            print(reproducer)
+
+
+def bench_trace(games=40, seed=1):
+    """Print the cost of tracing a workload of random games (moves, rejected moves, and polling calls), then replay
+        the trace against the current build and print the latency report.
+        Parameters: games and seed
+        Returns: None"""
+    import contextlib
+    import io
+    import os
+    import random
+    import tempfile
+    import time
+    from ChessVar import ChessVar
+    from calltrace import TraceRecorder, replay_trace, format_report
+    from movegen import SQUARE_NAMES
+
+    def play(wrap):
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        for _ in range(games):
+            game = wrap(ChessVar())
+            for _ in range(200):
+                game.make_move(rng.choice(SQUARE_NAMES), rng.choice(SQUARE_NAMES))
+                game.get_square(rng.choice(SQUARE_NAMES))
+                game.get_turn()
+                if game.get_game_state() != 'UNFINISHED':
+                    break
+                board = FastBoard.from_game(game.get_game() if hasattr(game, 'get_game') else game)
+                method, first, second = board.to_chess_var_move(board.random_move(rng))
+                getattr(game, method)(first, second)
+                game.get_legal_drops()
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(directory, 'calls.trace')
+        plain = play(lambda game: game)
+        with TraceRecorder(path) as recorder:
+            traced = play(recorder.wrap)
+        calls = recorder.get_call_count()
+        size = os.path.getsize(path)
+        report = replay_trace(path)
+    print(f"{calls:,} calls traced in {size:,} bytes ({size / calls:.1f} bytes/call), "
+          f"workload {plain:.2f} s untraced, {traced:.2f} s traced ({traced / plain - 1:+.1%})")
+    print(format_report(report))
+
+
+def bench_workqueue(depth=5, worker_counts=(1, 2, 4, 8)):
+    """Print the time and speedup of distributed perft from the starting position for each worker count, against
+        perft in this process. The workers run on this machine, so speedups only show up with enough CPU cores.
+        Parameters: depth and worker_counts
+        Returns: None"""
+    import time
+    from movegen import perft
+    from workqueue import distributed_perft
+
+    start = time.perf_counter()
+    nodes = perft(FastBoard(), depth)
+    serial = time.perf_counter() - start
+    print(f"perft {depth} = {nodes:,} in {serial:.2f} s in one process")
+    print(f"{'workers':>7} {'seconds':>8} {'nodes/s':>10} {'speedup':>7} {'units':>6} {'retries':>7}")
+    for workers in worker_counts:
+        result = distributed_perft(FastBoard(), depth, workers)
+        print(f"{workers:>7} {result['seconds']:>8.2f} {result['nps']:>10,.0f} {serial / result['seconds']:>7.2f} "
+              f"{result['units']:>6} {result['retries']:>7}")
+
+
+def bench_startup(runs=15):
+    """Print the time to import ChessVar and to make the first move in a fresh process, with no move table cache
+        (cold: the tables are built and the cache file written) and with one (warm: the file is memory-mapped).
+        Each process gets a warm bytecode cache of its own, so only the table cache differs.
+        Parameters: runs (processes of each kind)
+        Returns: None"""
+    import os
+    import subprocess
+    import tempfile
+    import time
+    from movetables import CACHE_DIR_VARIABLE
+
+    probe = ("import time; start = time.perf_counter(); import ChessVar; imported = time.perf_counter(); "
+             "ChessVar.ChessVar().make_move('e2', 'e4'); print(imported - start, time.perf_counter() - imported)")
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, **{CACHE_DIR_VARIABLE: directory})
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        command = [sys.executable, '-X', 'pycache_prefix=' + os.path.join(directory, 'bytecode'), '-c', probe]
+
+        def run(cold):
+            if cold:
+                for name in os.listdir(directory):
+                    if name.endswith('.bin'):
+                        os.remove(os.path.join(directory, name))
+            start = time.perf_counter()
+            output = subprocess.run(command, env=env, capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+            return [float(value) for value in output.split()] + [time.perf_counter() - start]
+
+        run(True)
+        print(f"{'cache':>5} {'import ChessVar':>14} {'first move':>10} {'process':>8}  (median of {runs}, ms)")
+        for label, cold in (('cold', True), ('warm', False)):
+            columns = zip(*(run(cold) for _ in range(runs)))
+            imported, first_move, process = (sorted(column)[runs // 2] * 1000 for column in columns)
+            print(f"{label:>5} {imported:>14.2f} {first_move:>10.2f} {process:>8.1f}")
+
+
+def bench_tactics(games=100, max_plies=3, process_counts=(1, 2, 4), sample=20):
+    """Print the positions per second of mining an archive of greedy-versus-random games for forced king captures,
+        for several process counts. For comparison, a sample of positions is also checked for a one-ply king capture
+        the brute-force way, by trying every pair of squares on copies of a ChessVar.
+        Parameters: games, max_plies, process_counts, and sample (positions for the brute-force comparison)
+        Returns: None"""
+    import contextlib
+    import copy
+    import io
+    import os
+    import tempfile
+    import time
+    from archive import read_games, replay
+    from movegen import SQUARE_NAMES
+    from tactics import mine_archive, king_capture
+    from tournament import run_tournament
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, 'games.jsonl')
+        run_tournament('greedy', 'random', games, archive_path=archive_path, seed=1)
+        for processes in process_counts:
+            summary = mine_archive(archive_path, os.path.join(directory, 'puzzles.jsonl'), max_plies,
+                                   processes=processes)
+            print(f"{processes:>2} processes: {summary['positions_per_second']:>8,.0f} positions/s "
+                  f"({summary['positions']} positions, {summary['puzzles']} puzzles within {max_plies} plies)")
+        positions = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for record in read_games(archive_path):
+                positions.extend(copy.deepcopy(game) for _, game, _ in replay(record['moves']))
+                if len(positions) >= sample:
+                    break
+    positions = positions[:sample]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for game in positions:
+            for moved_from in SQUARE_NAMES:
+                for move_to in SQUARE_NAMES:
+                    trial = copy.deepcopy(game)
+                    if trial.make_move(moved_from, move_to) and trial.get_game_state() != 'UNFINISHED':
+                        break
+        brute = time.perf_counter() - start
+    start = time.perf_counter()
+    for game in positions:
+        king_capture(FastBoard.from_game(game))
+    fast = time.perf_counter() - start
+    print(f"one-ply king capture: {len(positions) / brute:,.1f} positions/s with ChessVar copies, "
+          f"{len(positions) / fast:,.0f} positions/s with king_capture")
+
+
+def bench_position_store(adds=14000000, lookups=1000000, batch=100000, seed=1):
+    """Print the bytes per position and the insert and lookup rates of a PositionStore filled with more than ten
+        million positions. Positions are variants of random-game positions (two pairs of squares swapped, the side
+        to move flipped), so some adds are duplicates of positions already stored.
+        Parameters: adds, lookups, batch (positions generated at a time, outside the timing), and seed
+        Returns: None"""
+    import random
+    import time
+    from compact import CompactChessVar, TURN_BIT
+    from positionstore import PositionStore
+
+    rng = random.Random(seed)
+    bases = []
+    board = FastBoard()
+    while len(bases) < 5000:
+        if board.get_state() or board.get_ply() > 120:
+            board = FastBoard()
+        data = CompactChessVar.from_fast_board(board).to_bytes()
+        bases.append((data[:64], int.from_bytes(data[64:], 'little')))
+        board.make_move(board.random_move(rng))
+
+    def variants(count):
+        made = []
+        for _ in range(count):
+            squares, flags = bases[rng.randrange(len(bases))]
+            squares = bytearray(squares)
+            for _ in range(2):
+                first, second = rng.randrange(64), rng.randrange(64)
+                squares[first], squares[second] = squares[second], squares[first]
+            made.append((squares, flags ^ rng.getrandbits(1) * TURN_BIT))
+        return made
+
+    store = PositionStore()
+    inserting = 0.0
+    sample = []
+    for done in range(0, adds, batch):
+        made = variants(min(batch, adds - done))
+        start = time.perf_counter()
+        for squares, flags in made:
+            store.add_board(squares, flags)
+        inserting += time.perf_counter() - start
+        sample.extend(made[:lookups * batch // adds + 1])
+    stats = store.get_stats()
+    print(f"{adds:,} adds, {stats['positions']:,} distinct positions, {stats['duplicates']:,} duplicates: "
+          f"{adds / inserting:,.0f} adds/s, {stats['bytes_per_position']:.1f} bytes/position "
+          f"({stats['record_bytes'] / stats['positions']:.0f} record + "
+          f"{stats['index_bytes'] / stats['positions']:.1f} index, load {stats['load']:.2f})")
+
+    sample = sample[:lookups]
+    start = time.perf_counter()
+    found = sum(1 for squares, flags in sample if store.find_board(squares, flags) is not None)
+    hits = time.perf_counter() - start
+    start = time.perf_counter()
+    missing = sum(1 for squares, flags in sample if store.find_board(squares, flags | 1 << 30) is None)
+    misses = time.perf_counter() - start
+    print(f"lookups: {len(sample) / hits:,.0f}/s for stored positions ({found:,} found), "
+          f"{len(sample) / misses:,.0f}/s for missing ones ({missing:,} missing)")
+
+
+def bench_eval(positions=300, depth=4, seed=1):
+    """Print evaluation calls per second at the leaves of a make / evaluate / unmake walk over random-game positions:
+        search.positional_eval and full_eval recomputing from the board, and an EvalBoard keeping its score up to
+        date. Also prints search speed to a depth with each evaluation.
+        Parameters: positions, depth (for the search comparison), and seed
+        Returns: None"""
+    import random
+    import time
+    from evaluation import EvalBoard, PawnHashTable, full_eval, incremental_eval
+    from search import Searcher, TranspositionTable, positional_eval
+
+    rng = random.Random(seed)
+    boards = []
+    board = FastBoard()
+    while len(boards) < positions:
+        if board.get_state() or board.get_ply() > 80:
+            board = FastBoard()
+        boards.append(board.copy())
+        board.make_move(board.random_move(rng))
+
+    def walk(board, evaluate):
+        calls = 0
+        for move in board.generate_moves():
+            board.make_move(move)
+            evaluate(board)
+            board.unmake_move()
+            calls += 1
+        return calls
+
+    pawn_table = PawnHashTable()
+
+    def evaluating(board):
+        return EvalBoard.from_board(board, pawn_table)
+
+    print(f"{'evaluation':>16} {'calls/s':>10}  (make + evaluate + unmake)")
+    for name, evaluate, wrap in (('positional_eval', positional_eval, FastBoard.copy),
+                                 ('full_eval', full_eval, FastBoard.copy),
+                                 ('EvalBoard', incremental_eval, evaluating)):
+        prepared = [wrap(board) for board in boards]
+        start = time.perf_counter()
+        calls = sum(walk(board, evaluate) for board in prepared)
+        print(f"{name:>16} {calls / (time.perf_counter() - start):>10,.0f}")
+    print(f"pawn hash table hit rate: {pawn_table.get_stats()['hit_rate']:.1%}")
+
+    for name, evaluate, board in (('full_eval', full_eval, FastBoard()),
+                                  ('EvalBoard', incremental_eval, EvalBoard())):
+        searcher = Searcher(TranspositionTable(1 << 16), evaluate)
+        start = time.perf_counter()
+        searcher.search(board, depth)
+        seconds = time.perf_counter() - start
+        print(f"search to depth {depth} with {name}: {searcher.get_nodes() / seconds:,.0f} nodes/s")
+
+
+def bench_canonical(depth=4):
+    """Print how many table entries color-flip canonicalization saves: for a small tablebase-style set (king and
+        queen against king on files a-d, either side owning the queen, either side to move), and for a move cache
+        over every position of a perft tree.
+        Parameters: depth (of the perft tree)
+        Returns: None"""
+    import time
+    from canonical import CanonicalMoveCache, canonical_key
+    from movecache import MoveCache
+    from movegen import KING, QUEEN, BLACK
+
+    plain, canonical = set(), set()
+    squares = [file + 8 * rank for rank in range(8) for file in range(4)]
+    start = time.perf_counter()
+    for white_king in squares:
+        for black_king in squares:
+            for queen in squares:
+                if len({white_king, black_king, queen}) < 3:
+                    continue
+                for owner in (0, BLACK):
+                    pieces = bytearray(64)
+                    pieces[white_king], pieces[black_king], pieces[queen] = KING, KING | BLACK, QUEEN | owner
+                    for turn in (0, 1):
+                        board = FastBoard.from_bytes(bytes(pieces) + bytes((turn, 0, 0, 0, 0)))
+                        plain.add(board.get_hash())
+                        canonical.add(canonical_key(board))
+    seconds = time.perf_counter() - start
+    print(f"tablebase set: {len(plain):,} positions -> {len(canonical):,} canonical "
+          f"({len(canonical) / len(plain):.0%}), {len(plain) / seconds:,.0f} positions/s")
+
+    caches = {'plain': MoveCache(10 ** 7), 'canonical': CanonicalMoveCache(MoveCache(10 ** 7))}
+
+    def walk(board, depth):
+        for cache in caches.values():
+            cache.get_moves(board)
+        if depth:
+            for move in board.generate_moves():
+                board.make_move(move)
+                walk(board, depth - 1)
+                board.unmake_move()
+
+    walk(FastBoard(), depth)
+    for name, cache in caches.items():
+        stats = (cache if name == 'plain' else cache.get_cache()).get_stats()
+        print(f"{name:>9} move cache over the perft {depth} tree: {stats['entries']:,} entries, "
+              f"hit rate {stats['hit_rate']:.1%}")
+
+
+def bench_analysis(positions=20, seconds=0.5, seed=1):
+    """Print the time to first result of the streaming analysis API for the first job after the worker starts and
+        for retargeting to new positions mid-search, the time from cancelling a job to the worker stopping, and how
+        deep each job got.
+        Parameters: positions (random-game positions to retarget to), seconds (each job runs this long before the
+            next one replaces it), and seed
+        Returns: None"""
+    import asyncio
+    import random
+    import time
+    from analysis import AnalysisEngine
+
+    rng = random.Random(seed)
+    boards = []
+    board = FastBoard()
+    while len(boards) < positions:
+        if board.get_state() or board.get_ply() > 60:
+            board = FastBoard()
+        board.make_move(board.random_move(rng))
+        if rng.random() < 0.2:
+            boards.append(board.copy())
+
+    async def run():
+        start = time.perf_counter()
+        async with AnalysisEngine() as engine:
+            stream = engine.analyze(FastBoard(), max_depth=4)
+            async for _ in stream:
+                pass
+            print(f"first job: {stream.get_time_to_first_result() * 1000:.1f} ms to first result "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms including worker start and depth 4)")
+            firsts, stops, depths = [], [], []
+            for board in boards:
+                stream = engine.analyze(board)
+                depth = 0
+                deadline = time.perf_counter() + seconds
+                while time.perf_counter() < deadline:
+                    try:
+                        update = await asyncio.wait_for(stream.__anext__(), deadline - time.perf_counter())
+                    except (asyncio.TimeoutError, StopAsyncIteration):
+                        break
+                    depth = update['depth']
+                stream.cancel()
+                stops.append(await stream.wait_stopped())
+                firsts.append(stream.get_time_to_first_result())
+                depths.append(depth)
+        firsts.sort()
+        stops = sorted(stop for stop in stops if stop is not None)
+        print(f"retargeting: time to first result median {firsts[len(firsts) // 2] * 1000:.1f} ms, "
+              f"max {firsts[-1] * 1000:.1f} ms; cancel to stop median {stops[len(stops) // 2] * 1000:.1f} ms, "
+              f"max {stops[-1] * 1000:.1f} ms; depth in {seconds} s: {min(depths)}-{max(depths)}")
+
+    asyncio.run(run())
+
+
+BENCHMARKS = {
+    'analysis': bench_analysis,
+    'batch_eval': bench_batch_eval,
+    'batch_movegen': bench_batch_movegen,
+    'canonical': bench_canonical,
+    'checkpoint': bench_checkpoint,
+    'contention': bench_contention,
+    'drops': bench_drops,
+    'eval': bench_eval,
+    'export': bench_export,
+    'fuzz': bench_fuzz,
+    'gamedb': bench_gamedb,
+    'lazy_smp': bench_lazy_smp,
+    'mcts': bench_mcts,
+    'memory': bench_memory,
+    'move_cache': bench_move_cache,
+    'observers': bench_observers,
+    'position_store': bench_position_store,
+    'reject': bench_reject,
+    'shared_games': bench_shared_games,
+    'snapshot': bench_snapshot,
+    'startup': bench_startup,
+    'tactics': bench_tactics,
+    'tournament': bench_tournament,
+    'trace': bench_trace,
+    'workqueue': bench_workqueue,
+}
+
+
+def main(args):
+    """Run the benchmark named in args, or list the benchmarks.
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    if not args or args[0] not in BENCHMARKS:
+        print("benchmarks: " + ', '.join(sorted(BENCHMARKS)))
+        return
+    BENCHMARKS[args[0]]()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
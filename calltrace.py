@@ -0,0 +1,396 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Trace capture and latency-regression replay for ChessVar. A TraceRecorder wraps live games so every
+#              public call is logged with its game, arguments, result, and duration as a 12-byte binary record
+#              (squares and fairy letters are one byte each; anything else is stored inline after the record, and
+#              list results are stored as a CRC-32 of their items).
+#              replay_trace makes the same calls against a given ChessVar build and reports, per method, how many
+#              calls returned something different, latency percentiles and histograms, and the change in throughput
+#              against the recorded run. Run python calltrace.py replay TRACE [BUILD_DIRECTORY] to compare a build.
+
+import json
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+from movegen import SQUARE_NAMES, GAME_STATES
+from position import PIECE_CODES
+
+MAGIC = b'CVTRACE1'
+RECORD = struct.Struct('<IBBBBI')  # game, method, first argument, second argument, result, nanoseconds
+METHODS = ('make_move', 'enter_fairy_piece', 'get_game_state', 'get_turn', 'get_square', 'get_lost_pieces',
+           'get_fairy_stored', 'get_legal_drops')
+METHOD_CODES = {name: code for code, name in enumerate(METHODS)}
+
+# argument codes: squares are 0-63, then the fairy letters and colors; anything else is stored inline
+ARGUMENT_WORDS = SQUARE_NAMES + ('F', 'H', 'f', 'h', 'w', 'b')
+ARGUMENT_CODES = {word: code for code, word in enumerate(ARGUMENT_WORDS)}
+INLINE = 254
+NO_ARGUMENT = 255
+
+# result codes: booleans, None, the game states, the turns, a piece on a square (by piece code), other values
+RESULT_WORDS = (False, True, None) + GAME_STATES + ('WHITE', 'BLACK')
+OTHER_RESULT = 8
+PIECE_RESULT = 9  # plus the piece code
+LIST_RESULT = 253  # followed inline by a CRC-32 of the list's items (encoded as LIST_RESULT | crc << 8)
+DIGEST = struct.Struct('<I')
+EXCEPTION_RESULT = 255
+MAX_NANOSECONDS = 0xFFFFFFFF
+FLUSH_BYTES = 1 << 16
+
+
+def _encode_result(value):
+    """Encode a call's result as one byte, plus a digest above the low byte for lists (such as lost pieces or
+        legal drops), so a replay notices when a list changes.
+        Parameters: value
+        Returns: int"""
+    if isinstance(value, list):
+        return LIST_RESULT | zlib.crc32('\n'.join(str(item) for item in value).encode('utf-8')) << 8
+    if value is None or value is True or value is False:
+        return RESULT_WORDS.index(value)
+    if isinstance(value, str):
+        return RESULT_WORDS.index(value, 3) if value in RESULT_WORDS[3:] else OTHER_RESULT
+    code = PIECE_CODES.get(str(value)) if hasattr(value, 'get_piece_type') else None
+    return PIECE_RESULT + code if code is not None else OTHER_RESULT
+
+
+def _encode_arguments(arguments):
+    """Encode up to two call arguments, returning their codes and the inline bytes of any that have no code.
+        Parameters: arguments (tuple)
+        Returns: (first code, second code, inline bytes)"""
+    codes = []
+    inline = b''
+    for index in range(2):
+        if index >= len(arguments):
+            codes.append(NO_ARGUMENT)
+            continue
+        code = ARGUMENT_CODES.get(arguments[index]) if isinstance(arguments[index], str) else None
+        if code is None:
+            data = str(arguments[index]).encode('utf-8')[:255]
+            inline += bytes((len(data),)) + data
+            code = INLINE
+        codes.append(code)
+    return codes[0], codes[1], inline
+
+
+class TraceRecorder:
+    """A TraceRecorder object writes a binary trace of ChessVar calls. It is responsible for handing out traced
+        games, buffering their records, and appending them to the trace file. Games on several threads may share
+        one recorder."""
+
+    def __init__(self, path):
+        """Initialize a recorder that writes a new trace file.
+            Parameters: path
+            Returns: None"""
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._games = 0
+        self._calls = 0
+
+    def wrap(self, game):
+        """Return a traced version of a game; every public call on it is recorded.
+            Parameters: game (ChessVar)
+            Returns: TracedChessVar"""
+        with self._lock:
+            game_number = self._games
+            self._games += 1
+        return TracedChessVar(game, self, game_number)
+
+    def record(self, game_number, method, arguments, result, nanoseconds):
+        """Add one call to the trace.
+            Parameters: game_number, method (name in METHODS), arguments (tuple), result (encoded), and nanoseconds
+            Returns: None"""
+        first, second, inline = _encode_arguments(arguments)
+        data = RECORD.pack(game_number, METHOD_CODES[method], first, second, result & 0xFF,
+                           min(nanoseconds, MAX_NANOSECONDS)) + inline
+        if result & 0xFF == LIST_RESULT:
+            data += DIGEST.pack(result >> 8)
+        with self._lock:
+            self._buffer += data
+            self._calls += 1
+            if len(self._buffer) >= FLUSH_BYTES:
+                self._file.write(self._buffer)
+                self._buffer = bytearray()
+
+    def get_call_count(self):
+        """Return how many calls have been recorded.
+            Parameters: None
+            Returns: int"""
+        return self._calls
+
+    def close(self):
+        """Write any buffered records and close the trace file.
+            Parameters: None
+            Returns: None"""
+        with self._lock:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+            self._file.close()
+
+    def __enter__(self):
+        """Return the recorder for use in a with statement.
+            Parameters: None
+            Returns: TraceRecorder"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the trace at the end of a with statement.
+            Parameters: exc_type, exc_value, and traceback
+            Returns: None"""
+        self.close()
+
+
+class TracedChessVar:
+    """A TracedChessVar object stands in for a ChessVar game. It is responsible for passing every public call to
+        the game and recording the call, its result, and how long it took."""
+
+    def __init__(self, game, recorder, game_number):
+        """Initialize a traced game.
+            Parameters: game (ChessVar), recorder (TraceRecorder), and game_number
+            Returns: None"""
+        self._game = game
+        self._recorder = recorder
+        self._game_number = game_number
+
+    def _traced(self, method, *arguments):
+        """Make a call on the game and record it, including calls that raise.
+            Parameters: method (name in METHODS) and the call's arguments
+            Returns: the call's result"""
+        function = getattr(self._game, method)
+        start = time.perf_counter_ns()
+        try:
+            result = function(*arguments)
+        except Exception:
+            self._recorder.record(self._game_number, method, arguments, EXCEPTION_RESULT,
+                                  time.perf_counter_ns() - start)
+            raise
+        nanoseconds = time.perf_counter_ns() - start
+        self._recorder.record(self._game_number, method, arguments, _encode_result(result), nanoseconds)
+        return result
+
+    def make_move(self, moved_from, move_to):
+        """Call ChessVar.make_move on the game and record it.
+            Parameters: moved_from and move_to
+            Returns: True or False"""
+        return self._traced('make_move', moved_from, move_to)
+
+    def enter_fairy_piece(self, piece_type, move_to):
+        """Call ChessVar.enter_fairy_piece on the game and record it.
+            Parameters: piece_type and move_to
+            Returns: True or False"""
+        return self._traced('enter_fairy_piece', piece_type, move_to)
+
+    def get_game_state(self):
+        """Call ChessVar.get_game_state on the game and record it.
+            Parameters: None
+            Returns: 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'"""
+        return self._traced('get_game_state')
+
+    def get_turn(self):
+        """Call ChessVar.get_turn on the game and record it.
+            Parameters: None
+            Returns: 'WHITE' or 'BLACK'"""
+        return self._traced('get_turn')
+
+    def get_square(self, square):
+        """Call ChessVar.get_square on the game and record it.
+            Parameters: square
+            Returns: ChessPiece or None"""
+        return self._traced('get_square', square)
+
+    def get_lost_pieces(self, color):
+        """Call ChessVar.get_lost_pieces on the game and record it.
+            Parameters: color
+            Returns: list of ChessPiece"""
+        return self._traced('get_lost_pieces', color)
+
+    def get_fairy_stored(self, piece_type):
+        """Call ChessVar.get_fairy_stored on the game and record it.
+            Parameters: piece_type
+            Returns: True or False"""
+        return self._traced('get_fairy_stored', piece_type)
+
+    def get_legal_drops(self):
+        """Call ChessVar.get_legal_drops on the game and record it.
+            Parameters: None
+            Returns: list of (piece_type, square) tuples"""
+        return self._traced('get_legal_drops')
+
+    def get_game(self):
+        """Return the game being traced.
+            Parameters: None
+            Returns: ChessVar"""
+        return self._game
+
+
+def read_trace(path):
+    """Read every call in a trace.
+        Parameters: path
+        Returns: generator of (game number, method, arguments tuple, result code, nanoseconds)"""
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a ChessVar trace")
+    offset = len(MAGIC)
+    while offset < len(data):
+        game_number, method, first, second, result, nanoseconds = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        arguments = []
+        for code in (first, second):
+            if code == NO_ARGUMENT:
+                continue
+            if code == INLINE:
+                length = data[offset]
+                arguments.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+                offset += 1 + length
+            else:
+                arguments.append(ARGUMENT_WORDS[code])
+        if result == LIST_RESULT:
+            result |= DIGEST.unpack_from(data, offset)[0] << 8
+            offset += DIGEST.size
+        yield game_number, METHODS[method], tuple(arguments), result, nanoseconds
+
+
+# run in the replay process: load this file as calltrace (the build may have its own), replay with anything the
+# build prints kept out of the way, then print the report
+REPLAY_SCRIPT = """
+import contextlib, importlib.util, io, json, sys
+spec = importlib.util.spec_from_file_location('calltrace', sys.argv[1])
+calltrace = sys.modules['calltrace'] = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(calltrace)
+with contextlib.redirect_stdout(io.StringIO()):
+    report = calltrace.replay_trace(sys.argv[2])
+print(json.dumps(report))
+"""
+
+
+def replay_build(path, directory):
+    """Replay a trace against the build in a checkout directory. The replay runs in a new Python process that
+        imports from the build directory first, so the build's ChessVar runs with the build's own movegen,
+        position, and every other module it imports (even lazily); modules the build does not have come from this
+        tree.
+        Parameters: path and directory
+        Returns: the report of replay_trace"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    directory = os.path.abspath(directory)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([directory, here]))
+    output = subprocess.run([sys.executable, '-c', REPLAY_SCRIPT, os.path.join(here, 'calltrace.py'),
+                             os.path.abspath(path)], cwd=directory, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    report = json.loads(output)
+    for method, stats in report.items():
+        if method != 'total':
+            stats['histogram'] = {int(bound): count for bound, count in stats['histogram'].items()}
+    return report
+
+
+def _percentile(ordered, fraction):
+    """Return a percentile of a sorted list.
+        Parameters: ordered and fraction (0 to 1)
+        Returns: value"""
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] if ordered else 0
+
+
+def _histogram(ordered):
+    """Count durations in power-of-two nanosecond buckets.
+        Parameters: ordered (durations)
+        Returns: dict of bucket upper bound in nanoseconds -> count"""
+    buckets = {}
+    for nanoseconds in ordered:
+        bound = 1 << max(nanoseconds, 1).bit_length()
+        buckets[bound] = buckets.get(bound, 0) + 1
+    return dict(sorted(buckets.items()))
+
+
+def replay_trace(path, game_class=None):
+    """Make every call of a trace against a ChessVar build, one new game per traced game, and compare results and
+        latencies with the recording.
+        Parameters: path and game_class (ChessVar class to replay against, the current one by default; see
+            replay_build for another build)
+        Returns: dict of method -> dict with calls, mismatches, recorded and replayed latency stats (p50, p99,
+            mean in ns) and replayed histogram, plus a 'total' entry with calls, mismatches, recorded and replayed
+            calls per second, and throughput_change"""
+    if game_class is None:
+        from ChessVar import ChessVar as game_class
+    games = {}
+    recorded = {}
+    replayed = {}
+    mismatches = {}
+    perf_counter_ns = time.perf_counter_ns
+    for game_number, method, arguments, result, nanoseconds in read_trace(path):
+        game = games.get(game_number)
+        if game is None:
+            game = games[game_number] = game_class()
+        start = perf_counter_ns()
+        try:
+            # an older build may not have every method; that counts as a call that raised
+            value = getattr(game, method)(*arguments)
+        except Exception:
+            value = EXCEPTION_RESULT
+        elapsed = perf_counter_ns() - start
+        got = value if value is EXCEPTION_RESULT else _encode_result(value)
+        recorded.setdefault(method, []).append(nanoseconds)
+        replayed.setdefault(method, []).append(elapsed)
+        if got != result:
+            mismatches[method] = mismatches.get(method, 0) + 1
+
+    report = {}
+    for method in recorded:
+        before = sorted(recorded[method])
+        after = sorted(replayed[method])
+        report[method] = {
+            'calls': len(after), 'mismatches': mismatches.get(method, 0),
+            'recorded': {'p50': _percentile(before, 0.5), 'p99': _percentile(before, 0.99),
+                         'mean': sum(before) / len(before)},
+            'replayed': {'p50': _percentile(after, 0.5), 'p99': _percentile(after, 0.99),
+                         'mean': sum(after) / len(after)},
+            'histogram': _histogram(after)}
+    calls = sum(len(durations) for durations in replayed.values())
+    recorded_seconds = sum(sum(durations) for durations in recorded.values()) / 1e9
+    replayed_seconds = sum(sum(durations) for durations in replayed.values()) / 1e9
+    before_rate = calls / recorded_seconds if recorded_seconds else 0.0
+    after_rate = calls / replayed_seconds if replayed_seconds else 0.0
+    report['total'] = {'calls': calls, 'mismatches': sum(mismatches.values()), 'recorded_per_second': before_rate,
+                       'replayed_per_second': after_rate,
+                       'throughput_change': after_rate / before_rate - 1 if before_rate else 0.0}
+    return report
+
+
+def format_report(report):
+    """Format a replay report as a table, one line per method plus a total.
+        Parameters: report (from replay_trace)
+        Returns: str"""
+    lines = [f"{'method':>18} {'calls':>9} {'diff':>5} {'p50 ns':>15} {'p99 ns':>17} {'mean change':>12}"]
+    for method, stats in sorted(report.items()):
+        if method == 'total':
+            continue
+        before, after = stats['recorded'], stats['replayed']
+        change = after['mean'] / before['mean'] - 1 if before['mean'] else 0.0
+        lines.append(f"{method:>18} {stats['calls']:>9} {stats['mismatches']:>5} "
+                     f"{before['p50']:>7}->{after['p50']:<7} {before['p99']:>8}->{after['p99']:<8} {change:>+11.1%}")
+    total = report['total']
+    lines.append(f"total: {total['calls']} calls, {total['mismatches']} different results, "
+                 f"{total['recorded_per_second']:,.0f} -> {total['replayed_per_second']:,.0f} calls/s "
+                 f"({total['throughput_change']:+.1%})")
+    return '\n'.join(lines)
+
+
+def main(args):
+    """Replay a trace from the command line: python calltrace.py replay TRACE [BUILD_DIRECTORY]
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    if len(args) < 2 or args[0] != 'replay':
+        print("usage: python calltrace.py replay TRACE [BUILD_DIRECTORY]")
+        return
+    print(format_report(replay_build(args[1], args[2]) if len(args) > 2 else replay_trace(args[1])))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,180 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Color-flip canonicalization. The variant is symmetric under swapping the colors and mirroring the
+#              ranks: pawns, falcons, and hunters move "forward" for their own side, the home ranks for fairy pieces
+#              mirror, and the starting position is its own mirror image. So a position with black to move plays
+#              exactly like its flipped twin with white to move, and tables keyed by position (transposition tables,
+#              move caches, opening books, tablebases) only need to store positions with white to move. canonical
+#              returns a position in that orientation along with the transform, and transform_move maps moves
+#              between the two orientations (the flip is its own inverse).
+
+from movegen import FastBoard, BLACK, WHITE_WON, BLACK_WON, DROP_SHIFT, UNFINISHED
+from position import Position
+
+IDENTITY = 0
+COLOR_FLIP = 1
+
+# piece code -> the same piece for the other color (0 stays empty)
+FLIPPED_CODES = tuple(code ^ BLACK if code else 0 for code in range(32))
+FLIPPED_STATES = {UNFINISHED: UNFINISHED, WHITE_WON: BLACK_WON, BLACK_WON: WHITE_WON}
+
+
+def flip_reserve(reserve):
+    """Swap the white and black fairy reserve bits.
+        Parameters: reserve
+        Returns: int"""
+    return ((reserve & 3) << 2) | (reserve >> 2)
+
+
+def flip_squares(squares):
+    """Swap the colors of the pieces and mirror the ranks of a board.
+        Parameters: squares (64 piece codes, a1 first)
+        Returns: list of 64 piece codes"""
+    flipped = [0] * 64
+    for square, code in enumerate(squares):
+        if code:
+            flipped[square ^ 56] = FLIPPED_CODES[code]
+    return flipped
+
+
+def flip_board(board):
+    """Return the color-flipped twin of a FastBoard (without its undo history).
+        Parameters: board (FastBoard)
+        Returns: FastBoard"""
+    flipped = FastBoard.__new__(FastBoard)
+    flipped._squares = flip_squares(board.get_squares())
+    flipped._turn = board.get_turn() ^ 1
+    flipped._state = FLIPPED_STATES[board.get_state()]
+    flipped._reserve = flip_reserve(board.get_reserve())
+    flipped._lost = [board.get_lost(1), board.get_lost(0)]
+    flipped._history = []
+    flipped._hash = flipped.compute_hash()
+    return flipped
+
+
+def flip_position(position):
+    """Return the color-flipped twin of a Position snapshot.
+        Parameters: position (Position)
+        Returns: Position"""
+    pawn_flags = int.from_bytes(position.get_pawn_flags().to_bytes(8, 'little'), 'big')  # square ^ 56 on every bit
+    return Position(bytes(flip_squares(position.get_board())), position.get_turn() ^ 1,
+                    FLIPPED_STATES[position.get_state()], flip_reserve(position.get_reserve()),
+                    bytes(FLIPPED_CODES[code] for code in position.get_lost(1)),
+                    bytes(FLIPPED_CODES[code] for code in position.get_lost(0)), pawn_flags)
+
+
+def canonical(position):
+    """Return a position in canonical orientation (white to move) and the transform that got it there. Applying
+        the same transform to the canonical position, or to moves found for it, gives back the original.
+        Parameters: position (FastBoard or Position)
+        Returns: (FastBoard or Position, IDENTITY or COLOR_FLIP)"""
+    if not position.get_turn():
+        return position, IDENTITY
+    if isinstance(position, Position):
+        return flip_position(position), COLOR_FLIP
+    return flip_board(position), COLOR_FLIP
+
+
+def canonical_key(board):
+    """Return the Zobrist hash of a FastBoard's canonical orientation, for keying tables by canonical position.
+        Parameters: board (FastBoard)
+        Returns: int"""
+    return flip_board(board).get_hash() if board.get_turn() else board.get_hash()
+
+
+def transform_move(move, transform):
+    """Map a move int from one orientation to the other (or leave it for IDENTITY).
+        Parameters: move and transform
+        Returns: int"""
+    if transform == IDENTITY or move is None:
+        return move
+    drop = move >> DROP_SHIFT
+    if drop:
+        return ((drop ^ BLACK) << DROP_SHIFT) | ((((move >> 6) & 63) ^ 56) << 6)
+    return ((move & 63) ^ 56) | ((((move >> 6) & 63) ^ 56) << 6)
+
+
+def transform_state(state, transform):
+    """Map a game state (as an index into GAME_STATES) from one orientation to the other. Scores from the side to
+        move's point of view need no mapping.
+        Parameters: state and transform
+        Returns: int"""
+    return state if transform == IDENTITY else FLIPPED_STATES[state]
+
+
+class CanonicalMoveCache:
+    """A CanonicalMoveCache object puts a MoveCache in front of canonical positions. It is responsible for looking
+        up the canonical twin of each position and mapping its cached moves back, so a position and its twin share
+        one entry."""
+
+    def __init__(self, cache):
+        """Initialize an adapter over a move cache.
+            Parameters: cache (MoveCache)
+            Returns: None"""
+        self._cache = cache
+
+    def get_cache(self):
+        """Return the move cache underneath.
+            Parameters: None
+            Returns: MoveCache"""
+        return self._cache
+
+    def get_moves(self, board):
+        """Return the legal moves of a position from the cache entry of its canonical twin.
+            Parameters: board (FastBoard)
+            Returns: frozenset of move ints"""
+        if not board.get_turn():
+            return self._cache.get_moves(board)
+        return frozenset(transform_move(move, COLOR_FLIP) for move in self._cache.get_moves(flip_board(board)))
+
+    def get_move_list(self, board):
+        """Return the legal moves of a position as a sorted list.
+            Parameters: board (FastBoard)
+            Returns: list of move ints"""
+        return sorted(self.get_moves(board))
+
+    def is_legal(self, board, move):
+        """Return whether a move is legal, answered from the canonical cache entry.
+            Parameters: board (FastBoard) and move
+            Returns: True or False"""
+        if not board.get_turn():
+            return self._cache.is_legal(board, move)
+        return transform_move(move, COLOR_FLIP) in self._cache.get_moves(flip_board(board))
+
+
+class CanonicalTable:
+    """A CanonicalTable object puts a TranspositionTable (or anything with the same probe and store methods) in
+        front of canonical positions. It is responsible for keying entries by canonical hash and mapping stored
+        best moves between orientations."""
+
+    def __init__(self, table):
+        """Initialize an adapter over a table.
+            Parameters: table (TranspositionTable)
+            Returns: None"""
+        self._table = table
+
+    def get_table(self):
+        """Return the table underneath.
+            Parameters: None
+            Returns: TranspositionTable"""
+        return self._table
+
+    def probe(self, board):
+        """Look up a position by its canonical twin.
+            Parameters: board (FastBoard)
+            Returns: (move, score, depth, flag) with the move in the board's orientation, or None"""
+        transform = COLOR_FLIP if board.get_turn() else IDENTITY
+        entry = self._table.probe(canonical_key(board))
+        if entry is None or transform == IDENTITY:
+            return entry
+        move, score, depth, flag = entry
+        return transform_move(move, transform), score, depth, flag
+
+    def store(self, board, move, score, depth, flag):
+        """Store a search result under the position's canonical twin.
+            Parameters: board (FastBoard), move (in the board's orientation), score (side to move's view), depth,
+                and flag
+            Returns: None"""
+        transform = COLOR_FLIP if board.get_turn() else IDENTITY
+        self._table.store(canonical_key(board), transform_move(move, transform), score, depth, flag)
@@ -0,0 +1,139 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Bulk checkpoint and warm restart of live games. A checkpoint is one file written with one sequential
+#              write: a header, one fixed-size CompactChessVar record per game, and the game ids as JSON. Restoring
+#              memory-maps the file and only reads the ids, so it takes about as long as loading the ids; each game
+#              is turned back into a ChessVar (or a CompactChessVar) the first time it is looked up.
+
+import json
+import mmap
+import os
+import struct
+import time
+
+from ChessVar import ChessVar
+from compact import CompactChessVar, RECORD_SIZE
+
+MAGIC = b'CVCKPT01'
+HEADER = struct.Struct('<8sIIQ')  # magic, game count, record size, byte length of the ids
+
+
+def _record(game):
+    """Return the compact record of a live game.
+        Parameters: game (ChessVar, CompactChessVar, or anything else with a snapshot method)
+        Returns: bytes"""
+    if isinstance(game, CompactChessVar):
+        return game.to_bytes()
+    return CompactChessVar.from_position(game.snapshot()).to_bytes()
+
+
+def write_checkpoint(path, games):
+    """Write every live game to a checkpoint file, replacing it only once the new file is complete.
+        Parameters: path and games (dict of game id -> game; ids must be JSON values)
+        Returns: dict with games, bytes, and seconds"""
+    start = time.perf_counter()
+    ids = json.dumps(list(games), separators=(',', ':')).encode('utf-8')
+    parts = [HEADER.pack(MAGIC, len(games), RECORD_SIZE, len(ids))]
+    parts.extend(_record(game) for game in games.values())
+    parts.append(ids)
+    data = b''.join(parts)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + '.tmp', path)
+    return {'games': len(games), 'bytes': len(data), 'seconds': time.perf_counter() - start}
+
+
+class RestoredGames:
+    """A RestoredGames object gives access to the games of a checkpoint by id. It is responsible for mapping the
+        checkpoint file into memory and building each game from its record the first time it is looked up, then
+        handing back that same object afterwards."""
+
+    def __init__(self, path, compact=False):
+        """Open a checkpoint. Games are built as ChessVar objects, or as CompactChessVar objects with compact=True.
+            Parameters: path and compact
+            Returns: None"""
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, record_size, ids_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a checkpoint this version can read")
+        ids_start = HEADER.size + count * record_size
+        ids = json.loads(self._map[ids_start:ids_start + ids_length])
+        self._index = {game_id: index for index, game_id in enumerate(ids)}
+        self._compact = compact
+        self._games = {}
+
+    def __getitem__(self, game_id):
+        """Return a game, building it from its record on first access.
+            Parameters: game_id
+            Returns: ChessVar or CompactChessVar"""
+        game = self._games.get(game_id)
+        if game is None:
+            start = HEADER.size + self._index[game_id] * RECORD_SIZE
+            game = CompactChessVar.from_bytes(self._map[start:start + RECORD_SIZE])
+            if not self._compact:
+                game = ChessVar.from_snapshot(game.to_position())
+            self._games[game_id] = game
+        return game
+
+    def get(self, game_id, default=None):
+        """Return a game, or default if the checkpoint does not have it.
+            Parameters: game_id and default
+            Returns: ChessVar, CompactChessVar, or default"""
+        if game_id not in self._index:
+            return default
+        return self[game_id]
+
+    def __contains__(self, game_id):
+        """Return whether the checkpoint has a game.
+            Parameters: game_id
+            Returns: True or False"""
+        return game_id in self._index
+
+    def __len__(self):
+        """Return the number of games in the checkpoint.
+            Parameters: None
+            Returns: int"""
+        return len(self._index)
+
+    def __iter__(self):
+        """Iterate over the game ids, in checkpoint order.
+            Parameters: None
+            Returns: iterator"""
+        return iter(self._index)
+
+    def get_materialized_count(self):
+        """Return how many games have been built so far.
+            Parameters: None
+            Returns: int"""
+        return len(self._games)
+
+    def materialize_all(self):
+        """Build every game that has not been built yet, for example before closing the checkpoint.
+            Parameters: None
+            Returns: dict of game id -> game"""
+        for game_id in self._index:
+            self[game_id]
+        return dict(self._games)
+
+    def close(self):
+        """Close the memory map and the file. Games already built stay usable.
+            Parameters: None
+            Returns: None"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        """Return the restored games for use in a with statement.
+            Parameters: None
+            Returns: RestoredGames"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the checkpoint at the end of a with statement.
+            Parameters: exc_type, exc_value, and traceback
+            Returns: None"""
+        self.close()
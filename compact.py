@@ -0,0 +1,264 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A compact storage mode for ChessVar games, for servers that keep a very large number of idle games in
+#              memory. A CompactChessVar is a 64-byte bytearray board of FastBoard piece codes plus one int bitfield
+#              (turn, game state, fairy reserve, fairy eligibility, and pawn double-step flags), with no piece
+#              objects. It plays by the same rules and has the same make_move / enter_fairy_piece /
+#              get_game_state methods as ChessVar. The lost piece lists are not kept, only how many queens, rooks,
+#              bishops, and knights each player lost (capped at two, which is all fairy eligibility needs).
+
+from movegen import FastBoard, BLACK, TYPE_MASK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, FALCON, HUNTER, \
+    MAJOR_TYPES, FAIRY_LETTERS, RESERVE_BITS, FULL_RESERVE, GAME_STATES, WHITE_WON, BLACK_WON, SQUARE_NAMES, \
+    SQUARE_INDEX, add_piece_moves
+from position import Position, CODE_NAMES
+
+# layout of the bitfield
+TURN_BIT = 1  # set when black is to move
+STATE_SHIFT = 1  # 2 bits: index into GAME_STATES
+STATE_MASK = 3 << STATE_SHIFT
+RESERVE_SHIFT = 3  # 4 bits: fairy pieces still stored
+RESERVE_MASK = 15 << RESERVE_SHIFT
+LOST_SHIFT = (7, 9)  # 2 bits per color: major pieces lost, capped at 2
+PAWN_SHIFT = 11  # 16 bits: white pawns on files a-h, then black pawns, that may still move two spaces
+PAWN_MASK = 0xFFFF << PAWN_SHIFT
+START_FLAGS = (FULL_RESERVE << RESERVE_SHIFT) | PAWN_MASK
+
+# byte size of to_bytes(): the board followed by the bitfield as 4 little-endian bytes
+RECORD_SIZE = 68
+
+_START_BOARD = bytes(FastBoard().get_squares())
+
+# how many of each piece type a player starts with on the board
+START_COUNTS = ((PAWN, 8), (KNIGHT, 2), (BISHOP, 2), (ROOK, 2), (QUEEN, 1), (KING, 1))
+
+
+def _pawn_bit(from_sq, color):
+    """Return the bitfield bit for the double-step flag of a pawn on its starting square.
+        Parameters: from_sq and color (0 or BLACK)
+        Returns: int, or 0 if the square is not a starting square for that color"""
+    if color:
+        return 1 << (PAWN_SHIFT + 8 + from_sq - 48) if 48 <= from_sq < 56 else 0
+    return 1 << (PAWN_SHIFT + from_sq - 8) if 8 <= from_sq < 16 else 0
+
+
+class CompactChessVar:
+    """A CompactChessVar object is a chess game stored in well under 1 KB. It is responsible for the same rules as
+        ChessVar, working directly on its bytearray board and bitfield."""
+
+    __slots__ = ('_board', '_flags')
+
+    def __init__(self):
+        """Initialize a game at the starting position.
+            Parameters: None
+            Returns: None"""
+        self._board = bytearray(_START_BOARD)
+        self._flags = START_FLAGS
+
+    @classmethod
+    def from_game(cls, game):
+        """Build a compact game from a ChessVar game.
+            Parameters: game (ChessVar)
+            Returns: CompactChessVar"""
+        board = FastBoard.from_game(game)
+        compact = cls.__new__(cls)
+        compact._board = bytearray(board.get_squares())
+        flags = board.get_turn() | (board.get_state() << STATE_SHIFT) | (board.get_reserve() << RESERVE_SHIFT)
+        for turn in (0, 1):
+            flags |= min(board.get_lost(turn), 2) << LOST_SHIFT[turn]
+        for index, name in enumerate(SQUARE_NAMES):
+            piece = game.get_square(name)
+            if piece is not None and piece.get_piece_type() == 'p' and piece.get_pawn_move():
+                flags |= _pawn_bit(index, BLACK if piece.get_color() == 'b' else 0)
+        compact._flags = flags
+        return compact
+
+    @classmethod
+    def from_position(cls, position):
+        """Build a compact game from a Position snapshot.
+            Parameters: position (Position)
+            Returns: CompactChessVar"""
+        compact = cls.__new__(cls)
+        compact._board = bytearray(position.get_board())
+        flags = position.get_turn() | (position.get_state() << STATE_SHIFT) | (position.get_reserve() << RESERVE_SHIFT)
+        for turn in (0, 1):
+            lost = sum(1 for code in position.get_lost(turn) if code & TYPE_MASK in MAJOR_TYPES)
+            flags |= min(lost, 2) << LOST_SHIFT[turn]
+        pawn_flags = position.get_pawn_flags()
+        for file in range(8):
+            if pawn_flags >> (8 + file) & 1:
+                flags |= _pawn_bit(8 + file, 0)
+            if pawn_flags >> (48 + file) & 1:
+                flags |= _pawn_bit(48 + file, BLACK)
+        compact._flags = flags
+        return compact
+
+    @classmethod
+    def from_fast_board(cls, board):
+        """Build a compact game from a FastBoard. A FastBoard lets every pawn on its starting rank move two spaces,
+            so those are the pawns that get a double-step flag.
+            Parameters: board (FastBoard)
+            Returns: CompactChessVar"""
+        compact = cls.__new__(cls)
+        squares = board.get_squares()
+        compact._board = bytearray(squares)
+        flags = board.get_turn() | (board.get_state() << STATE_SHIFT) | (board.get_reserve() << RESERVE_SHIFT)
+        for turn in (0, 1):
+            flags |= min(board.get_lost(turn), 2) << LOST_SHIFT[turn]
+        for file in range(8):
+            if squares[8 + file] == PAWN:
+                flags |= _pawn_bit(8 + file, 0)
+            if squares[48 + file] == PAWN | BLACK:
+                flags |= _pawn_bit(48 + file, BLACK)
+        compact._flags = flags
+        return compact
+
+    def to_position(self):
+        """Build a Position snapshot of this game. Only the number of lost major pieces is stored, so the lost
+            piece lists are worked out from what is missing from the board (no piece ever comes back, since there
+            is no promotion): the starting pieces plus the fairy pieces entered, less the pieces still on the board,
+            and the king of a player who lost. They are listed by piece type, not in the order they were lost.
+            Parameters: None
+            Returns: Position"""
+        board = self._board
+        flags = self._flags
+        reserve = (flags & RESERVE_MASK) >> RESERVE_SHIFT
+        state = (flags & STATE_MASK) >> STATE_SHIFT
+        lost = []
+        for color in (0, BLACK):
+            counts = dict(START_COUNTS)
+            for kind in (FALCON, HUNTER):
+                counts[kind] = 0 if reserve & RESERVE_BITS[kind | color] else 1
+            for code in board:
+                if code and (code & BLACK) == color:
+                    counts[code & TYPE_MASK] -= 1
+            if state == (BLACK_WON if color == 0 else WHITE_WON):
+                counts[KING] += 1  # the captured king stays on the board when the game ends
+            lost.append(bytes(kind | color for kind, count in sorted(counts.items()) for _ in range(count)))
+        pawn_flags = 0
+        for file in range(8):
+            if flags & _pawn_bit(8 + file, 0):
+                pawn_flags |= 1 << (8 + file)
+            if flags & _pawn_bit(48 + file, BLACK):
+                pawn_flags |= 1 << (48 + file)
+        return Position(board, flags & TURN_BIT, state, reserve, lost[0], lost[1], pawn_flags)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a game from the RECORD_SIZE bytes made by to_bytes.
+            Parameters: data (bytes-like)
+            Returns: CompactChessVar"""
+        compact = cls.__new__(cls)
+        compact._board = bytearray(data[:64])
+        compact._flags = int.from_bytes(data[64:RECORD_SIZE], 'little')
+        return compact
+
+    def to_bytes(self):
+        """Return the game as RECORD_SIZE bytes: the board, then the bitfield.
+            Parameters: None
+            Returns: bytes"""
+        return bytes(self._board) + self._flags.to_bytes(4, 'little')
+
+    def to_fast_board(self):
+        """Build a FastBoard for searching from this game.
+            Parameters: None
+            Returns: FastBoard"""
+        board = FastBoard.__new__(FastBoard)
+        board._squares = list(self._board)
+        board._turn = self._flags & TURN_BIT
+        board._state = (self._flags & STATE_MASK) >> STATE_SHIFT
+        board._reserve = (self._flags & RESERVE_MASK) >> RESERVE_SHIFT
+        board._lost = [(self._flags >> LOST_SHIFT[turn]) & 3 for turn in (0, 1)]
+        board._history = []
+        board._hash = board.compute_hash()
+        return board
+
+    def get_game_state(self):
+        """Return unfinished when a game is in progress, or which color won if the game is over.
+            Parameters: None
+            Returns: 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'"""
+        return GAME_STATES[(self._flags & STATE_MASK) >> STATE_SHIFT]
+
+    def get_turn(self):
+        """Return whose turn it is.
+            Parameters: None
+            Returns: 'WHITE' or 'BLACK'"""
+        return 'BLACK' if self._flags & TURN_BIT else 'WHITE'
+
+    def get_square(self, square):
+        """Return the piece on a spot as its color and type ('wq', 'bK', ...), or None if the spot is empty.
+            Parameters: square
+            Returns: str or None"""
+        code = self._board[SQUARE_INDEX[square]]
+        return CODE_NAMES[code] if code else None
+
+    def make_move(self, moved_from, move_to):
+        """Move a piece the same way ChessVar.make_move does, including ending the game (without moving the piece)
+            when a king is captured.
+            Parameters: moved_from and move_to
+            Returns: True or False"""
+        flags = self._flags
+        if flags & STATE_MASK:
+            return False
+        from_sq = SQUARE_INDEX.get(moved_from)
+        to_sq = SQUARE_INDEX.get(move_to)
+        if from_sq is None or to_sq is None:
+            return False
+        board = self._board
+        piece = board[from_sq]
+        color = BLACK if flags & TURN_BIT else 0
+        if not piece or (piece & BLACK) != color:
+            return False
+        moves = []
+        add_piece_moves(board, from_sq, piece, color, moves)
+        if from_sq | (to_sq << 6) not in moves:
+            return False
+        if piece & TYPE_MASK == PAWN and abs(to_sq - from_sq) == 16 and not flags & _pawn_bit(from_sq, color):
+            return False
+
+        captured = board[to_sq]
+        if captured:
+            loser = 1 if captured & BLACK else 0
+            if captured & TYPE_MASK in MAJOR_TYPES:
+                lost = (flags >> LOST_SHIFT[loser]) & 3
+                if lost < 2:
+                    flags += 1 << LOST_SHIFT[loser]
+            if captured & TYPE_MASK == KING:
+                # the king was taken: the game ends and the board is left as it was
+                self._flags = (flags & ~STATE_MASK) | ((BLACK_WON if loser == 0 else WHITE_WON) << STATE_SHIFT)
+                return True
+            if captured & TYPE_MASK == PAWN:
+                flags &= ~_pawn_bit(to_sq, captured & BLACK)
+        board[to_sq] = piece
+        board[from_sq] = 0
+        if piece & TYPE_MASK == PAWN:
+            flags &= ~_pawn_bit(from_sq, color)
+        self._flags = flags ^ TURN_BIT
+        return True
+
+    def enter_fairy_piece(self, piece_type, move_to):
+        """Enter a falcon or hunter the same way ChessVar.enter_fairy_piece does.
+            Parameters: piece_type ('F', 'H', 'f', or 'h') and move_to
+            Returns: True or False"""
+        flags = self._flags
+        if flags & STATE_MASK or piece_type not in FAIRY_LETTERS:
+            return False
+        to_sq = SQUARE_INDEX.get(move_to)
+        if to_sq is None or self._board[to_sq]:
+            return False
+        piece, bit = FAIRY_LETTERS[piece_type]
+        turn = flags & TURN_BIT
+        if (1 if piece & BLACK else 0) != turn:
+            return False
+        if not (to_sq >= 48 if turn else to_sq < 16):
+            return False
+        reserve = (flags & RESERVE_MASK) >> RESERVE_SHIFT
+        if not reserve & bit:
+            return False
+        stored = (reserve >> (2 * turn)) & 3
+        placed = 2 - (stored & 1) - (stored >> 1)
+        if (flags >> LOST_SHIFT[turn]) & 3 <= placed:
+            return False
+        self._board[to_sq] = piece
+        self._flags = (flags & ~(bit << RESERVE_SHIFT)) ^ TURN_BIT
+        return True
@@ -0,0 +1,258 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Incremental static evaluation for searches. An EvalBoard is a FastBoard that keeps its material and
+#              piece-square score up to date as moves are made and unmade, instead of adding up all 64 squares at
+#              every node. Falcons and hunters count on the board like any other piece, and fairy pieces still in
+#              reserve are worth something too (more once their owner may enter them). Pawn structure (doubled,
+#              isolated, and passed pawns) is scored from the pawns alone, so it is cached in a bounded pawn hash
+#              table keyed by a hash of the pawns only.
+
+from movegen import FastBoard, BLACK, TYPE_MASK, PAWN, KING, HUNTER, ZOBRIST_PIECES, DROP_SHIFT
+from search import PIECE_VALUES, PIECE_SQUARE_TABLES
+
+# a stored fairy piece is worth less than one on the board, since entering it costs a move
+RESERVE_VALUE = 150
+ELIGIBLE_RESERVE_VALUE = 300
+
+# pawn structure terms (there is no promotion, so a passed pawn is worth less than in standard chess)
+DOUBLED_PAWN = -12
+ISOLATED_PAWN = -10
+PASSED_PAWN = (0, 0, 5, 10, 15, 25, 35, 0)  # by ranks advanced from the pawn's own side
+
+DEFAULT_PAWN_TABLE_ENTRIES = 1 << 14
+
+
+def _build_square_scores():
+    """Build the material plus piece-square score of every piece code on every square, from white's point of view
+        (black pieces score negative and use the square mirrored across the middle rank).
+        Parameters: None
+        Returns: tuple of 32 tuples of 64 ints, indexed by piece code and then square"""
+    scores = [(0,) * 64] * 32
+    for kind in range(PAWN, HUNTER + 1):
+        table = PIECE_SQUARE_TABLES[kind]
+        scores[kind] = tuple(PIECE_VALUES[kind] + table[square] for square in range(64))
+        scores[kind | BLACK] = tuple(-PIECE_VALUES[kind] - table[square ^ 56] for square in range(64))
+    return tuple(scores)
+
+
+def _build_reserve_scores():
+    """Build the reserve score, from white's point of view, for every reserve and count of lost major pieces
+        (capped at two), using the same eligibility rule as FastBoard.fairy_eligible.
+        Parameters: None
+        Returns: tuple indexed by reserve * 9 + white lost * 3 + black lost"""
+    scores = []
+    for reserve in range(16):
+        for white_lost in range(3):
+            for black_lost in range(3):
+                score = 0
+                for turn, lost, sign in ((0, white_lost, 1), (1, black_lost, -1)):
+                    stored = (reserve >> (2 * turn)) & 3
+                    placed = 2 - (stored & 1) - (stored >> 1)
+                    value = ELIGIBLE_RESERVE_VALUE if lost > placed else RESERVE_VALUE
+                    score += sign * value * ((stored & 1) + (stored >> 1))
+                scores.append(score)
+    return tuple(scores)
+
+
+SQUARE_SCORES = _build_square_scores()
+RESERVE_SCORES = _build_reserve_scores()
+
+
+def pawn_structure(squares):
+    """Score the pawn structure from white's point of view: doubled and isolated pawns cost, passed pawns gain.
+        Parameters: squares (64 piece codes)
+        Returns: int"""
+    files = ([0] * 10, [0] * 10)  # by color, a bitmask of the ranks with a pawn on each file (padded by one file)
+    for square, code in enumerate(squares):
+        if code & TYPE_MASK == PAWN:
+            files[1 if code & BLACK else 0][(square & 7) + 1] |= 1 << (square >> 3)
+    score = 0
+    for color, sign in ((0, 1), (1, -1)):
+        own, other = files[color], files[1 - color]
+        for file in range(1, 9):
+            ranks = own[file]
+            if not ranks:
+                continue
+            count = bin(ranks).count('1')
+            score += sign * DOUBLED_PAWN * (count - 1)
+            if not own[file - 1] and not own[file + 1]:
+                score += sign * ISOLATED_PAWN * count
+            blockers = other[file - 1] | other[file] | other[file + 1]
+            while ranks:
+                rank = (ranks & -ranks).bit_length() - 1
+                ranks &= ranks - 1
+                if color == 0 and not blockers >> (rank + 1):
+                    score += PASSED_PAWN[rank]
+                elif color == 1 and not blockers & ((1 << rank) - 1):
+                    score -= PASSED_PAWN[7 - rank]
+    return score
+
+
+def pawn_hash(squares):
+    """Compute the hash of the pawns alone, using the FastBoard Zobrist keys of the pawn codes.
+        Parameters: squares
+        Returns: int"""
+    key = 0
+    for square, code in enumerate(squares):
+        if code & TYPE_MASK == PAWN:
+            key ^= ZOBRIST_PIECES[code][square]
+    return key
+
+
+class PawnHashTable:
+    """A PawnHashTable object caches pawn structure scores by pawn hash. It is responsible for a fixed number of
+        entries (a new entry replaces whatever was in its slot) and for counting hits and misses."""
+
+    def __init__(self, entries=DEFAULT_PAWN_TABLE_ENTRIES):
+        """Initialize an empty table. entries is rounded up to a power of two.
+            Parameters: entries
+            Returns: None"""
+        size = 1
+        while size < entries:
+            size *= 2
+        self._mask = size - 1
+        self._keys = [None] * size
+        self._scores = [0] * size
+        self._hits = 0
+        self._misses = 0
+
+    def probe(self, key, squares):
+        """Return the pawn structure score of a position, computing and storing it on a miss.
+            Parameters: key (pawn hash) and squares
+            Returns: int"""
+        index = key & self._mask
+        if self._keys[index] == key:
+            self._hits += 1
+            return self._scores[index]
+        self._misses += 1
+        score = pawn_structure(squares)
+        self._keys[index] = key
+        self._scores[index] = score
+        return score
+
+    def get_stats(self):
+        """Return the table's size and hit rate.
+            Parameters: None
+            Returns: dict with entries, hits, misses, and hit_rate"""
+        probes = self._hits + self._misses
+        return {'entries': self._mask + 1, 'hits': self._hits, 'misses': self._misses,
+                'hit_rate': self._hits / probes if probes else 0.0}
+
+
+def full_eval(board):
+    """Score a position from scratch with every term EvalBoard uses (material, piece-square, reserve, and pawn
+        structure), from the side to move's point of view. EvalBoard.evaluate returns the same score.
+        Parameters: board (FastBoard)
+        Returns: int"""
+    squares = board.get_squares()
+    score = 0
+    for square, code in enumerate(squares):
+        if code:
+            score += SQUARE_SCORES[code][square]
+    score += RESERVE_SCORES[board.get_reserve() * 9 + min(board.get_lost(0), 2) * 3 + min(board.get_lost(1), 2)]
+    score += pawn_structure(squares)
+    return -score if board.get_turn() else score
+
+
+class EvalBoard(FastBoard):
+    """An EvalBoard object is a FastBoard that keeps its evaluation up to date. It is responsible for updating the
+        material and piece-square score and the pawn hash on every make_move and restoring them on unmake_move,
+        and for scoring the position from those and a shared pawn hash table."""
+
+    def __init__(self, pawn_table=None):
+        """Initialize a board at the starting position.
+            Parameters: pawn_table (PawnHashTable, a new one by default)
+            Returns: None"""
+        super().__init__()
+        self._start_eval(pawn_table)
+
+    def _start_eval(self, pawn_table):
+        """Compute the incremental terms from scratch.
+            Parameters: pawn_table
+            Returns: None"""
+        self._pawn_table = pawn_table if pawn_table is not None else PawnHashTable()
+        squares = self._squares
+        self._score = sum(SQUARE_SCORES[code][square] for square, code in enumerate(squares) if code)
+        self._pawn_hash = pawn_hash(squares)
+        self._eval_history = []
+
+    @classmethod
+    def from_board(cls, board, pawn_table=None):
+        """Build an evaluating board from a FastBoard (or a ChessVar game).
+            Parameters: board (FastBoard or ChessVar) and pawn_table
+            Returns: EvalBoard"""
+        if not isinstance(board, FastBoard):
+            board = FastBoard.from_game(board)
+        evaluating = cls.__new__(cls)
+        evaluating.__dict__.update(board.copy().__dict__)
+        evaluating._start_eval(pawn_table)
+        return evaluating
+
+    def copy(self):
+        """Return an independent copy of this board (without the undo history) sharing the pawn hash table.
+            Parameters: None
+            Returns: EvalBoard"""
+        evaluating = EvalBoard.__new__(EvalBoard)
+        evaluating.__dict__.update(FastBoard.copy(self).__dict__)
+        evaluating._pawn_table = self._pawn_table
+        evaluating._score = self._score
+        evaluating._pawn_hash = self._pawn_hash
+        evaluating._eval_history = []
+        return evaluating
+
+    def make_move(self, move):
+        """Make a move and update the score and pawn hash.
+            Parameters: move
+            Returns: the captured piece code (0 if none)"""
+        squares = self._squares
+        score = self._score
+        key = self._pawn_hash
+        self._eval_history.append((score, key))
+        to_sq = (move >> 6) & 63
+        drop = move >> DROP_SHIFT
+        if drop:
+            score += SQUARE_SCORES[drop][to_sq]
+        else:
+            from_sq = move & 63
+            piece = squares[from_sq]
+            captured = squares[to_sq]
+            if captured & TYPE_MASK != KING:
+                score += SQUARE_SCORES[piece][to_sq] - SQUARE_SCORES[piece][from_sq] - SQUARE_SCORES[captured][to_sq]
+                if piece & TYPE_MASK == PAWN:
+                    key ^= ZOBRIST_PIECES[piece][from_sq] ^ ZOBRIST_PIECES[piece][to_sq]
+                if captured & TYPE_MASK == PAWN:
+                    key ^= ZOBRIST_PIECES[captured][to_sq]
+        self._score = score
+        self._pawn_hash = key
+        return FastBoard.make_move(self, move)
+
+    def unmake_move(self):
+        """Take back the last move and restore the score and pawn hash.
+            Parameters: None
+            Returns: None"""
+        FastBoard.unmake_move(self)
+        self._score, self._pawn_hash = self._eval_history.pop()
+
+    def get_pawn_table(self):
+        """Return the pawn hash table this board uses.
+            Parameters: None
+            Returns: PawnHashTable"""
+        return self._pawn_table
+
+    def evaluate(self):
+        """Score the position from the side to move's point of view.
+            Parameters: None
+            Returns: int"""
+        lost = self._lost
+        score = (self._score + self._pawn_table.probe(self._pawn_hash, self._squares)
+                 + RESERVE_SCORES[self._reserve * 9 + (lost[0] if lost[0] < 2 else 2) * 3
+                                  + (lost[1] if lost[1] < 2 else 2)])
+        return -score if self._turn else score
+
+
+def incremental_eval(board):
+    """Score an EvalBoard from its incremental terms; use as a Searcher's evaluate function.
+        Parameters: board (EvalBoard)
+        Returns: int"""
+    return board.evaluate()
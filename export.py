@@ -0,0 +1,198 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Streaming export of game archives to training tensors. Every position of every archived game becomes
+#              one example: its feature planes (batch.feature_planes), the next move played as a FastBoard move int,
+#              and the game's final get_game_state() result. Examples are written in shards of a fixed number of
+#              positions as .npy files, so memory stays constant however large the archive is. Shards are planned
+#              up front from the move counts in the archive and exported in parallel by a process pool. The plan
+#              is saved in manifest.json before any shard is written, and a shard is skipped only when its files
+#              exist, its saved plan matches the new one, and it holds as many positions as planned, so an
+#              interrupted export resumes where it stopped and an export of a grown archive redoes the shards
+#              that changed.
+
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from archive import parse_move_name
+from batch import BoardBatch, feature_planes, PLANE_NAMES
+from compact import CompactChessVar, RECORD_SIZE
+from movegen import SQUARE_INDEX, FAIRY_LETTERS, GAME_STATES, make_drop
+
+DEFAULT_SHARD_SIZE = 16384
+SHARD_FILES = ('moves', 'results', 'planes')  # written in this order, so a shard is done once its planes exist
+MANIFEST_NAME = 'manifest.json'
+
+
+def move_label(name):
+    """Convert an archived move name to the FastBoard move int used as its label.
+        Parameters: name (such as 'e2e4' or 'F@c1')
+        Returns: int"""
+    method, first, second = parse_move_name(name)
+    if method == 'enter_fairy_piece':
+        return make_drop(FAIRY_LETTERS[first][0], SQUARE_INDEX[second])
+    return SQUARE_INDEX[first] | (SQUARE_INDEX[second] << 6)
+
+
+def shard_path(directory, shard, name):
+    """Return the path of one of a shard's files.
+        Parameters: directory, shard (number), and name (one of SHARD_FILES)
+        Returns: str"""
+    return os.path.join(directory, f"shard-{shard:05d}.{name}.npy")
+
+
+def plan_shards(archive_path, shard_size=DEFAULT_SHARD_SIZE):
+    """Split an archive into shards of shard_size positions without replaying any games, using the number of moves
+        in each record. Each shard starts at a game's byte offset in the archive, skipping some of its first
+        positions when the previous shard ended in the middle of that game.
+        Parameters: archive_path and shard_size
+        Returns: list of (shard, byte offset, positions to skip, positions to export)"""
+    shards = []
+    offset = 0
+    start = None  # (byte offset, skip) where the shard being planned starts
+    filled = 0
+    with open(archive_path, 'rb') as file:
+        for line in file:
+            if line.strip():
+                positions = len(json.loads(line)['moves'])
+                skip = 0
+                while positions - skip > 0:
+                    if start is None:
+                        start = (offset, skip)
+                    taken = min(positions - skip, shard_size - filled)
+                    filled += taken
+                    skip += taken
+                    if filled == shard_size:
+                        shards.append((len(shards), start[0], start[1], filled))
+                        start = None
+                        filled = 0
+            offset += len(line)
+    if filled:
+        shards.append((len(shards), start[0], start[1], filled))
+    return shards
+
+
+def _export_shard(task):
+    """Replay the games of one shard and write its .npy files. Used by export_archive, also in worker processes.
+        Parameters: task (archive path, output directory, and a shard from plan_shards)
+        Returns: number of positions written"""
+    archive_path, directory, (shard, offset, skip, count) = task
+    records = bytearray(count * RECORD_SIZE)
+    moves = np.zeros(count, dtype=np.int32)
+    results = np.zeros(count, dtype=np.int8)
+    filled = 0
+    with open(archive_path, 'rb') as file:
+        file.seek(offset)
+        while filled < count:
+            line = file.readline()
+            if not line:
+                raise ValueError(f"the archive ended {count - filled} positions before the end of shard {shard}; "
+                                 f"it changed after the shards were planned")
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            result = GAME_STATES.index(record['result'])
+            game = CompactChessVar()
+            for ply, name in enumerate(record['moves']):
+                if ply >= skip:
+                    records[filled * RECORD_SIZE:(filled + 1) * RECORD_SIZE] = game.to_bytes()
+                    moves[filled] = move_label(name)
+                    results[filled] = result
+                    filled += 1
+                    if filled == count:
+                        break
+                method, first, second = parse_move_name(name)
+                if not getattr(game, method)(first, second):
+                    raise ValueError(f"illegal archived move {name} at ply {ply} of game {record['id']}")
+            skip = 0
+
+    # write each file under a temporary name first so a shard is never seen half written
+    planes = feature_planes(BoardBatch.from_records(bytes(records)))
+    for name, array in zip(SHARD_FILES, (moves, results, planes)):
+        path = shard_path(directory, shard, name)
+        with open(path + '.tmp', 'wb') as file:
+            np.save(file, array)
+        os.replace(path + '.tmp', path)
+    return count
+
+
+def _read_manifest(directory):
+    """Read the manifest of an earlier export to a directory.
+        Parameters: directory
+        Returns: dict, or None if there is no readable manifest"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(directory, shard_size, shards):
+    """Write the manifest describing the planes and the shard plan, under a temporary name first.
+        Parameters: directory, shard_size, and shards (from plan_shards)
+        Returns: None"""
+    manifest = {'planes': list(PLANE_NAMES), 'shard_size': shard_size, 'shards': len(shards),
+                'positions': sum(shard[3] for shard in shards), 'files': list(SHARD_FILES),
+                'results': list(GAME_STATES), 'plan': [list(shard[1:]) for shard in shards]}
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def _shard_done(directory, shard, saved_plan):
+    """Check whether a shard's files were written by an earlier export for the same plan.
+        Parameters: directory, shard (from plan_shards), and saved_plan (the plan list of the earlier manifest)
+        Returns: True or False"""
+    number, offset, skip, count = shard
+    if number >= len(saved_plan) or saved_plan[number] != [offset, skip, count]:
+        return False
+    try:
+        return all(np.load(shard_path(directory, number, name), mmap_mode='r').shape[0] == count
+                   for name in SHARD_FILES)
+    except (OSError, ValueError):
+        return False
+
+
+def export_archive(archive_path, directory, shard_size=DEFAULT_SHARD_SIZE, processes=None):
+    """Export every position of an archive to .npy shards in a directory. Shards written by an earlier export are
+        kept if they match the new plan and exported again otherwise. manifest.json describing the planes and the
+        shard plan is written before the shards.
+        Parameters: archive_path, directory, shard_size, and processes (default: one per CPU)
+        Returns: dict with shards, skipped, positions, seconds, and positions_per_second"""
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    shards = plan_shards(archive_path, shard_size)
+    saved = _read_manifest(directory)
+    saved_plan = saved.get('plan', []) if saved and saved.get('shard_size') == shard_size else []
+    tasks = [(archive_path, directory, shard) for shard in shards if not _shard_done(directory, shard, saved_plan)]
+    # remove what is left of the shards to redo before the new plan is saved, so that an export interrupted from
+    # here on never finds an old shard listed under the new plan
+    for _, _, shard in tasks:
+        for name in SHARD_FILES:
+            path = shard_path(directory, shard[0], name)
+            if os.path.exists(path):
+                os.remove(path)
+    _write_manifest(directory, shard_size, shards)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(processes, len(tasks))) as pool:
+            positions = sum(pool.imap_unordered(_export_shard, tasks))
+    else:
+        positions = sum(_export_shard(task) for task in tasks)
+    seconds = time.perf_counter() - start
+    return {'shards': len(tasks), 'skipped': len(shards) - len(tasks), 'positions': positions, 'seconds': seconds,
+            'positions_per_second': positions / seconds if seconds else 0.0}
+
+
+def load_shard(directory, shard):
+    """Load one exported shard.
+        Parameters: directory and shard (number)
+        Returns: tuple of (planes, moves, results) arrays"""
+    moves, results, planes = (np.load(shard_path(directory, shard, name)) for name in SHARD_FILES)
+    return planes, moves, results
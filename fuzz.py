@@ -0,0 +1,254 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A differential fuzzing harness that checks the alternative game engines against the reference
+#              ChessVar.make_move / enter_fairy_piece. Each case is a random sequence of calls from a new game: legal
+#              moves to reach new positions, mixed with moves off the board, moves of the wrong color, blocked and
+#              impossible moves, moves after the game is over, and fairy entries with every kind of eligibility
+#              problem. Every call is made on the reference and on the engine, and the result (or exception), board,
+#              turn, game state, fairy reserve, and pawn flags are compared. A failing case is shrunk to a shortest
+#              sequence of calls that still diverges. Cases run in parallel in a process pool.
+
+import contextlib
+import io
+import multiprocessing
+import random
+import sys
+import time
+
+from ChessVar import ChessVar
+from compact import CompactChessVar
+from movecache import MoveCache
+from movegen import FastBoard, SQUARE_NAMES, BLACK
+from threadsafe import ThreadSafeChessVar
+
+DEFAULT_CASE_LENGTH = 400
+JUNK_SQUARES = ('i1', 'a9', 'a0', 'e10', 'A1', '', 'e', 'e2e4', '11')
+FAIRY_TYPES = ('F', 'H', 'f', 'h')
+JUNK_FAIRY_TYPES = ('K', 'q', 'x', '', 'FH')
+
+_shared_cache = None
+
+
+def _cached_game():
+    """Create a ChessVar that answers moves from a move cache shared by the whole process.
+        Parameters: None
+        Returns: ChessVar"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = MoveCache(max_entries=50000)
+    game = ChessVar()
+    game.set_move_cache(_shared_cache)
+    return game
+
+
+def _observe_snapshot(game):
+    """Return the observable state of a game that has a snapshot method.
+        Parameters: game
+        Returns: tuple of (board bytes, turn, state, reserve, pawn flags)"""
+    position = game.snapshot()
+    return (position.get_board(), position.get_turn(), position.get_state(), position.get_reserve(),
+            position.get_pawn_flags())
+
+
+def _observe_compact(game):
+    """Return the observable state of a CompactChessVar.
+        Parameters: game (CompactChessVar)
+        Returns: tuple of (board bytes, turn, state, reserve, pawn flags)"""
+    position = game.to_position()
+    return (position.get_board(), position.get_turn(), position.get_state(), position.get_reserve(),
+            position.get_pawn_flags())
+
+
+# engine name -> (function that creates a new game, function that observes its state)
+REFERENCE = (ChessVar, _observe_snapshot)
+ENGINES = {
+    'compact': (CompactChessVar, _observe_compact),
+    'move_cache': (_cached_game, _observe_snapshot),
+    'threadsafe': (ThreadSafeChessVar, _observe_snapshot),
+}
+
+
+def _call(game, call):
+    """Make one call on a game, catching any exception so it can be compared.
+        Parameters: game and call ((method, first, second))
+        Returns: True, False, or the exception's class name"""
+    method, first, second = call
+    try:
+        return bool(getattr(game, method)(first, second))
+    except Exception as error:
+        return type(error).__name__
+
+
+def _random_call(rng, board):
+    """Pick a random call to try on a position, of a random kind.
+        Parameters: rng (random.Random) and board (FastBoard of the reference position)
+        Returns: (method, first, second)"""
+    kind = rng.random()
+    squares = board.get_squares()
+    color = BLACK if board.get_turn() else 0
+    if kind < 0.35:
+        move = board.random_move(rng)
+        if move is not None:
+            return board.to_chess_var_move(move)
+    if kind < 0.55:
+        return 'make_move', rng.choice(SQUARE_NAMES + JUNK_SQUARES), rng.choice(SQUARE_NAMES + JUNK_SQUARES)
+    if kind < 0.85:
+        # a piece of the side to move (or, a third of the time, of the other side) going anywhere
+        wanted = color if rng.random() < 0.67 else color ^ BLACK
+        pieces = [index for index, code in enumerate(squares) if code and (code & BLACK) == wanted]
+        if pieces:
+            return 'make_move', SQUARE_NAMES[rng.choice(pieces)], rng.choice(SQUARE_NAMES)
+    letter = rng.choice(FAIRY_TYPES) if rng.random() < 0.9 else rng.choice(JUNK_FAIRY_TYPES)
+    if rng.random() < 0.7:
+        square = SQUARE_NAMES[rng.choice((rng.randrange(16), 48 + rng.randrange(16)))]
+    else:
+        square = rng.choice(SQUARE_NAMES + JUNK_SQUARES)
+    return 'enter_fairy_piece', letter, square
+
+
+def first_divergence(engine, calls):
+    """Make a sequence of calls on a new reference game and a new engine game, and find the first call after which
+        they differ.
+        Parameters: engine (name in ENGINES) and calls (list of (method, first, second))
+        Returns: (index, reference outcome, engine outcome), or None if they never differ"""
+    create, observe = ENGINES[engine]
+    reference, engine_game = REFERENCE[0](), create()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, call in enumerate(calls):
+            expected = (_call(reference, call), REFERENCE[1](reference))
+            got = (_call(engine_game, call), observe(engine_game))
+            if expected != got:
+                return index, expected, got
+    return None
+
+
+def run_case(engine, seed, length=DEFAULT_CASE_LENGTH):
+    """Generate and run one random case.
+        Parameters: engine (name in ENGINES), seed, and length (number of calls)
+        Returns: (number of calls made, failing calls up to the divergence or None)"""
+    rng = random.Random(seed)
+    create, observe = ENGINES[engine]
+    reference, engine_game = REFERENCE[0](), create()
+    board = FastBoard()
+    calls = []
+    finished_calls = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        while len(calls) < length:
+            call = _random_call(rng, board)
+            calls.append(call)
+            result = _call(reference, call)
+            if (result, REFERENCE[1](reference)) != (_call(engine_game, call), observe(engine_game)):
+                return len(calls), calls
+            if result is True:
+                method, first, second = call
+                board.make_move(board.to_move(first, second) if method == 'make_move' else board.to_drop(first, second))
+            if board.get_state():
+                # try a few calls after the game is over, then start a new game
+                finished_calls += 1
+                if finished_calls > 5:
+                    reference, engine_game, board, finished_calls = REFERENCE[0](), create(), FastBoard(), 0
+                    calls.append(('new_game', None, None))
+    return len(calls), None
+
+
+def _run_case_task(task):
+    """Run one case in a worker process.
+        Parameters: task ((engine, seed, length))
+        Returns: (engine, seed, calls made, failing calls or None)"""
+    engine, seed, length = task
+    made, failure = run_case(engine, seed, length)
+    return engine, seed, made, failure
+
+
+def _split_games(calls):
+    """Keep only the calls after the last new game marker, since a divergence only depends on its own game.
+        Parameters: calls
+        Returns: list of calls"""
+    for index in range(len(calls) - 1, -1, -1):
+        if calls[index][0] == 'new_game':
+            return calls[index + 1:]
+    return calls
+
+
+def shrink(engine, calls):
+    """Shrink a failing sequence of calls to a short one that still diverges, by removing chunks of calls (halving
+        the chunk size when nothing can be removed) and cutting everything after the divergence.
+        Parameters: engine (name in ENGINES) and calls (a failing sequence)
+        Returns: list of calls"""
+    calls = _split_games(calls)
+    found = first_divergence(engine, calls)
+    if found is None:
+        return calls
+    calls = calls[:found[0] + 1]
+    chunk = max(len(calls) // 2, 1)
+    while True:
+        removed = False
+        index = 0
+        while index < len(calls) - 1:
+            trial = calls[:index] + calls[index + chunk:]
+            found = first_divergence(engine, trial) if trial else None
+            if found is not None:
+                calls = trial[:found[0] + 1]
+                removed = True
+            else:
+                index += chunk
+        if chunk == 1 and not removed:
+            return calls
+        if not removed:
+            chunk = max(chunk // 2, 1)
+
+
+def format_reproducer(engine, calls):
+    """Write a shrunk failure as Python code that replays it.
+        Parameters: engine (name in ENGINES) and calls
+        Returns: str"""
+    index, expected, got = first_divergence(engine, calls)
+    lines = [f"# {engine} diverges from ChessVar at call {index}: expected {expected[0]!r}, got {got[0]!r}"
+             + ('' if expected[0] != got[0] else ' (different board, turn, state, reserve, or pawn flags)')]
+    for method, first, second in calls:
+        lines.append(f"game.{method}({first!r}, {second!r})")
+    return '\n'.join(lines)
+
+
+def fuzz(engines=None, cases=1000, length=DEFAULT_CASE_LENGTH, processes=None, seed=0):
+    """Run random cases against each engine in a process pool and shrink every failure.
+        Parameters: engines (names in ENGINES, all by default), cases (per engine), length (calls per case),
+            processes (default: one per CPU), and seed
+        Returns: dict with calls, seconds, calls_per_second, and failures (list of (engine, seed, reproducer))"""
+    if engines is None:
+        engines = sorted(ENGINES)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    tasks = [(engine, seed * 1000003 + case, length) for engine in engines for case in range(cases)]
+    start = time.perf_counter()
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            results = list(pool.imap_unordered(_run_case_task, tasks, chunksize=4))
+    else:
+        results = [_run_case_task(task) for task in tasks]
+    seconds = time.perf_counter() - start
+    calls = sum(result[2] for result in results)
+    failures = []
+    for engine, case_seed, _, failure in sorted(results, key=lambda result: (result[0], result[1])):
+        if failure is not None:
+            failures.append((engine, case_seed, format_reproducer(engine, shrink(engine, failure))))
+    return {'calls': calls, 'seconds': seconds, 'calls_per_second': calls / seconds if seconds else 0.0,
+            'failures': failures}
+
+
+def main(args):
+    """Run the fuzzer from the command line: python fuzz.py [cases per engine] [engine ...]
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    cases = int(args[0]) if args else 1000
+    engines = args[1:] or None
+    summary = fuzz(engines, cases)
+    print(f"{summary['calls']:,} calls in {summary['seconds']:.1f} s ({summary['calls_per_second']:,.0f} calls/s), "
+          f"{len(summary['failures'])} failures")
+    for engine, case_seed, reproducer in summary['failures']:
+        print(f"\n# seed {case_seed}\n{reproducer}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
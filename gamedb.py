@@ -0,0 +1,215 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A position-indexed database of archived games. Ingesting a game replays it once on a FastBoard and
+#              records every position hash it reached, and every falcon or hunter entry, with the game and ply. The
+#              entries are written as sorted segments of fixed-size records, which queries memory-map and binary
+#              search, so finding every game that reached a position takes milliseconds without replaying the
+#              archive. New games go into new segments (the index is built incrementally), and compact merges the
+#              segments back into one.
+
+import json
+import os
+import time
+
+import numpy as np
+
+from archive import read_games
+from export import move_label
+from movegen import FastBoard, DROP_SHIFT, SQUARE_INDEX, FAIRY_LETTERS
+
+ENTRY_TYPE = np.dtype([('key', '<u8'), ('game', '<u4'), ('ply', '<u4')])
+INDEXES = ('positions', 'drops')
+DEFAULT_FLUSH_ENTRIES = 1 << 20
+
+
+def drop_key(piece_type, square):
+    """Return the index key of a fairy piece entry.
+        Parameters: piece_type ('F', 'H', 'f', or 'h') and square
+        Returns: int"""
+    return (FAIRY_LETTERS[piece_type][0] << 6) | SQUARE_INDEX[square]
+
+
+class GameDatabase:
+    """A GameDatabase object is an on-disk index from positions and fairy piece entries to the games and plies
+        where they happened. It is responsible for ingesting games, writing sorted index segments, answering
+        queries from memory-mapped segments, and keeping statistics on its size and build rate."""
+
+    def __init__(self, directory, flush_entries=DEFAULT_FLUSH_ENTRIES):
+        """Open the database in a directory, creating it if needed. Entries are buffered in memory and written as a
+            new segment once there are flush_entries of them.
+            Parameters: directory and flush_entries
+            Returns: None"""
+        self._directory = directory
+        self._flush_entries = flush_entries
+        os.makedirs(directory, exist_ok=True)
+        self._games = []  # archive game ids, by game number
+        games_path = os.path.join(directory, 'games.jsonl')
+        if os.path.exists(games_path):
+            with open(games_path, encoding='utf-8') as file:
+                self._games = [json.loads(line) for line in file if line.strip()]
+        self._segments = {name: [] for name in INDEXES}  # memory-mapped entries of the live segments
+        self._live = []  # numbers of the live segments
+        self._next_segment = 0
+        manifest_path = os.path.join(directory, 'index.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as file:
+                manifest = json.load(file)
+            for segment in manifest['segments']:
+                self._open_segment(segment)
+            if len(self._games) > manifest['games']:
+                # games written after the last manifest were never indexed
+                self._games = self._games[:manifest['games']]
+                with open(games_path, 'w', encoding='utf-8') as file:
+                    file.writelines(json.dumps(game_id) + '\n' for game_id in self._games)
+        self._pending = {name: [] for name in INDEXES}
+        self._pending_games = []
+        self._ingest_seconds = 0.0
+        self._ingested_positions = 0
+
+    def _segment_path(self, name, segment):
+        """Return the path of one index segment.
+            Parameters: name (one of INDEXES) and segment (number)
+            Returns: str"""
+        return os.path.join(self._directory, f"{name}-{segment:05d}.npy")
+
+    def _open_segment(self, segment):
+        """Memory-map the files of a segment.
+            Parameters: segment (number)
+            Returns: None"""
+        for name in INDEXES:
+            self._segments[name].append(np.load(self._segment_path(name, segment), mmap_mode='r'))
+        self._live.append(segment)
+        self._next_segment = max(self._next_segment, segment + 1)
+
+    def add_game(self, game_id, moves):
+        """Index one game: every position it reached (including the final one) and every fairy piece entry.
+            Parameters: game_id and moves (list of archived move names)
+            Returns: None"""
+        start = time.perf_counter()
+        game = len(self._games) + len(self._pending_games)
+        board = FastBoard()
+        positions = self._pending['positions']
+        drops = self._pending['drops']
+        positions.append((board.get_hash(), game, 0))
+        for ply, name in enumerate(moves):
+            move = move_label(name)
+            if not board.is_legal(move):
+                raise ValueError(f"illegal archived move {name} at ply {ply} of game {game_id}")
+            if move >> DROP_SHIFT:
+                drops.append((((move >> DROP_SHIFT) << 6) | ((move >> 6) & 63), game, ply))
+            board.make_move(move)
+            positions.append((board.get_hash(), game, ply + 1))
+        self._pending_games.append(game_id)
+        self._ingested_positions += len(moves) + 1
+        self._ingest_seconds += time.perf_counter() - start
+        if len(positions) >= self._flush_entries:
+            self.flush()
+
+    def ingest_archive(self, path):
+        """Index every game of an archive and flush the index.
+            Parameters: path
+            Returns: number of games ingested"""
+        count = 0
+        for record in read_games(path):
+            self.add_game(record['id'], record['moves'])
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self):
+        """Write the buffered entries as a new sorted segment, then record it in the manifest.
+            Parameters: None
+            Returns: None"""
+        if not self._pending_games:
+            return
+        start = time.perf_counter()
+        segment = self._next_segment
+        for name in INDEXES:
+            entries = np.array(self._pending[name], dtype=ENTRY_TYPE)
+            entries.sort(order=('key', 'game', 'ply'))
+            np.save(self._segment_path(name, segment), entries)
+            self._pending[name] = []
+        with open(os.path.join(self._directory, 'games.jsonl'), 'a', encoding='utf-8') as file:
+            for game_id in self._pending_games:
+                file.write(json.dumps(game_id) + '\n')
+        self._games.extend(self._pending_games)
+        self._pending_games = []
+        self._open_segment(segment)
+        self._write_manifest()
+        self._ingest_seconds += time.perf_counter() - start
+
+    def _write_manifest(self):
+        """Replace the manifest listing the live segments and how many games they cover.
+            Parameters: None
+            Returns: None"""
+        path = os.path.join(self._directory, 'index.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({'segments': self._live, 'games': len(self._games)}, file)
+        os.replace(path + '.tmp', path)
+
+    def compact(self):
+        """Merge every segment into one, so queries search a single sorted array.
+            Parameters: None
+            Returns: None"""
+        self.flush()
+        if len(self._live) < 2:
+            return
+        old = self._live
+        segment = self._next_segment
+        for name in INDEXES:
+            entries = np.concatenate(self._segments[name])
+            entries.sort(order=('key', 'game', 'ply'))
+            np.save(self._segment_path(name, segment), entries)
+            self._segments[name] = []
+        self._live = []
+        self._open_segment(segment)
+        self._write_manifest()
+        for number in old:
+            for name in INDEXES:
+                os.remove(self._segment_path(name, number))
+
+    def _lookup(self, name, key):
+        """Find every entry with a key in one index, searching each segment.
+            Parameters: name (one of INDEXES) and key
+            Returns: list of (game id, ply), in game order"""
+        found = []
+        key = np.uint64(key)
+        for entries in self._segments[name]:
+            keys = entries['key']
+            low = np.searchsorted(keys, key, 'left')
+            high = np.searchsorted(keys, key, 'right')
+            for entry in entries[low:high]:
+                found.append((int(entry['game']), int(entry['ply'])))
+        found.sort()
+        return [(self._games[game], ply) for game, ply in found]
+
+    def find_position(self, position):
+        """Return every game and ply where a position was reached.
+            Parameters: position (FastBoard, ChessVar, or a position hash)
+            Returns: list of (game id, ply)"""
+        if isinstance(position, int):
+            key = position
+        elif isinstance(position, FastBoard):
+            key = position.get_hash()
+        else:
+            key = FastBoard.from_game(position).get_hash()
+        return self._lookup('positions', key)
+
+    def find_drops(self, piece_type, square):
+        """Return every game and ply where a fairy piece was entered on a square.
+            Parameters: piece_type ('F', 'H', 'f', or 'h') and square
+            Returns: list of (game id, ply)"""
+        return self._lookup('drops', drop_key(piece_type, square))
+
+    def get_stats(self):
+        """Return statistics on the index.
+            Parameters: None
+            Returns: dict with games, entries, segments, bytes, bytes_per_entry, and positions_per_second (the
+                ingest rate of this session)"""
+        entries = sum(len(segment) for name in INDEXES for segment in self._segments[name])
+        size = sum(os.path.getsize(self._segment_path(name, number)) for name in INDEXES for number in self._live)
+        return {'games': len(self._games), 'entries': entries, 'segments': len(self._live),
+                'bytes': size, 'bytes_per_entry': size / entries if entries else 0.0,
+                'positions_per_second': self._ingested_positions / self._ingest_seconds if self._ingest_seconds
+                else 0.0}
@@ -0,0 +1,205 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A Monte Carlo tree search engine for ChessVar positions. Nodes are chosen with UCT, and each new node
+#              is scored by a random playout that uses FastBoard.random_move (which also enters fairy pieces) instead
+#              of building ChessVar objects. Nodes live in a fixed-size pool: when the engine moves down the tree,
+#              the parts of the tree that can no longer be reached are recycled, so memory stays bounded.
+
+import math
+import random
+import time
+
+from movegen import FastBoard, UNFINISHED, WHITE_WON, BLACK_WON
+
+# playouts that last this many plies without a king capture are scored as draws
+MAX_PLAYOUT_PLIES = 200
+
+# marks a node slot that is not in use
+NO_NODE = -1
+
+
+class MCTS:
+    """An MCTS object searches a position with Monte Carlo tree search. It is responsible for the node pool,
+        selecting nodes with UCT, random playouts, and moving its root forward as moves are played so the
+        useful part of the tree is kept."""
+
+    def __init__(self, board=None, capacity=200000, exploration=1.4, seed=None):
+        """Initialize an engine for a position with a node pool of a fixed capacity.
+            Parameters: board (FastBoard or ChessVar, the starting position by default), capacity, exploration
+                (the UCT constant), and seed
+            Returns: None"""
+        if board is None:
+            board = FastBoard()
+        elif not isinstance(board, FastBoard):
+            board = FastBoard.from_game(board)
+        self._board = board.copy()
+        self._rng = random.Random(seed)
+        self._exploration = exploration
+        self._capacity = capacity
+        # node data is kept in parallel lists indexed by node number
+        self._move = [0] * capacity
+        self._parent = [NO_NODE] * capacity
+        self._children = [None] * capacity  # list of child nodes once the node has been reached
+        self._untried = [None] * capacity  # moves that do not have a child node yet
+        self._visits = [0] * capacity
+        self._wins = [0.0] * capacity  # for the player who made the move leading to the node
+        self._free = list(range(capacity - 1, -1, -1))
+        self._root = self._new_node(NO_NODE, 0)
+
+    def get_root_visits(self):
+        """Return how many playouts went through the root.
+            Parameters: None
+            Returns: int"""
+        return self._visits[self._root]
+
+    def get_free_nodes(self):
+        """Return how many node slots are free.
+            Parameters: None
+            Returns: int"""
+        return len(self._free)
+
+    def _new_node(self, parent, move):
+        """Take a node slot from the free list.
+            Parameters: parent and move
+            Returns: node number, or NO_NODE if the pool is full"""
+        if not self._free:
+            return NO_NODE
+        node = self._free.pop()
+        self._move[node] = move
+        self._parent[node] = parent
+        self._children[node] = None
+        self._untried[node] = None
+        self._visits[node] = 0
+        self._wins[node] = 0.0
+        return node
+
+    def _release(self, node):
+        """Return a node and everything below it to the free list.
+            Parameters: node
+            Returns: None"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if self._children[current]:
+                stack.extend(self._children[current])
+            self._children[current] = None
+            self._untried[current] = None
+            self._free.append(current)
+
+    def search(self, playouts=None, time_limit=None):
+        """Run playouts from the root until the playout count or the time limit is reached.
+            Parameters: playouts and time_limit (seconds)
+            Returns: dict with the best move, playouts, seconds, and playouts_per_second"""
+        if playouts is None and time_limit is None:
+            playouts = 1000
+        deadline = time.perf_counter() + time_limit if time_limit else None
+        start = time.perf_counter()
+        done = 0
+        while (playouts is None or done < playouts) and (deadline is None or time.perf_counter() < deadline):
+            self._iterate()
+            done += 1
+        seconds = time.perf_counter() - start
+        return {'move': self.best_move(), 'playouts': done, 'seconds': seconds,
+                'playouts_per_second': done / seconds if seconds else 0.0}
+
+    def _iterate(self):
+        """Run one selection, expansion, playout, and backpropagation step.
+            Parameters: None
+            Returns: None"""
+        board = self._board.copy()
+        node = self._root
+        rng = self._rng
+        depth = 0
+
+        # selection: follow UCT while every move of the node has a child (or the pool has no room for more)
+        while True:
+            if self._untried[node] is None:
+                self._untried[node] = board.generate_moves()
+                rng.shuffle(self._untried[node])
+                self._children[node] = []
+            if (self._untried[node] and self._free) or not self._children[node]:
+                break
+            node = self._select(node)
+            board.make_move(self._move[node])
+            depth += 1
+
+        # expansion: add one child if there is room in the pool
+        if self._untried[node] and board.get_state() == UNFINISHED:
+            child = self._new_node(node, self._untried[node][-1])
+            if child != NO_NODE:
+                self._untried[node].pop()
+                self._children[node].append(child)
+                board.make_move(self._move[child])
+                node = child
+                depth += 1
+
+        # playout: random moves until a king is captured or the playout runs too long
+        plies = 0
+        while board.get_state() == UNFINISHED and plies < MAX_PLAYOUT_PLIES:
+            move = board.random_move(rng)
+            if move is None:
+                break
+            board.make_move(move)
+            plies += 1
+        state = board.get_state()
+
+        # backpropagation: a node's wins are counted for the player who moved into it, and the movers
+        # alternate starting with the side to move at the root
+        winner = 0 if state == WHITE_WON else 1 if state == BLACK_WON else NO_NODE
+        root_turn = self._board.get_turn()
+        while depth > 0:
+            self._visits[node] += 1
+            if winner == NO_NODE:
+                self._wins[node] += 0.5
+            elif winner == root_turn ^ ((depth - 1) & 1):
+                self._wins[node] += 1.0
+            node = self._parent[node]
+            depth -= 1
+        self._visits[node] += 1
+
+    def _select(self, node):
+        """Pick the child with the best UCT score.
+            Parameters: node
+            Returns: child node number"""
+        visits = self._visits[node]
+        scale = self._exploration * math.sqrt(math.log(visits)) if visits else 0.0
+        best_score, best_child = -1.0, NO_NODE
+        for child in self._children[node]:
+            child_visits = self._visits[child]
+            if child_visits == 0:
+                return child
+            score = self._wins[child] / child_visits + scale / math.sqrt(child_visits)
+            if score > best_score:
+                best_score, best_child = score, child
+        return best_child
+
+    def best_move(self):
+        """Return the most visited move from the root.
+            Parameters: None
+            Returns: move int, or None if no playouts have been run"""
+        children = self._children[self._root]
+        if not children:
+            return None
+        return self._move[max(children, key=lambda child: self._visits[child])]
+
+    def advance(self, move):
+        """Play a move at the root. The subtree under that move becomes the new tree, and every other node is
+            recycled.
+            Parameters: move
+            Returns: None"""
+        old_root = self._root
+        new_root = NO_NODE
+        for child in self._children[old_root] or ():
+            if self._move[child] == move:
+                new_root = child
+            else:
+                self._release(child)
+        self._children[old_root] = None
+        self._untried[old_root] = None
+        self._free.append(old_root)
+        self._board.make_move(move)
+        if new_root == NO_NODE:
+            new_root = self._new_node(NO_NODE, 0)
+        self._parent[new_root] = NO_NODE
+        self._root = new_root
@@ -0,0 +1,97 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A bounded, thread-safe LRU cache of legal move lists keyed by position hash. The hash comes from
+#              FastBoard, so it covers the board, side to move, fairy reserve, and fairy eligibility. Servers that
+#              see the same positions over and over (openings, positions watched by many spectators) can share one
+#              cache between all of their games through ChessVar.set_move_cache.
+
+import sys
+import threading
+from collections import OrderedDict
+
+# rough bytes used by one cache entry besides its move set: the OrderedDict node, the key, and the tuple
+ENTRY_OVERHEAD = 200
+INT_SIZE = sys.getsizeof(1 << 20)
+
+
+class MoveCache:
+    """A MoveCache object stores the legal moves of recently seen positions. It is responsible for evicting the
+        least recently used positions when it goes over its entry or memory limit, and for counting hits, misses,
+        and evictions. All methods can be called from several threads at once."""
+
+    def __init__(self, max_entries=100000, max_bytes=None):
+        """Initialize an empty cache with a maximum number of positions and an optional memory cap in bytes.
+            Parameters: max_entries and max_bytes
+            Returns: None"""
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # position hash -> (frozenset of moves, estimated bytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_moves(self, board):
+        """Return the legal moves of a position, generating and caching them on a miss.
+            Parameters: board (FastBoard)
+            Returns: frozenset of move ints"""
+        key = board.get_hash()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # generate outside the lock so other threads are not held up
+        moves = frozenset(board.generate_moves())
+        size = sys.getsizeof(moves) + INT_SIZE * len(moves) + ENTRY_OVERHEAD
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (moves, size)
+                self._bytes += size
+                self._evict()
+        return moves
+
+    def get_move_list(self, board):
+        """Return the legal moves of a position as a sorted list.
+            Parameters: board (FastBoard)
+            Returns: list of move ints"""
+        return sorted(self.get_moves(board))
+
+    def is_legal(self, board, move):
+        """Return whether a move is legal, answered from the cached move set of the position.
+            Parameters: board (FastBoard) and move
+            Returns: True or False"""
+        return move in self.get_moves(board)
+
+    def _evict(self):
+        """Drop least recently used positions until the cache is within its limits. Called with the lock held.
+            Parameters: None
+            Returns: None"""
+        while self._entries and (len(self._entries) > self._max_entries
+                                 or (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def clear(self):
+        """Remove every position from the cache (the counters are kept).
+            Parameters: None
+            Returns: None"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Return the cache counters.
+            Parameters: None
+            Returns: dict with hits, misses, evictions, hit_rate, entries, and bytes"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'hit_rate': self._hits / lookups if lookups else 0.0, 'entries': len(self._entries),
+                    'bytes': self._bytes}
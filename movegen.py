@@ -0,0 +1,673 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A compact board representation and move generator for the falcon-hunter chess variant played by
+#              ChessVar. Squares are numbered 0-63 (a1 = 0, h8 = 63) and pieces are small integers, so positions can
+#              be searched with make/unmake instead of copying ChessVar objects. The rules follow ChessVar exactly:
+#              there is no check, capturing a king ends the game, and falcons/hunters enter from the reserve.
+
+from array import array
+
+from movetables import load_tables, pack_ragged, unpack_ragged
+
+# piece types (white pieces use the type, black pieces add BLACK)
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+FALCON = 7
+HUNTER = 8
+BLACK = 16
+TYPE_MASK = 15
+
+# game states, in the same order as the ChessVar strings
+UNFINISHED = 0
+WHITE_WON = 1
+BLACK_WON = 2
+GAME_STATES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+
+# reserve bits for fairy pieces that have not been entered yet
+WHITE_FALCON_STORED = 1
+WHITE_HUNTER_STORED = 2
+BLACK_FALCON_STORED = 4
+BLACK_HUNTER_STORED = 8
+FULL_RESERVE = 15
+
+# ChessVar letters <-> piece types
+LETTER_TO_TYPE = {'p': PAWN, 'k': KNIGHT, 'b': BISHOP, 'r': ROOK, 'q': QUEEN, 'K': KING, 'f': FALCON, 'h': HUNTER}
+TYPE_TO_LETTER = {value: key for key, value in LETTER_TO_TYPE.items()}
+
+# fairy entry letters used by enter_fairy_piece, mapped to (piece code, reserve bit)
+FAIRY_LETTERS = {'F': (FALCON, WHITE_FALCON_STORED), 'H': (HUNTER, WHITE_HUNTER_STORED),
+                 'f': (FALCON | BLACK, BLACK_FALCON_STORED), 'h': (HUNTER | BLACK, BLACK_HUNTER_STORED)}
+
+# reserve bit for each fairy piece code
+RESERVE_BITS = {code: bit for code, bit in FAIRY_LETTERS.values()}
+
+# pieces whose loss makes a player eligible to enter a fairy piece (the king is counted too, like ChessVar does)
+MAJOR_TYPES = (KNIGHT, BISHOP, ROOK, QUEEN, KING)
+
+# moves are ints: from | to << 6, and drops set the entered piece code in the high bits
+DROP_SHIFT = 12
+
+# ray directions as (file step, rank step)
+NORTH = (0, 1)
+SOUTH = (0, -1)
+EAST = (1, 0)
+WEST = (-1, 0)
+NORTH_EAST = (1, 1)
+NORTH_WEST = (-1, 1)
+SOUTH_EAST = (1, -1)
+SOUTH_WEST = (-1, -1)
+DIRECTIONS = (NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+
+# which rays each sliding piece uses, by piece code (the falcon and hunter flip with the player)
+SLIDER_DIRECTIONS = {
+    BISHOP: (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST),
+    ROOK: (NORTH, SOUTH, EAST, WEST),
+    QUEEN: DIRECTIONS,
+    FALCON: (NORTH_EAST, NORTH_WEST, SOUTH),
+    HUNTER: (NORTH, SOUTH_EAST, SOUTH_WEST),
+    BISHOP | BLACK: (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST),
+    ROOK | BLACK: (NORTH, SOUTH, EAST, WEST),
+    QUEEN | BLACK: DIRECTIONS,
+    FALCON | BLACK: (SOUTH_EAST, SOUTH_WEST, NORTH),
+    HUNTER | BLACK: (SOUTH, NORTH_EAST, NORTH_WEST),
+}
+
+# home ranks where each color may enter fairy pieces
+WHITE_HOME_SQUARES = tuple(range(0, 16))
+BLACK_HOME_SQUARES = tuple(range(48, 64))
+
+
+def square_index(square):
+    """Convert an algebraic square such as 'e2' to a 0-63 index.
+        Parameters: square
+        Returns: int"""
+    return (int(square[1]) - 1) * 8 + (ord(square[0]) - ord('a'))
+
+
+def square_name(index):
+    """Convert a 0-63 index back to an algebraic square.
+        Parameters: index
+        Returns: str"""
+    return chr(ord('a') + index % 8) + str(index // 8 + 1)
+
+
+SQUARE_NAMES = tuple(square_name(index) for index in range(64))
+SQUARE_INDEX = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+
+def make_drop(piece, to_sq):
+    """Encode the entry of a fairy piece as a move int.
+        Parameters: piece (piece code) and to_sq
+        Returns: int"""
+    return (piece << DROP_SHIFT) | (to_sq << 6)
+
+
+def move_name(move):
+    """Return a readable name for a move int, such as 'e2e4' or 'F@c1'.
+        Parameters: move
+        Returns: str"""
+    drop = move >> DROP_SHIFT
+    to_sq = (move >> 6) & 63
+    if drop:
+        letter = TYPE_TO_LETTER[drop & TYPE_MASK]
+        if not drop & BLACK:
+            letter = letter.upper()
+        return letter + '@' + SQUARE_NAMES[to_sq]
+    return SQUARE_NAMES[move & 63] + SQUARE_NAMES[to_sq]
+
+
+def _build_jump_table(steps):
+    """Build a table of target squares for a jumping piece (knight or king).
+        Parameters: steps (list of (file step, rank step))
+        Returns: tuple of 64 tuples"""
+    table = []
+    for index in range(64):
+        file, rank = index % 8, index // 8
+        targets = []
+        for file_step, rank_step in steps:
+            if 0 <= file + file_step < 8 and 0 <= rank + rank_step < 8:
+                targets.append((rank + rank_step) * 8 + file + file_step)
+        table.append(tuple(targets))
+    return tuple(table)
+
+
+def _build_ray_table():
+    """Build a table of rays: for each direction and square, the squares walked in order until the board edge.
+        Parameters: None
+        Returns: dict of direction -> tuple of 64 tuples"""
+    rays = {}
+    for file_step, rank_step in DIRECTIONS:
+        table = []
+        for index in range(64):
+            file, rank = index % 8 + file_step, index // 8 + rank_step
+            ray = []
+            while 0 <= file < 8 and 0 <= rank < 8:
+                ray.append(rank * 8 + file)
+                file += file_step
+                rank += rank_step
+            table.append(tuple(ray))
+        rays[(file_step, rank_step)] = tuple(table)
+    return rays
+
+
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_STEPS = ((1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1))
+
+
+def _build_piece_rays(rays):
+    """Build, for each sliding piece code, the list of ray tables it walks.
+        Parameters: rays (from _build_ray_table)
+        Returns: dict of piece code -> tuple of ray tables"""
+    return {piece: tuple(rays[direction] for direction in directions)
+            for piece, directions in SLIDER_DIRECTIONS.items()}
+
+
+def _build_reach_masks(knight_targets, king_targets, piece_rays):
+    """Build, for every piece code and square, the bitmask of squares the piece could reach on an empty board.
+        Pawns get their pushes (including the two-space move, which depends on the pawn's flag) and both
+        captures, so any move outside the mask is impossible whatever the rest of the board looks like.
+        Parameters: knight_targets, king_targets, and piece_rays
+        Returns: dict of piece code -> tuple of 64 ints"""
+    masks = {}
+    for kind in range(PAWN, HUNTER + 1):
+        for color in (0, BLACK):
+            table = []
+            for from_sq in range(64):
+                file, rank = from_sq % 8, from_sq // 8
+                if kind == PAWN:
+                    step = -1 if color else 1
+                    targets = []
+                    if 0 <= rank + step < 8:
+                        targets += [(rank + step) * 8 + file + side for side in (-1, 0, 1) if 0 <= file + side < 8]
+                        if 0 <= rank + 2 * step < 8:
+                            targets.append((rank + 2 * step) * 8 + file)
+                elif kind == KNIGHT or kind == KING:
+                    targets = (knight_targets if kind == KNIGHT else king_targets)[from_sq]
+                else:
+                    targets = [to_sq for ray_table in piece_rays[kind | color] for to_sq in ray_table[from_sq]]
+                mask = 0
+                for to_sq in targets:
+                    mask |= 1 << to_sq
+                table.append(mask)
+            masks[kind | color] = tuple(table)
+    return masks
+
+
+def _build_between_squares(rays):
+    """Build, for every pair of squares on a common rank, file, or diagonal, the squares strictly between them.
+        Parameters: rays (from _build_ray_table)
+        Returns: tuple indexed by from_sq * 64 + to_sq of tuples of squares (empty if not on a common line)"""
+    table = [()] * 4096
+    for ray_table in rays.values():
+        for from_sq in range(64):
+            ray = ray_table[from_sq]
+            for distance, to_sq in enumerate(ray):
+                table[from_sq * 64 + to_sq] = ray[:distance]
+    return tuple(table)
+
+
+def _build_zobrist_keys():
+    """Build the random 64-bit keys used for position hashing. A fixed seed keeps hashes stable between
+        processes, so they can be shared through transposition tables and archives.
+        Parameters: None
+        Returns: tuple of (piece keys, side key, reserve keys, eligibility keys, state keys)"""
+    import random
+    rng = random.Random(0x5EED_FA1C)
+    piece_keys = [[0] * 64 for _ in range(BLACK + TYPE_MASK + 1)]
+    for piece in range(1, BLACK + HUNTER + 1):
+        if piece & TYPE_MASK and piece & TYPE_MASK <= HUNTER:
+            piece_keys[piece] = [rng.getrandbits(64) for _ in range(64)]
+    side_key = rng.getrandbits(64)
+    reserve_keys = [0] + [rng.getrandbits(64) for _ in range(FULL_RESERVE)]
+    eligible_keys = [[rng.getrandbits(64) for _ in range(3)] for _ in range(2)]
+    state_keys = [0, rng.getrandbits(64), rng.getrandbits(64)]
+    return piece_keys, side_key, reserve_keys, eligible_keys, state_keys
+
+
+# part of the cache file name; the cache is rebuilt whenever this file changes anyway (see source_version), so
+# only bump it when the tables change because of another module
+TABLES_VERSION = 1
+
+# piece codes that have a reachability mask
+REACH_CODES = tuple(kind | color for kind in range(PAWN, HUNTER + 1) for color in (0, BLACK))
+
+
+def _build_tables():
+    """Build every precomputed table as flat arrays for the table cache.
+        Parameters: None
+        Returns: dict of name -> array"""
+    knight_targets = _build_jump_table(KNIGHT_STEPS)
+    king_targets = _build_jump_table(KING_STEPS)
+    rays = _build_ray_table()
+    reach_masks = _build_reach_masks(knight_targets, king_targets, _build_piece_rays(rays))
+    piece_keys, side_key, reserve_keys, eligible_keys, state_keys = _build_zobrist_keys()
+    jump_squares, jump_offsets = pack_ragged(knight_targets + king_targets)
+    ray_squares, ray_offsets = pack_ragged([ray for direction in DIRECTIONS for ray in rays[direction]])
+    return {'jump_squares': jump_squares, 'jump_offsets': jump_offsets,
+            'ray_squares': ray_squares, 'ray_offsets': ray_offsets,
+            'reach_masks': array('Q', [mask for code in REACH_CODES for mask in reach_masks[code]]),
+            'between_masks': array('Q', [sum(1 << square for square in between)
+                                         for between in _build_between_squares(rays)]),
+            'zobrist_pieces': array('Q', [key for keys in piece_keys for key in keys]),
+            'zobrist_other': array('Q', [side_key] + reserve_keys + eligible_keys[0] + eligible_keys[1]
+                                   + state_keys)}
+
+
+def _load_tables():
+    """Load the precomputed tables from the table cache (building and caching them if this is the first run) and
+        copy them into tuples and lists, which the move generator indexes faster than memory-mapped views.
+        Parameters: None
+        Returns: tuple of (knight targets, king targets, rays, reachability masks, between masks, and the five
+            Zobrist key tables)"""
+    tables = load_tables('movegen', TABLES_VERSION, _build_tables)
+    jumps = unpack_ragged(tables['jump_squares'], tables['jump_offsets'])
+    lines = unpack_ragged(tables['ray_squares'], tables['ray_offsets'])
+    rays = {direction: lines[64 * number:64 * (number + 1)] for number, direction in enumerate(DIRECTIONS)}
+    reach = tables['reach_masks']
+    reach_masks = {code: tuple(reach[64 * number:64 * (number + 1)]) for number, code in enumerate(REACH_CODES)}
+    pieces = tables['zobrist_pieces']
+    piece_keys = [pieces[64 * piece:64 * (piece + 1)].tolist() for piece in range(BLACK + TYPE_MASK + 1)]
+    other = tables['zobrist_other'].tolist()
+    return (jumps[:64], jumps[64:], rays, reach_masks, tuple(tables['between_masks']),
+            piece_keys, other[0], other[1:17], [other[17:20], other[20:23]], other[23:26])
+
+
+(KNIGHT_TARGETS, KING_TARGETS, RAYS, REACH_MASKS, BETWEEN_MASKS,
+ ZOBRIST_PIECES, ZOBRIST_SIDE, ZOBRIST_RESERVE, ZOBRIST_ELIGIBLE, ZOBRIST_STATE) = _load_tables()
+
+# for each sliding piece code, the list of ray tables it walks
+PIECE_RAYS = _build_piece_rays(RAYS)
+
+
+def __getattr__(name):
+    """Build tables the move generator itself never uses the first time another module asks for them, so
+        importing movegen does not pay for them. Currently that is BETWEEN_SQUARES, the squares strictly between
+        two squares by from_sq * 64 + to_sq (BETWEEN_MASKS holds the same squares as bitmasks).
+        Parameters: name
+        Returns: the table"""
+    if name == 'BETWEEN_SQUARES':
+        table = globals()[name] = _build_between_squares(RAYS)
+        return table
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def add_piece_moves(squares, from_sq, piece, color, moves):
+    """Add the moves of the piece on from_sq to moves. Works on any sequence of 64 piece codes (a list or a
+        bytearray).
+        Parameters: squares, from_sq, piece (piece code), color (0 or BLACK), and moves
+        Returns: None"""
+    kind = piece & TYPE_MASK
+    if kind == PAWN:
+        add_pawn_moves(squares, from_sq, color, moves)
+    elif kind == KNIGHT or kind == KING:
+        table = KNIGHT_TARGETS if kind == KNIGHT else KING_TARGETS
+        for to_sq in table[from_sq]:
+            target = squares[to_sq]
+            if not target or (target & BLACK) != color:
+                moves.append(from_sq | (to_sq << 6))
+    else:
+        for ray_table in PIECE_RAYS[piece]:
+            for to_sq in ray_table[from_sq]:
+                target = squares[to_sq]
+                if not target:
+                    moves.append(from_sq | (to_sq << 6))
+                else:
+                    if (target & BLACK) != color:
+                        moves.append(from_sq | (to_sq << 6))
+                    break
+
+
+def add_pawn_moves(squares, from_sq, color, moves):
+    """Add the pushes and captures of one pawn to moves. A pawn may move two spaces only from its starting rank,
+        which is the same as ChessVar's pawn_move flag since pawns never return to that rank.
+        Parameters: squares, from_sq, color (0 or BLACK), and moves
+        Returns: None"""
+    file, rank = from_sq % 8, from_sq // 8
+    if color:
+        if rank == 0:
+            return
+        step, start_rank = -8, 6
+    else:
+        if rank == 7:
+            return
+        step, start_rank = 8, 1
+    ahead = from_sq + step
+    if not squares[ahead]:
+        moves.append(from_sq | (ahead << 6))
+        if rank == start_rank and not squares[ahead + step]:
+            moves.append(from_sq | ((ahead + step) << 6))
+    if file > 0:
+        target = squares[ahead - 1]
+        if target and (target & BLACK) != color:
+            moves.append(from_sq | ((ahead - 1) << 6))
+    if file < 7:
+        target = squares[ahead + 1]
+        if target and (target & BLACK) != color:
+            moves.append(from_sq | ((ahead + 1) << 6))
+
+
+class FastBoard:
+    """A FastBoard object is a mutable, compact copy of a ChessVar position used for searching. It is responsible
+        for generating legal moves, making and unmaking them, and keeping an incremental Zobrist hash of the position.
+        It follows the same rules as ChessVar (including entering fairy pieces), but does not print anything."""
+
+    def __init__(self):
+        """Initialize a fast board at the standard starting position, with white to move and both reserves full.
+            Parameters: None
+            Returns: None"""
+        self._squares = [0] * 64
+        for file, letter in enumerate('rkbqKbkr'):
+            self._squares[file] = LETTER_TO_TYPE[letter]
+            self._squares[56 + file] = LETTER_TO_TYPE[letter] | BLACK
+            self._squares[8 + file] = PAWN
+            self._squares[48 + file] = PAWN | BLACK
+        self._turn = 0  # 0 for white, 1 for black
+        self._state = UNFINISHED
+        self._reserve = FULL_RESERVE
+        self._lost = [0, 0]  # major pieces lost by white and black
+        self._history = []
+        self._hash = self.compute_hash()
+
+    @classmethod
+    def from_game(cls, game):
+        """Build a fast board from a ChessVar game.
+            Parameters: game (ChessVar)
+            Returns: FastBoard"""
+        board = cls.__new__(cls)
+        board._squares = [0] * 64
+        for index, name in enumerate(SQUARE_NAMES):
+            piece = game.get_square(name)
+            if piece is not None:
+                code = LETTER_TO_TYPE[piece.get_piece_type()]
+                board._squares[index] = code | (BLACK if piece.get_color() == 'b' else 0)
+        board._turn = 0 if game.get_turn() == 'WHITE' else 1
+        board._state = GAME_STATES.index(game.get_game_state())
+        board._reserve = 0
+        for letter, (_, bit) in FAIRY_LETTERS.items():
+            if game.get_fairy_stored(letter):
+                board._reserve |= bit
+        board._lost = [sum(1 for piece in game.get_lost_pieces(color)
+                           if LETTER_TO_TYPE[piece.get_piece_type()] in MAJOR_TYPES) for color in ('w', 'b')]
+        board._history = []
+        board._hash = board.compute_hash()
+        return board
+
+    def copy(self):
+        """Return an independent copy of this board (without the undo history).
+            Parameters: None
+            Returns: FastBoard"""
+        board = FastBoard.__new__(FastBoard)
+        board._squares = self._squares[:]
+        board._turn = self._turn
+        board._state = self._state
+        board._reserve = self._reserve
+        board._lost = self._lost[:]
+        board._history = []
+        board._hash = self._hash
+        return board
+
+    def to_bytes(self):
+        """Return the position as 69 bytes (the squares, then turn, state, reserve, and each side's lost major
+            pieces), for sending a board to another process.
+            Parameters: None
+            Returns: bytes"""
+        return bytes(self._squares) + bytes((self._turn, self._state, self._reserve, self._lost[0], self._lost[1]))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Build a fast board from the bytes written by to_bytes.
+            Parameters: data
+            Returns: FastBoard"""
+        board = cls.__new__(cls)
+        board._squares = list(data[:64])
+        board._turn, board._state, board._reserve = data[64], data[65], data[66]
+        board._lost = [data[67], data[68]]
+        board._history = []
+        board._hash = board.compute_hash()
+        return board
+
+    def get_squares(self):
+        """Return the list of 64 piece codes (0 for empty). The list is shared, so callers must not change it.
+            Parameters: None
+            Returns: list"""
+        return self._squares
+
+    def get_turn(self):
+        """Return the side to move, 0 for white and 1 for black.
+            Parameters: None
+            Returns: int"""
+        return self._turn
+
+    def get_state(self):
+        """Return the game state as UNFINISHED, WHITE_WON, or BLACK_WON.
+            Parameters: None
+            Returns: int"""
+        return self._state
+
+    def get_reserve(self):
+        """Return the reserve bits for fairy pieces that are still stored.
+            Parameters: None
+            Returns: int"""
+        return self._reserve
+
+    def get_lost(self, turn):
+        """Return how many major pieces (queen, rook, bishop, knight, or king) a side has lost.
+            Parameters: turn (0 for white, 1 for black)
+            Returns: int"""
+        return self._lost[turn]
+
+    def get_hash(self):
+        """Return the 64-bit Zobrist hash of the position.
+            Parameters: None
+            Returns: int"""
+        return self._hash
+
+    def get_ply(self):
+        """Return how many moves have been made on this board since it was created or copied.
+            Parameters: None
+            Returns: int"""
+        return len(self._history)
+
+    def compute_hash(self):
+        """Compute the Zobrist hash from scratch. The hash covers the board, side to move, fairy reserve,
+            fairy eligibility (lost major pieces, capped at two), and game state.
+            Parameters: None
+            Returns: int"""
+        key = 0
+        for index, piece in enumerate(self._squares):
+            if piece:
+                key ^= ZOBRIST_PIECES[piece][index]
+        if self._turn:
+            key ^= ZOBRIST_SIDE
+        return key ^ ZOBRIST_STATE[self._state] ^ self._status_key()
+
+    def fairy_eligible(self, turn):
+        """Return whether a side may enter a fairy piece this turn: the first one needs one lost major piece and
+            the second needs two, matching ChessVar.enter_fairy_piece.
+            Parameters: turn (0 for white, 1 for black)
+            Returns: True or False"""
+        stored = (self._reserve >> (2 * turn)) & 3
+        if not stored:
+            return False
+        placed = 2 - (stored & 1) - (stored >> 1)
+        return self._lost[turn] > placed
+
+    def generate_moves(self):
+        """Generate every legal move for the side to move, including fairy piece entries. Since there is no check
+            in this variant, every pseudo-legal move is legal.
+            Parameters: None
+            Returns: list of move ints"""
+        moves = []
+        if self._state != UNFINISHED:
+            return moves
+        squares = self._squares
+        color = BLACK if self._turn else 0
+        for from_sq in range(64):
+            piece = squares[from_sq]
+            if piece and (piece & BLACK) == color:
+                add_piece_moves(squares, from_sq, piece, color, moves)
+        self._drop_moves(moves)
+        return moves
+
+    def random_move(self, rng):
+        """Pick a random legal move quickly, without generating every move. A random piece of the side to move is
+            tried first (entering a fairy piece counts as one more "piece"), and the next one is tried only if it
+            has no moves. Moves are not equally likely, but every legal move can be picked, which is what random
+            playouts need.
+            Parameters: rng (random.Random)
+            Returns: move int, or None if there are no legal moves"""
+        if self._state != UNFINISHED:
+            return None
+        squares = self._squares
+        color = BLACK if self._turn else 0
+        candidates = [from_sq for from_sq in range(64) if squares[from_sq] and (squares[from_sq] & BLACK) == color]
+        if self.fairy_eligible(self._turn):
+            candidates.append(-1)
+        moves = []
+        while candidates:
+            pick = rng.randrange(len(candidates))
+            from_sq = candidates[pick]
+            candidates[pick] = candidates[-1]
+            candidates.pop()
+            if from_sq < 0:
+                self._drop_moves(moves)
+            else:
+                add_piece_moves(squares, from_sq, squares[from_sq], color, moves)
+            if moves:
+                return moves[rng.randrange(len(moves))]
+        return None
+
+    def _drop_moves(self, moves):
+        """Add every legal fairy piece entry for the side to move to moves.
+            Parameters: moves
+            Returns: None"""
+        turn = self._turn
+        if not self.fairy_eligible(turn):
+            return
+        if turn:
+            home, pieces = BLACK_HOME_SQUARES, (FALCON | BLACK, HUNTER | BLACK)
+        else:
+            home, pieces = WHITE_HOME_SQUARES, (FALCON, HUNTER)
+        squares = self._squares
+        for piece in pieces:
+            if self._reserve & RESERVE_BITS[piece]:
+                for to_sq in home:
+                    if not squares[to_sq]:
+                        moves.append((piece << DROP_SHIFT) | (to_sq << 6))
+
+    def is_legal(self, move):
+        """Return whether a move int is legal in the current position.
+            Parameters: move
+            Returns: True or False"""
+        return move in self.generate_moves()
+
+    def make_move(self, move):
+        """Make a move int generated by generate_moves. Capturing a king ends the game the same way ChessVar does:
+            the game state changes, but the capturing piece stays where it was and the turn does not change.
+            Parameters: move
+            Returns: the captured piece code (0 if none)"""
+        squares = self._squares
+        to_sq = (move >> 6) & 63
+        drop = move >> DROP_SHIFT
+        self._history.append((move, squares[to_sq], self._state, self._reserve, self._lost[0], self._lost[1],
+                              self._hash))
+        key = self._hash ^ self._status_key()
+        captured = 0
+        if drop:
+            squares[to_sq] = drop
+            key ^= ZOBRIST_PIECES[drop][to_sq]
+            self._reserve &= ~RESERVE_BITS[drop]
+        else:
+            from_sq = move & 63
+            piece = squares[from_sq]
+            captured = squares[to_sq]
+            if captured:
+                loser = 1 if captured & BLACK else 0
+                if captured & TYPE_MASK in MAJOR_TYPES:
+                    self._lost[loser] += 1
+                if captured & TYPE_MASK == KING:
+                    # the king was taken: the game ends and the board is left as it was
+                    self._state = BLACK_WON if loser == 0 else WHITE_WON
+                    self._hash = key ^ ZOBRIST_STATE[self._state] ^ self._status_key()
+                    return captured
+                key ^= ZOBRIST_PIECES[captured][to_sq]
+            squares[to_sq] = piece
+            squares[from_sq] = 0
+            key ^= ZOBRIST_PIECES[piece][from_sq] ^ ZOBRIST_PIECES[piece][to_sq]
+        self._turn ^= 1
+        self._hash = key ^ ZOBRIST_SIDE ^ self._status_key()
+        return captured
+
+    def _status_key(self):
+        """Return the part of the hash that covers the fairy reserve and fairy eligibility.
+            Parameters: None
+            Returns: int"""
+        lost = self._lost
+        return (ZOBRIST_RESERVE[self._reserve] ^ ZOBRIST_ELIGIBLE[0][lost[0] if lost[0] < 2 else 2]
+                ^ ZOBRIST_ELIGIBLE[1][lost[1] if lost[1] < 2 else 2])
+
+    def unmake_move(self):
+        """Take back the last move made with make_move.
+            Parameters: None
+            Returns: None"""
+        move, captured, state, reserve, lost_white, lost_black, key = self._history.pop()
+        to_sq = (move >> 6) & 63
+        if move >> DROP_SHIFT:
+            self._squares[to_sq] = 0
+            self._turn ^= 1
+        elif state == UNFINISHED and self._state != UNFINISHED:
+            # a king capture never moved the piece or changed the turn
+            pass
+        else:
+            from_sq = move & 63
+            self._squares[from_sq] = self._squares[to_sq]
+            self._squares[to_sq] = captured
+            self._turn ^= 1
+        self._state = state
+        self._reserve = reserve
+        self._lost[0] = lost_white
+        self._lost[1] = lost_black
+        self._hash = key
+
+    def to_move(self, moved_from, move_to):
+        """Convert a pair of ChessVar squares to a move int.
+            Parameters: moved_from and move_to
+            Returns: int"""
+        return square_index(moved_from) | (square_index(move_to) << 6)
+
+    def to_drop(self, letter, square):
+        """Convert an enter_fairy_piece call to a move int.
+            Parameters: letter ('F', 'H', 'f', or 'h') and square
+            Returns: int"""
+        return make_drop(FAIRY_LETTERS[letter][0], square_index(square))
+
+    def to_chess_var_move(self, move):
+        """Convert a move int to the ChessVar call that makes it.
+            Parameters: move
+            Returns: ('make_move', from, to) or ('enter_fairy_piece', letter, square)"""
+        drop = move >> DROP_SHIFT
+        to_name = SQUARE_NAMES[(move >> 6) & 63]
+        if drop:
+            letter = TYPE_TO_LETTER[drop & TYPE_MASK]
+            return 'enter_fairy_piece', (letter if drop & BLACK else letter.upper()), to_name
+        return 'make_move', SQUARE_NAMES[move & 63], to_name
+
+
+def perft(board, depth):
+    """Count the sequences of exactly depth legal moves from a position (a finished game has no moves).
+        Parameters: board (FastBoard) and depth
+        Returns: int"""
+    moves = board.generate_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
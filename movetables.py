@@ -0,0 +1,158 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A versioned on-disk cache for precomputed tables. A module hands load_tables a builder that returns
+#              its tables as flat arrays; the first process to need them builds them and writes them to a cache
+#              file, and every later process memory-maps the file instead of computing them again, which keeps
+#              short-lived workers and command line tools quick to start. The file records the machine's byte
+#              order and a version stamp that changes whenever the source of the builder's module or of this module
+#              changes, so a stale or foreign cache is rebuilt rather than misread, even if nobody bumps the
+#              version by hand. Cache files go in __pycache__ next to this module, or in the directory named by
+#              CHESSVAR_CACHE_DIR.
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+CACHE_DIR_VARIABLE = 'CHESSVAR_CACHE_DIR'
+MAGIC = b'CVTABLES'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIII')  # magic, format version, tables version, little-endian flag, number of tables
+ENTRY = struct.Struct('<24s4sQQ')  # name, array typecode, byte offset, number of items
+ALIGNMENT = 8
+
+
+def cache_directory():
+    """Return the directory cache files are kept in.
+        Parameters: None
+        Returns: str"""
+    return os.environ.get(CACHE_DIR_VARIABLE) or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                              '__pycache__')
+
+
+def cache_path(name, version):
+    """Return the path of the cache file for one version of a set of tables.
+        Parameters: name and version
+        Returns: str"""
+    return os.path.join(cache_directory(), f"{name}-tables-v{version}.bin")
+
+
+def pack_ragged(rows):
+    """Flatten rows of small ints of different lengths (such as target squares) for storing in the cache.
+        Parameters: rows (sequence of sequences of ints 0-255)
+        Returns: (array('B') of every value, array('H') of the offset where each row starts, plus the end)"""
+    values = array('B')
+    offsets = array('H', [0])
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return values, offsets
+
+
+def unpack_ragged(values, offsets):
+    """Rebuild the rows flattened by pack_ragged.
+        Parameters: values and offsets
+        Returns: tuple of tuples of ints"""
+    return tuple(tuple(values[offsets[row]:offsets[row + 1]]) for row in range(len(offsets) - 1))
+
+
+def source_version(version, builder):
+    """Return the version stamp of a builder's cache file: a CRC-32 of the source of the module defining the
+        builder and of this module, seeded with version. Editing a builder, a constant it uses, or the file
+        format therefore makes old cache files stale.
+        Parameters: version and builder (function)
+        Returns: int, or None if a source file cannot be read"""
+    stamp = version
+    try:
+        for path in (builder.__code__.co_filename, __file__):
+            with open(path, 'rb') as file:
+                stamp = zlib.crc32(file.read(), stamp)
+    except OSError:
+        return None
+    return stamp
+
+
+def write_tables(path, version, tables):
+    """Write tables to a cache file. The file is written under a temporary name and moved into place, so processes
+        building the same cache at once never see a partial file.
+        Parameters: path, version, and tables (dict of name -> array)
+        Returns: None"""
+    offset = HEADER.size + ENTRY.size * len(tables)
+    entries = []
+    chunks = []
+    for name, table in tables.items():
+        offset += -offset % ALIGNMENT
+        data = table.tobytes()
+        entries.append(ENTRY.pack(name.encode(), table.typecode.encode(), offset, len(table)))
+        chunks.append((offset, data))
+        offset += len(data)
+    buffer = bytearray(offset)
+    buffer[:HEADER.size] = HEADER.pack(MAGIC, FORMAT_VERSION, version, sys.byteorder == 'little', len(tables))
+    buffer[HEADER.size:HEADER.size + ENTRY.size * len(entries)] = b''.join(entries)
+    for start, data in chunks:
+        buffer[start:start + len(data)] = data
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(buffer)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def read_tables(path, version):
+    """Memory-map a cache file and return views of its tables.
+        Parameters: path and version
+        Returns: dict of name -> memoryview, or None if the file is missing, stale, or damaged"""
+    try:
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, format_version, table_version, little, count = HEADER.unpack_from(mapped, 0)
+        if (magic != MAGIC or format_version != FORMAT_VERSION or table_version != version
+                or little != (sys.byteorder == 'little')):
+            return None
+        view = memoryview(mapped)
+        tables = {}
+        for number in range(count):
+            name, typecode, offset, length = ENTRY.unpack_from(mapped, HEADER.size + ENTRY.size * number)
+            typecode = typecode.rstrip(b'\0').decode()
+            size = array(typecode).itemsize * length
+            if offset % ALIGNMENT or offset + size > len(mapped):
+                return None
+            tables[name.rstrip(b'\0').decode()] = view[offset:offset + size].cast(typecode)
+        return tables
+    except (struct.error, ValueError, UnicodeDecodeError):
+        return None
+
+
+def load_tables(name, version, builder):
+    """Return a set of tables, memory-mapped from the cache, or built and cached if there is no usable cache file.
+        A cache file is only used if it was written from the same source (see source_version). If the cache cannot
+        be written, or the source cannot be read to stamp it, the freshly built tables are returned without it.
+        Parameters: name, version (part of the file name, and of the stamp; change it when the builder's output
+            depends on something outside its module), and builder (function returning a dict of name -> array)
+        Returns: dict of name -> memoryview"""
+    path = cache_path(name, version)
+    stamp = source_version(version, builder)
+    tables = read_tables(path, stamp) if stamp is not None else None
+    if tables is not None:
+        return tables
+    built = builder()
+    if stamp is None:
+        return {key: memoryview(table) for key, table in built.items()}
+    try:
+        write_tables(path, stamp, built)
+    except OSError:
+        return {key: memoryview(table) for key, table in built.items()}
+    tables = read_tables(path, stamp)
+    if tables is None:
+        return {key: memoryview(table) for key, table in built.items()}
+    return tables
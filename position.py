@@ -0,0 +1,122 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: An immutable, hashable snapshot of a ChessVar game. The board is 64 bytes of FastBoard piece codes
+#              (a1 first), and the rest of the game is a few small ints and byte strings, so a Position can be
+#              shared between threads without locks, used as a dict key, and turned back into a ChessVar.
+
+from movegen import LETTER_TO_TYPE, BLACK, TYPE_MASK, GAME_STATES, FastBoard, MAJOR_TYPES
+
+# piece letters with a color prefix ('wp', 'bK', ...) <-> FastBoard piece codes
+PIECE_CODES = {}
+for _letter, _kind in LETTER_TO_TYPE.items():
+    PIECE_CODES['w' + _letter] = _kind
+    PIECE_CODES['b' + _letter] = _kind | BLACK
+CODE_NAMES = {code: name for name, code in PIECE_CODES.items()}
+
+
+class Position:
+    """A Position object is a read-only snapshot of a game: the board, whose turn it is, the game state, which fairy
+        pieces are still stored, the lost pieces of each player, and which pawns may still move two spaces. It has
+        no methods that change it, so one object can be shared freely."""
+
+    __slots__ = ('_board', '_turn', '_state', '_reserve', '_white_lost', '_black_lost', '_pawn_flags', '_hash')
+
+    def __init__(self, board, turn, state, reserve, white_lost, black_lost, pawn_flags):
+        """Initialize a snapshot.
+            Parameters: board (64 bytes of piece codes, a1 first), turn (0 for white, 1 for black), state
+                (index into GAME_STATES), reserve (fairy reserve bits), white_lost and black_lost (bytes of lost
+                piece codes, in the order they were lost), and pawn_flags (bitset of squares whose pawn may still
+                move two spaces)
+            Returns: None"""
+        self._board = bytes(board)
+        self._turn = turn
+        self._state = state
+        self._reserve = reserve
+        self._white_lost = bytes(white_lost)
+        self._black_lost = bytes(black_lost)
+        self._pawn_flags = pawn_flags
+        self._hash = hash((self._board, turn, state, reserve, self._white_lost, self._black_lost, pawn_flags))
+
+    def get_board(self):
+        """Return the 64 bytes of piece codes, a1 first.
+            Parameters: None
+            Returns: bytes"""
+        return self._board
+
+    def get_turn(self):
+        """Return the side to move, 0 for white and 1 for black.
+            Parameters: None
+            Returns: int"""
+        return self._turn
+
+    def get_state(self):
+        """Return the game state as an index into GAME_STATES.
+            Parameters: None
+            Returns: int"""
+        return self._state
+
+    def get_game_state(self):
+        """Return the game state the way ChessVar does.
+            Parameters: None
+            Returns: 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'"""
+        return GAME_STATES[self._state]
+
+    def get_reserve(self):
+        """Return the reserve bits for fairy pieces that are still stored.
+            Parameters: None
+            Returns: int"""
+        return self._reserve
+
+    def get_lost(self, turn):
+        """Return the codes of the pieces a side has lost, in the order they were lost.
+            Parameters: turn (0 for white, 1 for black)
+            Returns: bytes"""
+        return self._black_lost if turn else self._white_lost
+
+    def get_pawn_flags(self):
+        """Return the bitset of squares whose pawn may still move two spaces.
+            Parameters: None
+            Returns: int"""
+        return self._pawn_flags
+
+    def to_fast_board(self):
+        """Build a FastBoard for searching from this position.
+            Parameters: None
+            Returns: FastBoard"""
+        board = FastBoard.__new__(FastBoard)
+        board._squares = list(self._board)
+        board._turn = self._turn
+        board._state = self._state
+        board._reserve = self._reserve
+        board._lost = [sum(1 for code in lost if code & TYPE_MASK in MAJOR_TYPES)
+                       for lost in (self._white_lost, self._black_lost)]
+        board._history = []
+        board._hash = board.compute_hash()
+        return board
+
+    def __eq__(self, other):
+        """Return whether two snapshots describe the same game.
+            Parameters: other
+            Returns: True or False"""
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self._hash == other._hash and self._board == other._board and self._turn == other._turn
+                and self._state == other._state and self._reserve == other._reserve
+                and self._white_lost == other._white_lost and self._black_lost == other._black_lost
+                and self._pawn_flags == other._pawn_flags)
+
+    def __hash__(self):
+        """Return the hash computed when the snapshot was made.
+            Parameters: None
+            Returns: int"""
+        return self._hash
+
+    def __repr__(self):
+        """Return a short description with the board as color and piece letters ('wp', 'bK', ...), rank 8 first.
+            Parameters: None
+            Returns: str"""
+        rows = []
+        for rank in range(7, -1, -1):
+            rows.append(''.join(CODE_NAMES[code] if code else '..' for code in self._board[rank * 8:rank * 8 + 8]))
+        return f"Position({'/'.join(rows)}, {'BLACK' if self._turn else 'WHITE'}, {self.get_game_state()})"
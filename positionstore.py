@@ -0,0 +1,215 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A packed, deduplicated store for millions of positions. Each distinct position is kept once as a
+#              28-byte record in one contiguous bytearray: an 8-byte occupancy bitmask, a 4-bit piece code for each
+#              occupied square (there are never more than 32 pieces on the board), and the 4-byte CompactChessVar
+#              bitfield (side to move, game state, fairy reserve, fairy eligibility, and pawn double-step flags).
+#              An open-addressing index of 8-byte slots, each holding a 32-bit hash fingerprint and a record
+#              number, finds a position's record so adding a position that is already stored returns its number.
+
+import sys
+from array import array
+
+from compact import CompactChessVar, RECORD_SIZE
+from movegen import FastBoard, BLACK, TYPE_MASK
+from position import Position
+
+PACKED_SIZE = 28
+OCCUPANCY_SIZE = 8
+PIECES_SIZE = 16
+MIN_SLOTS = 1 << 10
+MAX_LOAD = 0.5
+
+# piece code <-> 4-bit code: the piece type less one, plus 8 for black
+NIBBLES = tuple((code & TYPE_MASK) - 1 + (8 if code & BLACK else 0) if code & TYPE_MASK else 0 for code in range(32))
+NIBBLE_CODES = tuple((nibble & 7) + 1 + (BLACK if nibble & 8 else 0) for nibble in range(16))
+
+
+def pack_board(board, flags):
+    """Pack a 64-byte board of piece codes and a CompactChessVar bitfield into a PACKED_SIZE record.
+        Parameters: board (bytes-like of 64 piece codes) and flags (int)
+        Returns: bytes"""
+    occupancy = 0
+    pieces = 0
+    shift = 0
+    for square, code in enumerate(board):
+        if code:
+            occupancy |= 1 << square
+            pieces |= NIBBLES[code] << shift
+            shift += 4
+    return (occupancy.to_bytes(OCCUPANCY_SIZE, 'little') + pieces.to_bytes(PIECES_SIZE, 'little')
+            + flags.to_bytes(4, 'little'))
+
+
+def unpack_record(record):
+    """Unpack a PACKED_SIZE record back into a board and bitfield.
+        Parameters: record (bytes-like)
+        Returns: (bytearray of 64 piece codes, flags int)"""
+    occupancy = int.from_bytes(record[:OCCUPANCY_SIZE], 'little')
+    pieces = int.from_bytes(record[OCCUPANCY_SIZE:OCCUPANCY_SIZE + PIECES_SIZE], 'little')
+    board = bytearray(64)
+    while occupancy:
+        low = occupancy & -occupancy
+        board[low.bit_length() - 1] = NIBBLE_CODES[pieces & 15]
+        pieces >>= 4
+        occupancy ^= low
+    return board, int.from_bytes(record[OCCUPANCY_SIZE + PIECES_SIZE:PACKED_SIZE], 'little')
+
+
+def pack_position(position):
+    """Pack any kind of position into a record.
+        Parameters: position (CompactChessVar, Position, FastBoard, or ChessVar)
+        Returns: bytes"""
+    if isinstance(position, CompactChessVar):
+        data = position.to_bytes()
+    elif isinstance(position, Position):
+        data = CompactChessVar.from_position(position).to_bytes()
+    elif isinstance(position, FastBoard):
+        data = CompactChessVar.from_fast_board(position).to_bytes()
+    else:
+        data = CompactChessVar.from_position(position.snapshot()).to_bytes()
+    return pack_board(data[:64], int.from_bytes(data[64:RECORD_SIZE], 'little'))
+
+
+class PositionStore:
+    """A PositionStore object holds distinct positions packed into one buffer. It is responsible for giving each
+        distinct position a record number, finding the number of a stored position through its hash index, and
+        growing the index as it fills."""
+
+    def __init__(self, expected=0):
+        """Initialize an empty store, sizing the index for an expected number of positions.
+            Parameters: expected
+            Returns: None"""
+        slots = MIN_SLOTS
+        while slots * MAX_LOAD < expected:
+            slots *= 2
+        self._records = bytearray()
+        self._slots = array('Q', bytes(8 * slots))
+        self._mask = slots - 1
+        self._count = 0
+        self._duplicates = 0
+
+    def __len__(self):
+        """Return the number of distinct positions stored.
+            Parameters: None
+            Returns: int"""
+        return self._count
+
+    def __contains__(self, position):
+        """Return whether a position is stored.
+            Parameters: position (anything pack_position takes)
+            Returns: True or False"""
+        return self.find(position) is not None
+
+    def add(self, position):
+        """Store a position unless it is already stored.
+            Parameters: position (CompactChessVar, Position, FastBoard, or ChessVar)
+            Returns: the position's record number"""
+        return self.add_record(pack_position(position))
+
+    def add_board(self, board, flags):
+        """Store a position given as a 64-byte board and a CompactChessVar bitfield unless it is already stored.
+            Parameters: board and flags
+            Returns: the position's record number"""
+        return self.add_record(pack_board(board, flags))
+
+    def add_record(self, record):
+        """Store a packed record unless it is already stored.
+            Parameters: record (bytes from pack_board)
+            Returns: the record number"""
+        key = hash(record) & 0xFFFFFFFFFFFFFFFF
+        fingerprint = key >> 32
+        slots = self._slots
+        mask = self._mask
+        records = self._records
+        index = key & mask
+        slot = slots[index]
+        while slot:
+            number = (slot & 0xFFFFFFFF) - 1
+            if slot >> 32 == fingerprint and records[number * PACKED_SIZE:(number + 1) * PACKED_SIZE] == record:
+                self._duplicates += 1
+                return number
+            index = (index + 1) & mask
+            slot = slots[index]
+        number = self._count
+        records += record
+        slots[index] = (fingerprint << 32) | (number + 1)
+        self._count = number + 1
+        if self._count > (mask + 1) * MAX_LOAD:
+            self._grow()
+        return number
+
+    def find(self, position):
+        """Return the record number of a stored position.
+            Parameters: position (anything pack_position takes)
+            Returns: int, or None if the position is not stored"""
+        return self.find_record(pack_position(position))
+
+    def find_board(self, board, flags):
+        """Return the record number of a position given as a 64-byte board and a bitfield.
+            Parameters: board and flags
+            Returns: int, or None if the position is not stored"""
+        return self.find_record(pack_board(board, flags))
+
+    def find_record(self, record):
+        """Return the record number of a packed record.
+            Parameters: record
+            Returns: int, or None if it is not stored"""
+        key = hash(record) & 0xFFFFFFFFFFFFFFFF
+        fingerprint = key >> 32
+        slots = self._slots
+        mask = self._mask
+        index = key & mask
+        slot = slots[index]
+        while slot:
+            number = (slot & 0xFFFFFFFF) - 1
+            if slot >> 32 == fingerprint and self._records[number * PACKED_SIZE:(number + 1) * PACKED_SIZE] == record:
+                return number
+            index = (index + 1) & mask
+            slot = slots[index]
+        return None
+
+    def get_record(self, number):
+        """Return a stored record.
+            Parameters: number
+            Returns: bytes"""
+        if not 0 <= number < self._count:
+            raise IndexError(f"no position {number} in the store")
+        return bytes(self._records[number * PACKED_SIZE:(number + 1) * PACKED_SIZE])
+
+    def get_game(self, number):
+        """Return a stored position as a CompactChessVar.
+            Parameters: number
+            Returns: CompactChessVar"""
+        board, flags = unpack_record(self.get_record(number))
+        return CompactChessVar.from_bytes(bytes(board) + flags.to_bytes(4, 'little'))
+
+    def _grow(self):
+        """Double the index and place every record in it again.
+            Parameters: None
+            Returns: None"""
+        size = 2 * (self._mask + 1)
+        mask = size - 1
+        slots = array('Q', bytes(8 * size))
+        records = self._records
+        for number in range(self._count):
+            key = hash(bytes(records[number * PACKED_SIZE:(number + 1) * PACKED_SIZE])) & 0xFFFFFFFFFFFFFFFF
+            index = key & mask
+            while slots[index]:
+                index = (index + 1) & mask
+            slots[index] = ((key >> 32) << 32) | (number + 1)
+        self._slots = slots
+        self._mask = mask
+
+    def get_stats(self):
+        """Return the size of the store.
+            Parameters: None
+            Returns: dict with positions, duplicates (adds of positions already stored), record_bytes, index_bytes,
+                bytes_per_position, and load (fraction of index slots used)"""
+        record_bytes = len(self._records)
+        index_bytes = sys.getsizeof(self._slots)
+        return {'positions': self._count, 'duplicates': self._duplicates, 'record_bytes': record_bytes,
+                'index_bytes': index_bytes,
+                'bytes_per_position': (record_bytes + index_bytes) / self._count if self._count else 0.0,
+                'load': self._count / (self._mask + 1)}
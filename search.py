@@ -0,0 +1,494 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: An alpha-beta search for ChessVar positions, built on the FastBoard move generator. It includes a
+#              transposition table that can live in multiprocessing.shared_memory, and a Lazy SMP mode where several
+#              worker processes search the same root at staggered depths while sharing that one table.
+
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+from movegen import FastBoard, BLACK, TYPE_MASK, KING, DROP_SHIFT
+
+# scores are in centipawns from the side to move's point of view, and a king capture is worth MATE
+MATE = 30000
+INFINITY = 32000
+PIECE_VALUES = (0, 100, 300, 300, 500, 900, 0, 400, 400)  # indexed by piece type (king capture is scored by MATE)
+
+
+def _build_piece_square_tables():
+    """Build small positional bonuses by piece type and square, from white's side of the board (black pieces use
+        the square mirrored across the middle rank, square ^ 56). Pieces other than the king like the center,
+        pawns like to advance, rooks like the seventh rank, and the king likes to stay home.
+        Parameters: None
+        Returns: tuple of 9 tuples of 64 ints, indexed by piece type and then square"""
+    tables = [(0,) * 64]
+    for kind in range(1, 9):
+        table = []
+        for square in range(64):
+            file, rank = square % 8, square // 8
+            center = 3 - max(abs(2 * file - 7), abs(2 * rank - 7)) // 2  # 0 on the edge, 3 in the middle
+            if kind == 1:  # pawn
+                bonus = 5 * max(rank - 1, 0) + (5 if 3 <= rank <= 4 and 2 <= file <= 5 else 0)
+            elif kind == 2:  # knight
+                bonus = 8 * center - 10
+            elif kind == 4:  # rook
+                bonus = 10 if rank == 6 else 0
+            elif kind == 5:  # queen
+                bonus = 2 * center
+            elif kind == 6:  # king
+                bonus = -8 * center - (5 * rank if rank > 1 else 0)
+            else:  # bishop, falcon, and hunter
+                bonus = 4 * center
+            table.append(bonus)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+PIECE_SQUARE_TABLES = _build_piece_square_tables()
+
+# scores this close to MATE are king captures found in the search, and count the plies to the capture
+MAX_MATE_PLY = 256
+
+# transposition table bound flags
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# how often (in nodes) a worker checks whether it has been told to stop
+STOP_CHECK_NODES = 1024
+
+# how long lazy_smp_search waits for a report before checking whether a worker process has died
+LIVENESS_SECONDS = 0.5
+
+
+def score_to_table(score, ply):
+    """Convert a score for storing in the transposition table. A king capture score counts the plies from the root,
+        which depends on the path, so it is stored counting from the position itself instead.
+        Parameters: score and ply (of the position being stored)
+        Returns: int"""
+    if score >= MATE - MAX_MATE_PLY:
+        return score + ply
+    if score <= MAX_MATE_PLY - MATE:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """Convert a score read from the transposition table back to counting plies from the root (the inverse of
+        score_to_table).
+        Parameters: score and ply (of the position probed)
+        Returns: int"""
+    if score >= MATE - MAX_MATE_PLY:
+        return score - ply
+    if score <= MAX_MATE_PLY - MATE:
+        return score + ply
+    return score
+
+
+def material_eval(board):
+    """Score a position by material alone, from the side to move's point of view.
+        Parameters: board (FastBoard)
+        Returns: int"""
+    score = 0
+    for piece in board.get_squares():
+        if piece:
+            if piece & BLACK:
+                score -= PIECE_VALUES[piece & TYPE_MASK]
+            else:
+                score += PIECE_VALUES[piece & TYPE_MASK]
+    return -score if board.get_turn() else score
+
+
+def positional_eval(board):
+    """Score a position by material and piece-square bonuses, from the side to move's point of view.
+        Parameters: board (FastBoard)
+        Returns: int"""
+    score = 0
+    for square, piece in enumerate(board.get_squares()):
+        if piece:
+            kind = piece & TYPE_MASK
+            if piece & BLACK:
+                score -= PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][square ^ 56]
+            else:
+                score += PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][square]
+    return -score if board.get_turn() else score
+
+
+class TranspositionTable:
+    """A TranspositionTable object stores search results by position hash. Each entry is two 64-bit words: the
+        key XORed with the data, and the data itself. A reader only trusts an entry when the two words XOR back to
+        its key, so a torn write from another process is simply a miss and no lock is needed. The words live in a
+        plain bytearray, or in multiprocessing.shared_memory so that worker processes can share one table."""
+
+    def __init__(self, entries=1 << 20, shared_name=None, shared=False):
+        """Initialize a table with a number of entries (rounded down to a power of two). With shared=True a new
+            shared memory block is created; with shared_name an existing block is attached.
+            Parameters: entries, shared_name, and shared
+            Returns: None"""
+        size = 1
+        while size * 2 <= entries:
+            size *= 2
+        self._entries = size
+        self._mask = size - 1
+        self._shm = None
+        if shared_name is not None:
+            self._shm = shared_memory.SharedMemory(name=shared_name)
+            buffer = self._shm.buf
+        elif shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=size * 16)
+            buffer = self._shm.buf
+        else:
+            buffer = bytearray(size * 16)
+        self._words = memoryview(buffer).cast('Q')
+
+    def get_entries(self):
+        """Return the number of entries in the table.
+            Parameters: None
+            Returns: int"""
+        return self._entries
+
+    def get_shared_name(self):
+        """Return the name of the shared memory block, or None for a private table.
+            Parameters: None
+            Returns: str or None"""
+        return self._shm.name if self._shm is not None else None
+
+    def probe(self, key):
+        """Look up a position hash.
+            Parameters: key
+            Returns: (move, score, depth, flag) or None"""
+        index = (key & self._mask) << 1
+        data = self._words[index + 1]
+        if self._words[index] ^ data != key:
+            return None
+        score = ((data >> 20) & 0xFFFF) - 32768
+        return data & 0xFFFFF, score, (data >> 36) & 0xFF, (data >> 44) & 3
+
+    def store(self, key, move, score, depth, flag):
+        """Store a search result, replacing an entry unless it belongs to the same position at a greater depth.
+            Parameters: key, move, score, depth, and flag
+            Returns: None"""
+        index = (key & self._mask) << 1
+        old_data = self._words[index + 1]
+        if self._words[index] ^ old_data == key and (old_data >> 36) & 0xFF > depth:
+            return
+        data = move | ((score + 32768) << 20) | (depth << 36) | (flag << 44)
+        self._words[index] = key ^ data
+        self._words[index + 1] = data
+
+    def clear(self):
+        """Remove every entry from the table.
+            Parameters: None
+            Returns: None"""
+        for index in range(len(self._words)):
+            self._words[index] = 0
+
+    def close(self, unlink=False):
+        """Release the table's memory. The process that created a shared table should also unlink it.
+            Parameters: unlink
+            Returns: None"""
+        self._words.release()
+        if self._shm is not None:
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+
+
+class Searcher:
+    """A Searcher object runs an iterative-deepening alpha-beta search on a FastBoard. It is responsible for move
+        ordering, using the transposition table, and counting nodes. Capturing a king scores as a win, since there
+        is no check or checkmate in this variant."""
+
+    def __init__(self, table=None, evaluate=material_eval, stop_event=None):
+        """Initialize a searcher with a transposition table, an evaluation function, and an optional
+            multiprocessing event that stops the search early.
+            Parameters: table, evaluate, and stop_event
+            Returns: None"""
+        self._table = table if table is not None else TranspositionTable(1 << 16)
+        self._evaluate = evaluate
+        self._stop_event = stop_event
+        self._nodes = 0
+        self._stopped = False
+        self._deadline = None
+
+    def get_nodes(self):
+        """Return how many nodes have been searched.
+            Parameters: None
+            Returns: int"""
+        return self._nodes
+
+    def search(self, board, max_depth, time_limit=None, start_depth=1, on_depth=None):
+        """Search a position with iterative deepening up to max_depth, or until the time limit runs out.
+            on_depth, if given, is called as on_depth(depth, score, move, nodes) after each completed depth.
+            Parameters: board (FastBoard), max_depth, time_limit (seconds), start_depth, and on_depth
+            Returns: (score, best move, completed depth)"""
+        self._stopped = False
+        self._deadline = time.perf_counter() + time_limit if time_limit else None
+        best = (0, None, 0)
+        for depth in range(start_depth, max_depth + 1):
+            score, move = self._root(board, depth)
+            if self._stopped:
+                break
+            best = (score, move, depth)
+            if on_depth is not None:
+                on_depth(depth, score, move, self._nodes)
+            if abs(score) >= MATE - max_depth:
+                break
+        return best
+
+    def search_lines(self, board, max_depth, lines=3, time_limit=None, on_depth=None):
+        """Search a position with iterative deepening and keep the best few root moves with exact scores (multi-PV).
+            on_depth, if given, is called as on_depth(depth, lines found, nodes) after each completed depth.
+            Parameters: board (FastBoard), max_depth, lines, time_limit (seconds), and on_depth
+            Returns: list of (score, move), best first, from the last completed depth"""
+        self._stopped = False
+        self._deadline = time.perf_counter() + time_limit if time_limit else None
+        best = []
+        for depth in range(1, max_depth + 1):
+            found = self._root_lines(board, depth, lines)
+            if self._stopped:
+                break
+            best = found
+            if on_depth is not None:
+                on_depth(depth, found, self._nodes)
+            if not found or abs(found[0][0]) >= MATE - max_depth:
+                break
+        return best
+
+    def _root_lines(self, board, depth, lines):
+        """Search every root move to a depth, with a window that only proves a move is not among the best lines.
+            Parameters: board, depth, and lines
+            Returns: list of (score, move), best first"""
+        found = []
+        entry = self._table.probe(board.get_hash())
+        for move in self._ordered_moves(board, entry[0] if entry is not None else None):
+            captured = board.make_move(move)
+            if captured & TYPE_MASK == KING:
+                score = MATE
+            else:
+                alpha = found[-1][0] if len(found) == lines else -INFINITY
+                score = -self._negamax(board, depth - 1, -INFINITY, -alpha, 1)
+            board.unmake_move()
+            if self._stopped:
+                break
+            if len(found) < lines or score > found[-1][0]:
+                found.append((score, move))
+                found.sort(key=lambda line: -line[0])
+                del found[lines:]
+        if not self._stopped and found:
+            self._table.store(board.get_hash(), found[0][1], found[0][0], depth, EXACT)
+        return found
+
+    def principal_variation(self, board, move, length):
+        """Follow the table's best moves after a root move to build the line the search expects.
+            Parameters: board (FastBoard, left unchanged), move (the root move), and length (most moves to return)
+            Returns: list of move ints, starting with move"""
+        line = [move]
+        captured = board.make_move(move)
+        while len(line) < length and captured & TYPE_MASK != KING:
+            entry = self._table.probe(board.get_hash())
+            if entry is None or entry[0] not in board.generate_moves():
+                break
+            line.append(entry[0])
+            captured = board.make_move(entry[0])
+        for _ in line:
+            board.unmake_move()
+        return line
+
+    def _root(self, board, depth):
+        """Search every root move to a depth.
+            Parameters: board and depth
+            Returns: (score, best move)"""
+        alpha, beta = -INFINITY, INFINITY
+        best_move = None
+        entry = self._table.probe(board.get_hash())
+        for move in self._ordered_moves(board, entry[0] if entry is not None else None):
+            captured = board.make_move(move)
+            if captured & TYPE_MASK == KING:
+                score = MATE
+            else:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            board.unmake_move()
+            if self._stopped:
+                break
+            if score > alpha or best_move is None:
+                alpha, best_move = score, move
+        if not self._stopped and best_move is not None:
+            self._table.store(board.get_hash(), best_move, alpha, depth, EXACT)
+        return alpha, best_move
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        """Search a position with alpha-beta pruning.
+            Parameters: board, depth, alpha, beta, and ply
+            Returns: score for the side to move"""
+        self._nodes += 1
+        if self._nodes % STOP_CHECK_NODES == 0:
+            self._check_stop()
+        if self._stopped:
+            return 0
+        if depth <= 0:
+            return self._evaluate(board)
+
+        key = board.get_hash()
+        entry = self._table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move, score, entry_depth, flag = entry
+            score = score_from_table(score, ply)
+            if entry_depth >= depth:
+                if flag == EXACT or (flag == LOWER and score >= beta) or (flag == UPPER and score <= alpha):
+                    return score
+
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, None
+        for move in self._ordered_moves(board, table_move):
+            captured = board.make_move(move)
+            if captured & TYPE_MASK == KING:
+                board.unmake_move()
+                score = MATE - ply
+                self._table.store(key, move, score_to_table(score, ply), depth, LOWER)
+                return score
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if self._stopped:
+                return 0
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_move is None:
+            # no legal moves (possible only in contrived positions)
+            return 0
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._table.store(key, best_move, score_to_table(best_score, ply), depth, flag)
+        return best_score
+
+    def _ordered_moves(self, board, table_move=None):
+        """Return the legal moves with the table move first, then captures from the most valuable victim.
+            Parameters: board and table_move
+            Returns: list of move ints"""
+        squares = board.get_squares()
+        scored = []
+        for move in board.generate_moves():
+            if move == table_move:
+                order = 100000
+            elif move >> DROP_SHIFT:
+                order = 0
+            else:
+                victim = squares[(move >> 6) & 63] & TYPE_MASK
+                order = 50000 if victim == KING else PIECE_VALUES[victim] * 10 - PIECE_VALUES[squares[move & 63]
+                                                                                               & TYPE_MASK]
+            scored.append((order, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def _check_stop(self):
+        """Stop the search if the deadline has passed or the stop event is set.
+            Parameters: None
+            Returns: None"""
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._stopped = True
+        if self._stop_event is not None and self._stop_event.is_set():
+            self._stopped = True
+
+
+def _smp_worker(worker_id, board, shared_name, entries, max_depth, time_limit, stop_event, results):
+    """Run one Lazy SMP worker: search the root with the shared table, starting one depth later on odd workers
+        so that the workers spread out over the tree instead of repeating each other's work.
+        Parameters: worker_id, board, shared_name, entries, max_depth, time_limit, stop_event, and results (queue)
+        Returns: None"""
+    table = TranspositionTable(entries, shared_name=shared_name)
+    searcher = Searcher(table, stop_event=stop_event)
+    start = time.perf_counter()
+    depth_times = {}
+
+    def record_depth(depth, score, move, nodes):
+        """Remember how long it took to finish each depth."""
+        depth_times[depth] = time.perf_counter() - start
+
+    try:
+        score, move, depth = searcher.search(board, max_depth, time_limit, 1 + worker_id % 2, record_depth)
+        if worker_id == 0:
+            stop_event.set()
+        results.put((worker_id, score, move, depth, searcher.get_nodes(), depth_times, None))
+    except Exception as error:
+        results.put((worker_id, 0, None, 0, searcher.get_nodes(), depth_times, repr(error)))
+    finally:
+        table.close()
+
+
+def _collect_reports(processes, results):
+    """Take one report from every Lazy SMP worker. A worker process that exits without reporting (killed, or
+        crashed in a way its own error handling could not catch) gets an error report instead of being waited on
+        forever.
+        Parameters: processes and results (queue)
+        Returns: list of reports by worker id"""
+    reports = {}
+    exited = set()
+    while len(reports) < len(processes):
+        try:
+            report = results.get(timeout=LIVENESS_SECONDS)
+            reports[report[0]] = report
+        except queue.Empty:
+            for worker_id, process in enumerate(processes):
+                if worker_id in reports or process.exitcode is None:
+                    continue
+                if worker_id in exited:  # gone for a whole wait and still no report
+                    reports[worker_id] = (worker_id, 0, None, 0, 0, {},
+                                          f"worker exited with code {process.exitcode}")
+                exited.add(worker_id)
+    return [reports[worker_id] for worker_id in range(len(processes))]
+
+
+def lazy_smp_search(board, max_depth, workers=None, time_limit=None, table_entries=1 << 20):
+    """Search a position with several worker processes sharing one transposition table (Lazy SMP). The main
+        worker's result is used unless a helper finished a deeper iteration. Workers that fail are left out, and
+        their errors are returned; if every worker fails, RuntimeError is raised.
+        Parameters: board (FastBoard or ChessVar), max_depth, workers (defaults to the CPU count), time_limit,
+            and table_entries
+        Returns: dict with score, move, depth, nodes, seconds, nps, depth_times (seconds to reach each depth),
+            and errors (list of failed workers' errors)"""
+    if not isinstance(board, FastBoard):
+        board = FastBoard.from_game(board)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    table = TranspositionTable(table_entries, shared=True)
+    stop_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    start = time.perf_counter()
+    processes = [multiprocessing.Process(target=_smp_worker,
+                                         args=(worker_id, board.copy(), table.get_shared_name(),
+                                               table.get_entries(), max_depth, time_limit, stop_event, results))
+                 for worker_id in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        reports = _collect_reports(processes, results)
+        for process in processes:
+            process.join()
+    finally:
+        table.close(unlink=True)
+    seconds = time.perf_counter() - start
+
+    errors = [report[6] for report in reports if report[6] is not None]
+    finished = [report for report in reports if report[6] is None]
+    if not finished:
+        raise RuntimeError(f"every Lazy SMP worker failed: {errors}")
+    best = finished[0]
+    for report in finished[1:]:
+        if report[3] > best[3] and report[2] is not None:
+            best = report
+    nodes = sum(report[4] for report in reports)
+    return {'score': best[1], 'move': best[2], 'depth': best[3], 'nodes': nodes, 'seconds': seconds,
+            'nps': nodes / seconds if seconds else 0.0, 'depth_times': finished[0][5], 'errors': errors}
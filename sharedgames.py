@@ -0,0 +1,333 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A game table in multiprocessing.shared_memory, so any server process can play any game instead of
+#              routing every request to the process that owns it. Each game is a fixed-size slot holding a sequence
+#              number, a count of committed changes, and the CompactChessVar record (board, turn, game state, fairy
+#              reserve and eligibility, and pawn double-step flags). The sequence number makes each slot a seqlock:
+#              it is odd while a write is in progress, and readers copy the record without locking, retrying if
+#              the number changed underneath them. A move is validated against such a snapshot, outside any lock,
+#              and committed only if the slot's sequence number is still the one the snapshot was taken at;
+#              otherwise it is validated again on the new position. Python cannot compare-and-swap shared memory,
+#              so writers of a slot still exclude each other with one of a fixed set of locks (slot number modulo
+#              LOCK_STRIPES), held only for the few stores of a commit. A writer process that dies in the middle of
+#              a commit leaves its slot's sequence number odd and its lock held; readers and writers of that slot
+#              give up with RuntimeError after STUCK_SECONDS instead of waiting for it forever.
+
+import multiprocessing
+import queue
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+from compact import CompactChessVar, RECORD_SIZE, STATE_MASK
+
+HEADER_SIZE = 8  # the number of games created
+SLOT_SIZE = 80  # sequence number (8 bytes), committed changes (4 bytes), record (68 bytes)
+RECORD_OFFSET = 12
+LOCK_STRIPES = 64
+DEFAULT_SLOTS = 1024
+STUCK_SECONDS = 2.0  # how long a slot may stay mid-write (or its lock held) before its writer is taken for dead
+LIVENESS_SECONDS = 0.5  # how often measure_throughput checks that its workers are alive while no counts come
+
+_START_RECORD = CompactChessVar().to_bytes()
+
+
+class SharedGameTable:
+    """A SharedGameTable object is one process's view of the shared game table. It is responsible for creating
+        games, reading consistent snapshots of them through each slot's seqlock, and validating and committing
+        moves from any process."""
+
+    def __init__(self, slots=DEFAULT_SLOTS, handle=None):
+        """Initialize a table. Without a handle a new shared memory block and its locks are created; with the
+            handle of an existing table (from get_handle) that table is attached, for example in a worker process.
+            Parameters: slots (most games the table can hold) and handle
+            Returns: None"""
+        if handle is not None:
+            shared_name, slots, self._locks, self._create_lock = handle
+            self._shm = shared_memory.SharedMemory(name=shared_name)
+        else:
+            self._locks = tuple(multiprocessing.Lock() for _ in range(LOCK_STRIPES))
+            self._create_lock = multiprocessing.Lock()
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + slots * SLOT_SIZE)
+        self._slots = slots
+        self._buffer = self._shm.buf
+        self._words = self._buffer.cast('Q')
+        self._halves = self._buffer.cast('I')
+        self._conflicts = 0
+        self._read_retries = 0
+
+    def get_handle(self):
+        """Return what another process needs to attach this table. Pass it to the process when starting it, since
+            the locks can only be handed down that way.
+            Parameters: None
+            Returns: tuple"""
+        return self._shm.name, self._slots, self._locks, self._create_lock
+
+    def get_slots(self):
+        """Return the most games the table can hold.
+            Parameters: None
+            Returns: int"""
+        return self._slots
+
+    def get_game_count(self):
+        """Return the number of games created so far.
+            Parameters: None
+            Returns: int"""
+        return self._words[0]
+
+    def create_game(self):
+        """Create a game at the starting position.
+            Parameters: None
+            Returns: the game number"""
+        with self._create_lock:
+            number = self._words[0]
+            if number >= self._slots:
+                raise IndexError(f"the table is full ({self._slots} games)")
+            offset = HEADER_SIZE + number * SLOT_SIZE
+            self._buffer[offset + RECORD_OFFSET:offset + SLOT_SIZE] = _START_RECORD
+            self._words[0] = number + 1
+        return number
+
+    def _offset(self, number):
+        """Return the byte offset of a game's slot.
+            Parameters: number
+            Returns: int"""
+        if not 0 <= number < self._words[0]:
+            raise IndexError(f"no game {number} in the table")
+        return HEADER_SIZE + number * SLOT_SIZE
+
+    def read(self, number):
+        """Copy a game's record without locking, retrying until no write overlapped the copy.
+            Parameters: number
+            Returns: (sequence number, record bytes)"""
+        offset = self._offset(number)
+        words = self._words
+        index = offset >> 3
+        odd = None  # the odd sequence number last seen, and since when
+        while True:
+            sequence = words[index]
+            if not sequence & 1:
+                record = bytes(self._buffer[offset + RECORD_OFFSET:offset + SLOT_SIZE])
+                if words[index] == sequence:
+                    return sequence, record
+            elif sequence != odd:
+                odd = sequence
+                since = time.monotonic()
+            elif time.monotonic() - since > STUCK_SECONDS:
+                raise RuntimeError(f"game {number} has been mid-write for {STUCK_SECONDS} s; "
+                                   f"the process writing it probably died")
+            else:
+                time.sleep(0)  # let a writer that was interrupted mid-commit finish instead of spinning on it
+            self._read_retries += 1
+
+    def _commit(self, number, sequence, record):
+        """Write a game's new record if the slot has not changed since the snapshot it was computed from.
+            Parameters: number, sequence (from read), and record
+            Returns: True, or False if another write got there first"""
+        offset = HEADER_SIZE + number * SLOT_SIZE
+        index = offset >> 3
+        words = self._words
+        lock = self._locks[number % LOCK_STRIPES]
+        if not lock.acquire(timeout=STUCK_SECONDS):
+            raise RuntimeError(f"the lock of game {number} has been held for {STUCK_SECONDS} s; "
+                               f"the process holding it probably died")
+        try:
+            if words[index] != sequence:
+                return False
+            words[index] = sequence + 1
+            self._buffer[offset + RECORD_OFFSET:offset + SLOT_SIZE] = record
+            self._halves[(offset >> 2) + 2] += 1
+            words[index] = sequence + 2
+        finally:
+            lock.release()
+        return True
+
+    def _play(self, number, method, first, second):
+        """Validate a move on a snapshot and commit it, validating again if another process changed the game first.
+            Parameters: number, method ('make_move' or 'enter_fairy_piece'), and its two arguments
+            Returns: True or False"""
+        while True:
+            sequence, record = self.read(number)
+            game = CompactChessVar.from_bytes(record)
+            if not getattr(game, method)(first, second):
+                return False
+            if self._commit(number, sequence, game.to_bytes()):
+                return True
+            self._conflicts += 1
+
+    def make_move(self, number, moved_from, move_to):
+        """Move a piece in a game, by the same rules as ChessVar.make_move.
+            Parameters: number, moved_from, and move_to
+            Returns: True or False"""
+        return self._play(number, 'make_move', moved_from, move_to)
+
+    def enter_fairy_piece(self, number, piece_type, move_to):
+        """Enter a falcon or hunter in a game, by the same rules as ChessVar.enter_fairy_piece.
+            Parameters: number, piece_type ('F', 'H', 'f', or 'h'), and move_to
+            Returns: True or False"""
+        return self._play(number, 'enter_fairy_piece', piece_type, move_to)
+
+    def reset_game(self, number, finished_only=False):
+        """Put a game back at the starting position.
+            Parameters: number and finished_only (only reset it if it is over, so that several processes noticing
+                the same finished game reset it once)
+            Returns: True, or False if finished_only and the game is not over"""
+        while True:
+            sequence, record = self.read(number)
+            if finished_only and not int.from_bytes(record[64:RECORD_SIZE], 'little') & STATE_MASK:
+                return False
+            if self._commit(number, sequence, _START_RECORD):
+                return True
+            self._conflicts += 1
+
+    def get_game(self, number):
+        """Return a consistent copy of a game.
+            Parameters: number
+            Returns: CompactChessVar"""
+        return CompactChessVar.from_bytes(self.read(number)[1])
+
+    def get_game_state(self, number):
+        """Return the state of a game.
+            Parameters: number
+            Returns: 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'"""
+        return self.get_game(number).get_game_state()
+
+    def get_turn(self, number):
+        """Return whose turn it is in a game.
+            Parameters: number
+            Returns: 'WHITE' or 'BLACK'"""
+        return self.get_game(number).get_turn()
+
+    def get_commits(self, number):
+        """Return how many changes (moves and resets) have been committed to a game.
+            Parameters: number
+            Returns: int"""
+        return self._halves[(self._offset(number) >> 2) + 2]
+
+    def get_stats(self):
+        """Return this process's contention counters.
+            Parameters: None
+            Returns: dict with conflicts (commits that lost to another process and were validated again) and
+                read_retries (snapshots copied again because a write overlapped them)"""
+        return {'conflicts': self._conflicts, 'read_retries': self._read_retries}
+
+    def close(self, unlink=False):
+        """Release this process's view of the table. The process that created the table should also unlink it.
+            Parameters: unlink
+            Returns: None"""
+        self._words.release()
+        self._halves.release()
+        self._buffer = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def play_random_moves(handle, seconds, seed, hot_games=0, hot_share=0.0):
+    """Play random legal moves in random games of a table for a while, restarting games that end. Used as the
+        load of the throughput benchmark, in worker processes.
+        Parameters: handle (from get_handle), seconds, seed, hot_games (how many of the first games are hot), and
+            hot_share (fraction of requests that go to a hot game)
+        Returns: dict with commits, rejected (moves that were no longer legal when played), conflicts, and
+            read_retries"""
+    table = SharedGameTable(handle=handle)
+    rng = random.Random(seed)
+    games = table.get_game_count()
+    commits = rejected = 0
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            number = rng.randrange(hot_games) if hot_games and rng.random() < hot_share else rng.randrange(games)
+            game = table.get_game(number)
+            if game.get_game_state() != 'UNFINISHED':
+                commits += table.reset_game(number, finished_only=True)
+                continue
+            board = game.to_fast_board()
+            method, first, second = board.to_chess_var_move(board.random_move(rng))
+            if getattr(table, method)(number, first, second):
+                commits += 1
+            else:
+                rejected += 1
+        stats = table.get_stats()
+    finally:
+        table.close()
+    return dict(stats, commits=commits, rejected=rejected)
+
+
+def _play_worker(worker, handle, seconds, seed, hot_games, hot_share, results):
+    """Run play_random_moves in a worker process and send back its counts.
+        Parameters: worker (number), handle, seconds, seed, hot_games, hot_share, and results (queue)
+        Returns: None"""
+    results.put((worker, play_random_moves(handle, seconds, seed, hot_games, hot_share)))
+
+
+def _collect_counts(processes, results):
+    """Take the counts of every worker process of a throughput run. A worker process that exits without sending
+        them (killed, or failed) raises RuntimeError instead of being waited on forever.
+        Parameters: processes and results (queue)
+        Returns: list of count dicts by worker number"""
+    counts = {}
+    exited = set()
+    while len(counts) < len(processes):
+        try:
+            worker, count = results.get(timeout=LIVENESS_SECONDS)
+            counts[worker] = count
+        except queue.Empty:
+            for worker, process in enumerate(processes):
+                if worker in counts or process.exitcode is None:
+                    continue
+                if worker in exited:  # gone for a whole wait and still no counts
+                    raise RuntimeError(f"worker {worker} exited with code {process.exitcode} without its counts")
+                exited.add(worker)
+    return [counts[worker] for worker in range(len(processes))]
+
+
+def measure_throughput(workers, seconds=2.0, games=256, hot_games=4, hot_share=0.5, seed=1):
+    """Play random moves on a new table from several processes at once and count the committed changes.
+        Parameters: workers (processes), seconds, games, hot_games, hot_share, and seed
+        Returns: dict with workers, commits, commits_per_second, rejected, conflicts, read_retries, and lost (commits
+            the workers reported that are missing from the slots' counts, which should be 0)"""
+    table = SharedGameTable(games)
+    try:
+        for _ in range(games):
+            table.create_game()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_play_worker,
+                                             args=(worker, table.get_handle(), seconds, seed + worker, hot_games,
+                                                   hot_share, results))
+                     for worker in range(workers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        try:
+            counts = _collect_counts(processes, results)
+        except RuntimeError:
+            for process in processes:
+                process.terminate()
+            raise
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+        totals = {key: sum(count[key] for count in counts) for key in counts[0]}
+        slot_commits = sum(table.get_commits(number) for number in range(games))
+    finally:
+        table.close(unlink=True)
+    return dict(totals, workers=workers, commits_per_second=totals['commits'] / elapsed,
+                lost=totals['commits'] - slot_commits)
+
+
+def main(args):
+    """Measure throughput from the command line: python sharedgames.py [WORKERS [SECONDS]]
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    workers = int(args[0]) if args else multiprocessing.cpu_count()
+    seconds = float(args[1]) if len(args) > 1 else 2.0
+    result = measure_throughput(workers, seconds)
+    print(f"{workers} workers: {result['commits_per_second']:,.0f} commits/s, {result['conflicts']} conflicts, "
+          f"{result['read_retries']} read retries, {result['lost']} lost")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
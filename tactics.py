@@ -0,0 +1,284 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A tactic miner that builds puzzles from archived games. Every position of every game is searched for
+#              a forced king capture (the way make_move ends a game) within a number of plies: the side to move
+#              needs one move that wins against every reply. Positions are deduplicated by Zobrist hash, and each
+#              puzzle is written with the moves that reach it and a solution line where the defender holds out as
+#              long as possible. Archives are split into chunks of games that a process pool mines in parallel;
+#              a chunk only knows its own positions, so ones reached in several chunks (the opening positions above
+#              all) are searched in each, and the summary counts distinct positions and searches separately.
+
+import json
+import multiprocessing
+import sys
+import time
+
+from export import move_label
+from movegen import FastBoard, REACH_MASKS, BETWEEN_MASKS, BLACK, TYPE_MASK, PAWN, KING, move_name
+
+DEFAULT_MAX_PLIES = 3
+DEFAULT_MIN_PLIES = 3
+DEFAULT_CHUNK_GAMES = 50
+MAX_CACHE_ENTRIES = 1 << 20
+
+
+def king_capture(board):
+    """Find a move that captures the other side's king, without generating every move. A piece can take the king
+        if the king's square is in its reach mask and nothing stands between them; pawns only take diagonally.
+        Parameters: board (FastBoard)
+        Returns: move int, or None"""
+    if board.get_state():
+        return None
+    squares = board.get_squares()
+    color = BLACK if board.get_turn() else 0
+    try:
+        king_sq = squares.index(KING | (color ^ BLACK))
+    except ValueError:
+        return None
+    occupied = 0
+    for index, piece in enumerate(squares):
+        if piece:
+            occupied |= 1 << index
+    for from_sq, piece in enumerate(squares):
+        if not piece or piece & BLACK != color or not REACH_MASKS[piece][from_sq] >> king_sq & 1:
+            continue
+        if piece & TYPE_MASK == PAWN:
+            if (from_sq ^ king_sq) & 7:
+                return from_sq | (king_sq << 6)
+        elif not BETWEEN_MASKS[from_sq * 64 + king_sq] & occupied:
+            return from_sq | (king_sq << 6)
+    return None
+
+
+class TacticSearch:
+    """A TacticSearch object answers whether the side to move can force a king capture within some plies. It is
+        responsible for the AND-OR search over FastBoard moves and for caching proven and refuted positions by
+        hash."""
+
+    def __init__(self):
+        """Initialize a search with an empty cache.
+            Parameters: None
+            Returns: None"""
+        self._cache = {}  # (position hash, plies) -> True or False
+        self._nodes = 0
+
+    def get_nodes(self):
+        """Return how many positions have been searched.
+            Parameters: None
+            Returns: int"""
+        return self._nodes
+
+    def wins(self, board, plies):
+        """Return whether the side to move can force a king capture within plies (counting both sides' moves).
+            Parameters: board (FastBoard) and plies
+            Returns: True or False"""
+        if king_capture(board) is not None:
+            return True
+        if plies < 3 or board.get_state():
+            return False
+        key = (board.get_hash(), plies)
+        known = self._cache.get(key)
+        if known is not None:
+            return known
+        self._nodes += 1
+        found = False
+        for move in board.generate_moves():
+            board.make_move(move)
+            found = self._loses(board, plies - 1)
+            board.unmake_move()
+            if found:
+                break
+        if len(self._cache) >= MAX_CACHE_ENTRIES:
+            self._cache.clear()
+        self._cache[key] = found
+        return found
+
+    def _loses(self, board, plies):
+        """Return whether every reply of the side to move leaves the other side a forced king capture within
+            plies - 1. A side with no moves, or that can take the attacker's king itself, is not lost.
+            Parameters: board (FastBoard) and plies
+            Returns: True or False"""
+        if king_capture(board) is not None:
+            return False
+        self._nodes += 1
+        replies = board.generate_moves()
+        if not replies:
+            return False
+        for reply in replies:
+            board.make_move(reply)
+            lost = self.wins(board, plies - 1)
+            board.unmake_move()
+            if not lost:
+                return False
+        return True
+
+    def shortest_win(self, board, max_plies, min_plies=1):
+        """Return the fewest plies (odd, between min_plies and max_plies) in which the side to move forces a king
+            capture.
+            Parameters: board (FastBoard), max_plies, and min_plies
+            Returns: int, or None if there is no forced win that short"""
+        for plies in range(1, max_plies + 1, 2):
+            if self.wins(board, plies):
+                return plies if plies >= min_plies else None
+        return None
+
+    def solution(self, board, plies):
+        """Return a solution line for a forced win in plies: a winning move for the attacker and, for the defender,
+            the reply that holds out longest, until the king is captured.
+            Parameters: board (FastBoard, left unchanged) and plies (from shortest_win)
+            Returns: list of move ints"""
+        line = []
+        while True:
+            capture = king_capture(board)
+            if capture is not None:
+                line.append(capture)
+                break
+            for move in board.generate_moves():
+                board.make_move(move)
+                if self._loses(board, plies - 1):
+                    break
+                board.unmake_move()
+            line.append(move)
+            best = None
+            for reply in board.generate_moves():
+                board.make_move(reply)
+                needed = self.shortest_win(board, plies - 2)
+                board.unmake_move()
+                if best is None or needed > best[0]:
+                    best = (needed, reply)
+            board.make_move(best[1])
+            line.append(best[1])
+            plies = best[0]
+        for _ in range(len(line) - 1):
+            board.unmake_move()
+        return line
+
+
+def plan_chunks(archive_path, chunk_games=DEFAULT_CHUNK_GAMES):
+    """Split an archive into chunks of games by byte offset, reading only line lengths.
+        Parameters: archive_path and chunk_games
+        Returns: list of (byte offset, number of games)"""
+    chunks = []
+    offset = 0
+    start, count = 0, 0
+    with open(archive_path, 'rb') as file:
+        for line in file:
+            if line.strip():
+                if count == 0:
+                    start = offset
+                count += 1
+                if count == chunk_games:
+                    chunks.append((start, count))
+                    count = 0
+            offset += len(line)
+    if count:
+        chunks.append((start, count))
+    return chunks
+
+
+def _mine_chunk(task):
+    """Search every position of a chunk of games. Used by mine_archive, also in worker processes.
+        Parameters: task (archive path, (byte offset, number of games), max_plies, min_plies)
+        Returns: (hashes of the positions searched, nodes searched, list of puzzles)"""
+    archive_path, (offset, count), max_plies, min_plies = task
+    search = TacticSearch()
+    seen = set()
+    puzzles = []
+    with open(archive_path, 'rb') as file:
+        file.seek(offset)
+        while count:
+            line = file.readline()
+            if not line:
+                raise ValueError(f"the archive ended {count} games before the end of the chunk at byte {offset}; "
+                                 f"it changed after the chunks were planned")
+            if not line.strip():
+                continue
+            count -= 1
+            record = json.loads(line)
+            board = FastBoard()
+            for ply, name in enumerate(record['moves'] + [None]):
+                key = board.get_hash()
+                if key not in seen and not board.get_state():
+                    seen.add(key)
+                    plies = search.shortest_win(board, max_plies, min_plies)
+                    if plies is not None:
+                        puzzles.append({'hash': f"{key:016x}", 'game': record['id'], 'ply': ply,
+                                        'to_move': 'BLACK' if board.get_turn() else 'WHITE', 'plies': plies,
+                                        'moves': record['moves'][:ply],
+                                        'solution': [move_name(move) for move in search.solution(board, plies)]})
+                if name is not None:
+                    board.make_move(move_label(name))
+    return list(seen), search.get_nodes(), puzzles
+
+
+def mine_archive(archive_path, puzzle_path, max_plies=DEFAULT_MAX_PLIES, min_plies=DEFAULT_MIN_PLIES,
+                 processes=None, chunk_games=DEFAULT_CHUNK_GAMES):
+    """Mine every position of an archive for forced king captures and write one JSON puzzle per line. Puzzles
+        are written in archive order, keeping only the first game that reached each position.
+        Parameters: archive_path, puzzle_path, max_plies, min_plies (skip wins shorter than this, such as a king
+            that can be taken right away), processes (default: one per CPU), and chunk_games
+        Returns: dict with positions (distinct positions scanned), searches (positions searched, counting a
+            position once for every chunk that reached it), nodes, puzzles, duplicates, seconds, and
+            positions_per_second (distinct positions per second)"""
+    start = time.perf_counter()
+    tasks = [(archive_path, chunk, max_plies, min_plies) for chunk in plan_chunks(archive_path, chunk_games)]
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    seen = set()
+    scanned = set()
+    searches = nodes = written = duplicates = 0
+    with open(puzzle_path, 'w', encoding='utf-8') as file:
+        if processes > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(processes, len(tasks)))
+            results = pool.imap(_mine_chunk, tasks)
+        else:
+            pool = None
+            results = map(_mine_chunk, tasks)
+        try:
+            for keys, searched, puzzles in results:
+                scanned.update(keys)
+                searches += len(keys)
+                nodes += searched
+                for puzzle in puzzles:
+                    if puzzle['hash'] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(puzzle['hash'])
+                    file.write(json.dumps(puzzle, separators=(',', ':')) + '\n')
+                    written += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    seconds = time.perf_counter() - start
+    positions = len(scanned)
+    return {'positions': positions, 'searches': searches, 'nodes': nodes, 'puzzles': written, 'duplicates': duplicates,
+            'seconds': seconds, 'positions_per_second': positions / seconds if seconds else 0.0}
+
+
+def read_puzzles(path):
+    """Read the puzzles written by mine_archive.
+        Parameters: path
+        Returns: generator of puzzle dicts"""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(args):
+    """Mine an archive from the command line: python tactics.py ARCHIVE PUZZLES [MAX_PLIES]
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    if len(args) not in (2, 3):
+        print("usage: python tactics.py ARCHIVE PUZZLES [MAX_PLIES]")
+        return
+    summary = mine_archive(args[0], args[1], int(args[2]) if len(args) == 3 else DEFAULT_MAX_PLIES)
+    print(f"{summary['positions']:,} positions in {summary['seconds']:.1f} s "
+          f"({summary['positions_per_second']:,.0f} positions/s), {summary['puzzles']} puzzles, "
+          f"{summary['duplicates']} duplicates")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
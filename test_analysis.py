@@ -0,0 +1,39 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for analysis.py: streams end with an error when the analysis worker fails or dies.
+
+import asyncio
+
+import pytest
+
+from analysis import AnalysisEngine
+from movegen import FastBoard
+
+
+class UnreadableBoard(FastBoard):
+    """An UnreadableBoard object is a FastBoard whose bytes the analysis worker cannot load."""
+
+    def to_bytes(self):
+        return b'bad'
+
+
+def test_streams_end_when_the_worker_fails_or_dies():
+    async def run():
+        await AnalysisEngine().close()
+        async with AnalysisEngine() as engine:
+            with pytest.raises(RuntimeError, match='analysis failed'):
+                async for _ in engine.analyze(UnreadableBoard()):
+                    pass
+            results = [result async for result in engine.analyze(FastBoard(), max_depth=2)]
+            assert results
+            stream = engine.analyze(FastBoard())
+            await stream.__anext__()
+            engine._process.kill()
+            with pytest.raises(RuntimeError):
+                async for _ in stream:
+                    pass
+            with pytest.raises(RuntimeError):
+                engine.analyze(FastBoard())
+
+    asyncio.run(asyncio.wait_for(run(), 60))
@@ -0,0 +1,58 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for calltrace.py: replaying recorded traces against ChessVar classes and build directories.
+
+import os
+import random
+
+import calltrace
+from ChessVar import ChessVar
+from movegen import FastBoard
+
+
+def _record_trace(path, games=3, moves=40, seed=1):
+    """Record a trace of random ChessVar games, with list-returning calls after every move.
+        Parameters: path, games, moves, and seed
+        Returns: None"""
+    rng = random.Random(seed)
+    with calltrace.TraceRecorder(str(path)) as recorder:
+        for _ in range(games):
+            game = recorder.wrap(ChessVar())
+            for _ in range(moves):
+                board = FastBoard.from_game(game.get_game())
+                if board.get_state():
+                    break
+                method, first, second = board.to_chess_var_move(board.random_move(rng))
+                getattr(game, method)(first, second)
+                game.get_lost_pieces('w')
+                game.get_legal_drops()
+                game.get_square('e2')
+
+
+class ReversedLostPieces(ChessVar):
+    """A ReversedLostPieces object is a ChessVar that lists lost pieces in the wrong order."""
+
+    def get_lost_pieces(self, color):
+        return super().get_lost_pieces(color)[::-1]
+
+
+def _mismatches(report):
+    """Return the methods of a replay report with different results, and how many.
+        Parameters: report (from replay_trace)
+        Returns: dict of method -> mismatches"""
+    return {method: stats['mismatches'] for method, stats in report.items()
+            if method != 'total' and stats['mismatches']}
+
+
+def test_trace_replay_compares_list_results(tmp_path, capsys):
+    path = tmp_path / 'games.trace'
+    _record_trace(path)
+    assert _mismatches(calltrace.replay_trace(str(path))) == {}
+    assert set(_mismatches(calltrace.replay_trace(str(path), ReversedLostPieces))) == {'get_lost_pieces'}
+
+
+def test_trace_replay_uses_the_build_directory(tmp_path, capsys):
+    path = tmp_path / 'games.trace'
+    _record_trace(path, games=1)
+    assert _mismatches(calltrace.replay_build(str(path), os.path.dirname(os.path.abspath(__file__)))) == {}
@@ -0,0 +1,63 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for canonical.py: a position and its color-flipped twin have the same moves (mapped by
+#              transform_move), and the canonical adapters share one entry between them.
+
+import random
+
+from canonical import (COLOR_FLIP, IDENTITY, CanonicalMoveCache, CanonicalTable, canonical, canonical_key,
+                       flip_board, flip_position, transform_move)
+from ChessVar import ChessVar
+from movecache import MoveCache
+from movegen import FastBoard
+from search import EXACT, TranspositionTable
+
+
+def _random_boards(count, seed):
+    """Collect the positions of random games.
+        Parameters: count and seed
+        Returns: list of FastBoard"""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = FastBoard()
+        while not board.get_state() and len(boards) < count:
+            boards.append(board.copy())
+            board.make_move(board.random_move(rng))
+    return boards
+
+
+def test_flipped_positions_have_the_flipped_moves():
+    for board in _random_boards(400, 1):
+        flipped = flip_board(board)
+        assert flipped.get_turn() != board.get_turn()
+        assert sorted(flipped.generate_moves()) == sorted(transform_move(move, COLOR_FLIP)
+                                                          for move in board.generate_moves())
+        assert flip_board(flipped).get_hash() == board.get_hash()
+        assert canonical_key(board) == canonical_key(flipped)
+
+
+def test_canonical_positions_have_white_to_move(capsys):
+    board = FastBoard()
+    assert canonical(board) == (board, IDENTITY)
+    board.make_move(board.to_move('e2', 'e4'))
+    twin, transform = canonical(board)
+    assert transform == COLOR_FLIP and not twin.get_turn()
+    game = ChessVar()
+    game.make_move('e2', 'e4')
+    position, transform = canonical(game.snapshot())
+    assert transform == COLOR_FLIP and position == flip_position(game.snapshot())
+    assert flip_position(position) == game.snapshot()
+
+
+def test_adapters_share_entries_between_twins():
+    moves = CanonicalMoveCache(MoveCache())
+    table = CanonicalTable(TranspositionTable(1 << 10))
+    for board in _random_boards(200, 2):
+        assert moves.get_moves(board) == frozenset(board.generate_moves())
+        move = board.generate_moves()[0]
+        assert moves.is_legal(board, move)
+        table.store(board, move, 42, 3, EXACT)
+        assert table.probe(board) == (move, 42, 3, EXACT)
+        assert table.probe(flip_board(board)) == (transform_move(move, COLOR_FLIP), 42, 3, EXACT)
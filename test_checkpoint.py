@@ -0,0 +1,68 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for checkpoint.py: live games restore to the same positions, lazily, and keep playing.
+
+import random
+
+import pytest
+
+from checkpoint import RestoredGames, write_checkpoint
+from ChessVar import ChessVar
+from compact import CompactChessVar
+from movegen import FastBoard
+
+
+def _random_game(seed, moves):
+    """Play random moves in a new ChessVar game.
+        Parameters: seed and moves
+        Returns: ChessVar"""
+    rng = random.Random(seed)
+    game = ChessVar()
+    for _ in range(moves):
+        board = FastBoard.from_game(game)
+        if board.get_state():
+            break
+        method, first, second = board.to_chess_var_move(board.random_move(rng))
+        getattr(game, method)(first, second)
+    return game
+
+
+def test_restored_games_match_and_are_built_lazily(tmp_path, capsys):
+    games = {f"game-{number}": _random_game(number, number * 7) for number in range(20)}
+    games[99] = CompactChessVar.from_game(_random_game(99, 15))
+    path = str(tmp_path / 'live.ckpt')
+    assert write_checkpoint(path, games)['games'] == len(games)
+    with RestoredGames(path) as restored:
+        assert len(restored) == len(games)
+        assert list(restored) == list(games)
+        assert restored.get_materialized_count() == 0
+        game = restored['game-5']
+        assert restored['game-5'] is game
+        assert restored.get_materialized_count() == 1
+        assert 'missing' not in restored and restored.get('missing') is None
+        built = restored.materialize_all()
+    for game_id, game in games.items():
+        expected = CompactChessVar.from_position(game.snapshot()) if isinstance(game, ChessVar) else game
+        assert CompactChessVar.from_position(built[game_id].snapshot()).to_bytes() == expected.to_bytes()
+        assert built[game_id].get_turn() == game.get_turn()
+
+
+def test_restored_games_keep_playing(tmp_path, capsys):
+    game = _random_game(3, 10)
+    path = str(tmp_path / 'live.ckpt')
+    write_checkpoint(path, {'g': game})
+    with RestoredGames(path) as restored, RestoredGames(path, compact=True) as compact:
+        board = FastBoard.from_game(game)
+        method, first, second = board.to_chess_var_move(board.random_move(random.Random(1)))
+        for copy in (restored['g'], compact['g']):
+            assert getattr(copy, method)(first, second)
+            assert copy.get_turn() != game.get_turn()
+        assert isinstance(compact['g'], CompactChessVar)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.ckpt'
+    path.write_bytes(b'NOTACKPT' + bytes(24))
+    with pytest.raises(ValueError):
+        RestoredGames(str(path))
@@ -0,0 +1,69 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for compact.py: CompactChessVar plays random games exactly like ChessVar and converts to and
+#              from its other forms without losing anything.
+
+import random
+
+import pytest
+
+from ChessVar import ChessVar
+from compact import CompactChessVar, RECORD_SIZE
+from movegen import FastBoard, SQUARE_NAMES
+from position import CODE_NAMES
+
+
+def _same_position(compact, game):
+    """Check that a CompactChessVar and a ChessVar hold the same position.
+        Parameters: compact and game
+        Returns: None"""
+    assert compact.get_turn() == game.get_turn()
+    assert compact.get_game_state() == game.get_game_state()
+    expected = game.snapshot()
+    position = compact.to_position()
+    assert position.get_board() == expected.get_board()
+    assert [compact.get_square(square) for square in SQUARE_NAMES] == [CODE_NAMES.get(code)
+                                                                       for code in expected.get_board()]
+    assert position.get_reserve() == expected.get_reserve()
+    assert position.get_pawn_flags() == expected.get_pawn_flags()
+    for turn in (0, 1):
+        assert sorted(position.get_lost(turn)) == sorted(expected.get_lost(turn))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_random_games_match_chess_var(seed, capsys):
+    rng = random.Random(seed)
+    game = ChessVar()
+    compact = CompactChessVar()
+    while game.get_game_state() == 'UNFINISHED':
+        board = FastBoard.from_game(game)
+        method, first, second = board.to_chess_var_move(board.random_move(rng))
+        assert getattr(compact, method)(first, second) == bool(getattr(game, method)(first, second))
+        _same_position(compact, game)
+    assert not compact.make_move('e2', 'e3')
+
+
+def test_rejects_what_chess_var_rejects(capsys):
+    game = ChessVar()
+    compact = CompactChessVar()
+    for method, first, second in [('make_move', 'e2', 'e5'), ('make_move', 'e7', 'e5'), ('make_move', 'a1', 'a1'),
+                                  ('enter_fairy_piece', 'F', 'd1'), ('enter_fairy_piece', 'f', 'd8')]:
+        assert getattr(compact, method)(first, second) == bool(getattr(game, method)(first, second))
+    _same_position(compact, game)
+
+
+def test_conversions_round_trip(capsys):
+    rng = random.Random(7)
+    game = ChessVar()
+    for _ in range(30):
+        board = FastBoard.from_game(game)
+        method, first, second = board.to_chess_var_move(board.random_move(rng))
+        getattr(game, method)(first, second)
+    compact = CompactChessVar.from_game(game)
+    data = compact.to_bytes()
+    assert len(data) == RECORD_SIZE
+    assert CompactChessVar.from_bytes(data).to_bytes() == data
+    assert CompactChessVar.from_position(compact.to_position()).to_bytes() == data
+    assert compact.to_fast_board().get_hash() == FastBoard.from_game(game).get_hash()
+    _same_position(compact, game)
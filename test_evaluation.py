@@ -0,0 +1,46 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for evaluation.py: the incremental evaluation always equals full_eval, through moves, fairy
+#              entries, captures, and unmakes.
+
+import random
+
+import pytest
+
+from evaluation import EvalBoard, PawnHashTable, full_eval
+from movegen import FastBoard
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_incremental_matches_full_eval(seed):
+    rng = random.Random(seed)
+    board = EvalBoard()
+    scores = []
+    while not board.get_state():
+        assert board.evaluate() == full_eval(board)
+        scores.append(board.evaluate())
+        board.make_move(board.random_move(rng))
+    while scores:
+        board.unmake_move()
+        assert board.evaluate() == scores.pop() == full_eval(board)
+
+
+def test_copies_and_boards_built_from_others_match_full_eval():
+    rng = random.Random(9)
+    board = FastBoard()
+    for _ in range(20):
+        board.make_move(board.random_move(rng))
+    table = PawnHashTable()
+    evaluating = EvalBoard.from_board(board, table)
+    assert evaluating.evaluate() == full_eval(board)
+    copy = evaluating.copy()
+    assert copy.get_pawn_table() is table
+    copy.make_move(copy.random_move(rng))
+    assert copy.evaluate() == full_eval(copy)
+    assert evaluating.evaluate() == full_eval(board)
+    assert table.get_stats()['hits'] > 0
+
+
+def test_the_starting_position_is_even():
+    assert full_eval(FastBoard()) == EvalBoard().evaluate() == 0
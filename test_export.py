@@ -0,0 +1,77 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for export.py: shards hold every planned position, and resuming an export keeps only the
+#              shards that still match the plan.
+
+import os
+
+import numpy as np
+import pytest
+
+import export
+from tournament import run_tournament
+
+
+def _archive(path, games, seed):
+    """Append random games to an archive.
+        Parameters: path, games, and seed
+        Returns: None"""
+    temporary = f"{path}.{seed}"
+    run_tournament('random', 'random', games, archive_path=temporary, seed=seed)
+    with open(path, 'ab') as archive, open(temporary, 'rb') as file:
+        archive.write(file.read())
+    os.remove(temporary)
+
+
+def _held(directory):
+    """Count the positions the shards listed in an export's manifest hold.
+        Parameters: directory
+        Returns: int"""
+    manifest = export._read_manifest(directory)
+    return sum(len(export.load_shard(directory, shard)[1]) for shard in range(manifest['shards']))
+
+
+def test_export_writes_every_planned_position(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    _archive(archive, 6, 1)
+    summary = export.export_archive(archive, str(tmp_path / 'out'), 200, processes=1)
+    shards = export.plan_shards(archive, 200)
+    assert summary['positions'] == sum(shard[3] for shard in shards) == _held(str(tmp_path / 'out'))
+    planes, moves, results = export.load_shard(str(tmp_path / 'out'), 0)
+    assert planes.shape[0] == moves.shape[0] == results.shape[0] == 200
+    assert np.all(moves != 0)
+
+
+def test_export_redoes_shards_whose_plan_changed(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    out = str(tmp_path / 'out')
+    _archive(archive, 10, 1)
+    first = export.export_archive(archive, out, 500, processes=1)
+    _archive(archive, 10, 2)
+    second = export.export_archive(archive, out, 500, processes=1)
+    manifest = export._read_manifest(out)
+    assert manifest['positions'] == _held(out)
+    assert second['positions'] + 500 * second['skipped'] == manifest['positions']
+    assert second['skipped'] == first['positions'] // 500
+    assert export.export_archive(archive, out, 500, processes=1)['shards'] == 0
+
+
+def test_export_resumes_after_a_lost_shard_and_a_new_shard_size(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    out = str(tmp_path / 'out')
+    _archive(archive, 6, 1)
+    export.export_archive(archive, out, 200, processes=1)
+    os.remove(export.shard_path(out, 1, 'planes'))
+    assert export.export_archive(archive, out, 200, processes=1)['shards'] == 1
+    summary = export.export_archive(archive, out, 300, processes=1)
+    assert summary['skipped'] == 0
+    assert _held(out) == summary['positions']
+
+
+def test_export_shard_raises_if_the_archive_ends_early(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    _archive(archive, 2, 1)
+    count = sum(shard[3] for shard in export.plan_shards(archive, 10 ** 6))
+    with pytest.raises(ValueError, match='archive ended'):
+        export._export_shard((archive, str(tmp_path), (0, 0, 0, count + 1)))
@@ -0,0 +1,15 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for fuzz.py: a short differential fuzz of every engine against ChessVar.
+
+import pytest
+
+import fuzz
+
+
+@pytest.mark.parametrize('engine', sorted(fuzz.ENGINES))
+def test_engines_match_chess_var(engine, capsys):
+    summary = fuzz.fuzz([engine], cases=5, length=60, processes=1, seed=7)
+    assert summary['calls'] > 0
+    assert summary['failures'] == []
@@ -0,0 +1,72 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for gamedb.py: position and fairy entry queries agree with replaying the archive, across
+#              segments, reopening, and compaction.
+
+from archive import read_games
+from export import move_label
+from gamedb import GameDatabase
+from movegen import FastBoard
+from tournament import run_tournament
+
+
+def _expected(records):
+    """Replay archived games and list where each position was reached and each fairy piece was entered.
+        Parameters: records (from read_games)
+        Returns: (dict of position hash -> list of (game id, ply), and dict of (letter, square) -> list of
+            (game id, ply))"""
+    positions = {}
+    drops = {}
+    for record in records:
+        board = FastBoard()
+        positions.setdefault(board.get_hash(), []).append((record['id'], 0))
+        for ply, name in enumerate(record['moves']):
+            if '@' in name:
+                letter, square = name.split('@')
+                drops.setdefault((letter, square), []).append((record['id'], ply))
+            board.make_move(move_label(name))
+            positions.setdefault(board.get_hash(), []).append((record['id'], ply + 1))
+    return positions, drops
+
+
+def _check(database, positions, drops):
+    """Check every query of a database against the replayed games.
+        Parameters: database, positions, and drops (from _expected)
+        Returns: None"""
+    for key, found in positions.items():
+        assert sorted(database.find_position(key)) == sorted(found)
+    for (letter, square), found in drops.items():
+        assert sorted(database.find_drops(letter, square)) == sorted(found)
+
+
+def test_queries_match_the_archive(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    run_tournament('random', 'random', 12, archive_path=archive, seed=3)
+    records = list(read_games(archive))
+    positions, drops = _expected(records)
+    assert drops
+
+    database = GameDatabase(str(tmp_path / 'db'), flush_entries=200)
+    assert database.ingest_archive(archive) == len(records)
+    assert database.get_stats()['segments'] > 1
+    assert database.get_stats()['entries'] == sum(len(found) for found in positions.values()) + sum(
+        len(found) for found in drops.values())
+    _check(database, positions, drops)
+    assert [ply for _, ply in database.find_position(FastBoard())] == [0] * len(records)
+
+    reopened = GameDatabase(str(tmp_path / 'db'))
+    _check(reopened, positions, drops)
+    reopened.compact()
+    assert reopened.get_stats()['segments'] == 1
+    _check(reopened, positions, drops)
+    _check(GameDatabase(str(tmp_path / 'db')), positions, drops)
+
+
+def test_unknown_positions_and_drops_are_not_found(tmp_path, capsys):
+    database = GameDatabase(str(tmp_path / 'db'))
+    database.add_game('only', ['e2e4'])
+    database.flush()
+    assert database.find_position(FastBoard()) == [('only', 0)]
+    assert database.find_position(12345) == []
+    assert database.find_drops('F', 'd1') == []
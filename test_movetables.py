@@ -0,0 +1,104 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for movetables.py: cache files round-trip, and stale, foreign, or damaged ones are rebuilt.
+
+import importlib.util
+
+import pytest
+
+import movegen
+import movetables
+
+
+def _write_cache(path, tables=None):
+    """Write a small cache file and return its bytes.
+        Parameters: path and tables
+        Returns: bytearray"""
+    movetables.write_tables(str(path), 3, tables or {'squares': movetables.array('Q', range(10))})
+    return bytearray(path.read_bytes())
+
+
+def test_table_cache_round_trips(tmp_path):
+    path = tmp_path / 'small-tables-v3.bin'
+    values, offsets = movetables.pack_ragged([(1, 2), (), (3,)])
+    _write_cache(path, {'values': values, 'offsets': offsets, 'keys': movetables.array('Q', [2 ** 64 - 1])})
+    tables = movetables.read_tables(str(path), 3)
+    assert movetables.unpack_ragged(tables['values'], tables['offsets']) == ((1, 2), (), (3,))
+    assert tables['keys'].tolist() == [2 ** 64 - 1]
+
+
+@pytest.mark.parametrize('damage', ['stale', 'format', 'magic', 'byte order', 'truncated', 'empty'])
+def test_table_cache_rejects_stale_and_foreign_files(tmp_path, damage):
+    path = tmp_path / 'small-tables-v3.bin'
+    data = _write_cache(path)
+    version = 3
+    if damage == 'stale':
+        version = 4
+    elif damage == 'format':
+        data[8:12] = (movetables.FORMAT_VERSION + 1).to_bytes(4, 'little')
+    elif damage == 'magic':
+        data[:8] = b'NOTABLES'
+    elif damage == 'byte order':
+        data[16] ^= 1
+    elif damage == 'truncated':
+        data = data[:len(data) - 8]
+    else:
+        data = b''
+    path.write_bytes(bytes(data))
+    assert movetables.read_tables(str(path), version) is None
+
+
+def test_load_tables_rebuilds_an_unusable_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(movetables.CACHE_DIR_VARIABLE, str(tmp_path))
+    path = movetables.cache_path('small', 3)
+    assert path.startswith(str(tmp_path))
+    with open(path, 'wb') as file:
+        file.write(b'CVTABLES' + bytes(40))
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'squares': movetables.array('H', [5, 6, 7])}
+
+    assert movetables.load_tables('small', 3, build)['squares'].tolist() == [5, 6, 7]
+    assert movetables.load_tables('small', 3, build)['squares'].tolist() == [5, 6, 7]
+    assert len(calls) == 1
+
+
+def test_loaded_move_tables_match_a_fresh_build():
+    built = movegen._build_tables()
+    loaded = movetables.load_tables('movegen', movegen.TABLES_VERSION, movegen._build_tables)
+    assert set(loaded) == set(built)
+    for name, table in built.items():
+        assert loaded[name].tolist() == table.tolist(), name
+
+
+def _import_builder(path, value):
+    """Write and import a module with a table builder.
+        Parameters: path and value (what the builder fills its table with)
+        Returns: the builder"""
+    path.write_text(f"from array import array\n\n\ndef build():\n    return {{'values': array('H', [{value}] * 4)}}\n")
+    spec = importlib.util.spec_from_file_location('small_tables', str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.build
+
+
+def test_editing_the_builder_makes_the_cache_stale(tmp_path, monkeypatch):
+    monkeypatch.setenv(movetables.CACHE_DIR_VARIABLE, str(tmp_path / 'cache'))
+    source = tmp_path / 'small_tables.py'
+    assert movetables.load_tables('small', 1, _import_builder(source, 1))['values'].tolist() == [1] * 4
+    assert movetables.read_tables(movetables.cache_path('small', 1), movetables.source_version(
+        1, _import_builder(source, 1))) is not None
+    assert movetables.load_tables('small', 1, _import_builder(source, 2))['values'].tolist() == [2] * 4
+
+
+def test_builders_without_readable_source_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv(movetables.CACHE_DIR_VARIABLE, str(tmp_path))
+    source = tmp_path / 'small_tables.py'
+    build = _import_builder(source, 3)
+    source.unlink()
+    assert movetables.source_version(1, build) is None
+    assert movetables.load_tables('small', 1, build)['values'].tolist() == [3] * 4
+    assert not (tmp_path / 'small-tables-v1.bin').exists()
@@ -0,0 +1,58 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for positionstore.py: positions round-trip through their packed records, and each distinct
+#              position is stored once however the store grows.
+
+import random
+
+import pytest
+
+from compact import CompactChessVar
+from movegen import FastBoard
+from positionstore import PositionStore, pack_position, unpack_record
+
+
+def _random_positions(count, seed):
+    """Collect the positions of random games, repeats included.
+        Parameters: count and seed
+        Returns: list of CompactChessVar"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = FastBoard()
+        while not board.get_state() and len(positions) < count:
+            positions.append(CompactChessVar.from_fast_board(board))
+            board.make_move(board.random_move(rng))
+    return positions
+
+
+def test_records_round_trip():
+    for position in _random_positions(300, 1):
+        board, flags = unpack_record(pack_position(position))
+        assert bytes(board) + flags.to_bytes(4, 'little') == position.to_bytes()
+
+
+def test_positions_are_stored_once():
+    positions = _random_positions(3000, 2)
+    store = PositionStore()
+    numbers = [store.add(position) for position in positions]
+    distinct = {position.to_bytes() for position in positions}
+    assert len(store) == len(distinct) == len(set(numbers))
+    assert store.get_stats()['duplicates'] == len(positions) - len(distinct)
+    for position, number in zip(positions, numbers):
+        assert store.find(position) == number
+        assert store.get_game(number).to_bytes() == position.to_bytes()
+        assert position in store
+
+
+def test_other_kinds_of_position_find_the_same_record(capsys):
+    store = PositionStore(expected=10)
+    board = FastBoard()
+    number = store.add(board)
+    assert store.find(CompactChessVar()) == number
+    assert store.add(CompactChessVar.from_fast_board(board)) == number
+    board.make_move(board.to_move('e2', 'e4'))
+    assert store.find(board) is None
+    with pytest.raises(IndexError):
+        store.get_record(1)
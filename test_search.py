@@ -0,0 +1,69 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for search.py: mate scores in the transposition table, and Lazy SMP searches whose workers
+#              die or fail.
+
+import os
+
+import pytest
+
+from movegen import FastBoard
+from search import INFINITY, MATE, Searcher, TranspositionTable, lazy_smp_search
+
+
+class ExitingBoard(FastBoard):
+    """An ExitingBoard object is a FastBoard whose search kills the process searching it, like a worker that
+        crashes or is killed by the system."""
+
+    def copy(self):
+        return self
+
+    def generate_moves(self):
+        os._exit(3)
+
+
+class FailingBoard(FastBoard):
+    """A FailingBoard object is a FastBoard whose search raises an exception."""
+
+    def copy(self):
+        return self
+
+    def generate_moves(self):
+        raise ValueError('generate_moves failed')
+
+
+def _play(board, moves):
+    """Make moves given as 'e2e3' strings on a FastBoard.
+        Parameters: board and moves
+        Returns: the board"""
+    for move in moves:
+        board.make_move(board.to_move(move[:2], move[2:]))
+    return board
+
+
+def _as(board_class):
+    """Return a starting FastBoard of a subclass.
+        Parameters: board_class
+        Returns: board_class object"""
+    board = board_class.__new__(board_class)
+    board.__dict__.update(FastBoard().__dict__)
+    return board
+
+
+def test_mate_scores_are_stored_relative_to_the_node():
+    # after 1. e3 f6 2. Qh5+ a6 white takes the king next move; the second search finds the position in the table,
+    # stored at ply 5, and must still score it by its own ply
+    board = _play(FastBoard(), ['e2e3', 'f7f6', 'd1h5', 'a7a6'])
+    searcher = Searcher(TranspositionTable(1 << 10))
+    assert searcher._negamax(board, 2, -INFINITY, INFINITY, 5) == MATE - 5
+    assert searcher._negamax(board, 2, -INFINITY, 100, 1) == MATE - 1
+
+
+def test_lazy_smp_search_survives_and_reports_dead_workers():
+    result = lazy_smp_search(FastBoard(), 2, workers=2)
+    assert result['move'] in FastBoard().generate_moves()
+    assert not result['errors']
+    for board_class in (ExitingBoard, FailingBoard):
+        with pytest.raises(RuntimeError):
+            lazy_smp_search(_as(board_class), 3, workers=2, time_limit=30)
@@ -0,0 +1,65 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for sharedgames.py: moves follow the rules, games played from several processes at once lose
+#              no commits, and a dead writer or worker is reported instead of waited on.
+
+import multiprocessing
+import os
+import random
+
+import pytest
+
+import sharedgames
+from compact import CompactChessVar
+from sharedgames import SharedGameTable, measure_throughput
+
+
+def test_no_commits_are_lost():
+    result = measure_throughput(2, seconds=0.5, games=16, hot_games=2)
+    assert result['commits'] > 0
+    assert result['lost'] == 0
+
+
+def test_moves_match_compact_chess_var():
+    table = SharedGameTable(4)
+    try:
+        number = table.create_game()
+        game = CompactChessVar()
+        rng = random.Random(5)
+        while game.get_game_state() == 'UNFINISHED':
+            board = game.to_fast_board()
+            method, first, second = board.to_chess_var_move(board.random_move(rng))
+            assert getattr(table, method)(number, first, second) == getattr(game, method)(first, second)
+            assert table.get_game(number).to_bytes() == game.to_bytes()
+        assert not table.make_move(number, 'e2', 'e3')
+        assert table.reset_game(number, finished_only=True)
+        assert table.get_game(number).to_bytes() == CompactChessVar().to_bytes()
+        with pytest.raises(IndexError):
+            table.read(1)
+    finally:
+        table.close(unlink=True)
+
+
+def test_a_writer_that_died_mid_commit_is_reported(monkeypatch):
+    monkeypatch.setattr(sharedgames, 'STUCK_SECONDS', 0.1)
+    table = SharedGameTable(4)
+    try:
+        number = table.create_game()
+        sequence, _ = table.read(number)
+        table._words[(sharedgames.HEADER_SIZE + number * sharedgames.SLOT_SIZE) >> 3] = sequence + 1
+        with pytest.raises(RuntimeError, match='mid-write'):
+            table.read(number)
+        other = table.create_game()
+        table._locks[other % sharedgames.LOCK_STRIPES].acquire()
+        with pytest.raises(RuntimeError, match='lock'):
+            table.make_move(other, 'e2', 'e4')
+    finally:
+        table.close(unlink=True)
+
+
+def test_a_worker_that_exits_without_its_counts_is_reported():
+    process = multiprocessing.Process(target=os._exit, args=(3,))
+    process.start()
+    with pytest.raises(RuntimeError, match='code 3'):
+        sharedgames._collect_counts([process], multiprocessing.Queue())
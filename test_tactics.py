@@ -0,0 +1,61 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for tactics.py: king captures are found, and mining counts each position once however the
+#              archive is split into chunks.
+
+import pytest
+
+from archive import read_games
+from export import move_label
+from movegen import FastBoard
+from tactics import TacticSearch, _mine_chunk, king_capture, mine_archive, read_puzzles
+from tournament import run_tournament
+
+
+def _play(board, moves):
+    """Make moves given as 'e2e3' strings on a FastBoard.
+        Parameters: board and moves
+        Returns: the board"""
+    for move in moves:
+        board.make_move(board.to_move(move[:2], move[2:]))
+    return board
+
+
+def test_king_capture_and_forced_wins():
+    board = _play(FastBoard(), ['e2e3', 'f7f6', 'd1h5'])
+    assert king_capture(board) is None
+    board.make_move(board.to_move('a7', 'a6'))
+    assert king_capture(board) == board.to_move('h5', 'e8')
+    assert TacticSearch().shortest_win(board, 3) == 1
+    assert TacticSearch().shortest_win(board, 3, min_plies=3) is None
+    assert TacticSearch().shortest_win(FastBoard(), 3) is None
+
+
+def test_positions_are_counted_once_across_chunks(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    run_tournament('greedy', 'random', 12, archive_path=archive, seed=1)
+    distinct = set()
+    for record in read_games(archive):
+        board = FastBoard()
+        for name in record['moves'] + [None]:
+            if not board.get_state():
+                distinct.add(board.get_hash())
+            if name is not None:
+                board.make_move(move_label(name))
+    summaries = []
+    puzzles = []
+    for chunk_games in (2, 50):
+        path = str(tmp_path / f"puzzles-{chunk_games}.jsonl")
+        summaries.append(mine_archive(archive, path, processes=1, chunk_games=chunk_games))
+        puzzles.append(list(read_puzzles(path)))
+    assert summaries[0]['positions'] == summaries[1]['positions'] == len(distinct)
+    assert summaries[0]['searches'] > summaries[1]['searches'] == len(distinct)
+    assert puzzles[0] == puzzles[1]
+
+
+def test_mine_chunk_raises_if_the_archive_ends_early(tmp_path, capsys):
+    archive = str(tmp_path / 'games.jsonl')
+    run_tournament('random', 'random', 2, archive_path=archive, seed=1)
+    with pytest.raises(ValueError, match='archive ended'):
+        _mine_chunk((archive, (0, 3), 1, 1))
@@ -0,0 +1,22 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for threadsafe.py: reading squares from the published snapshot.
+
+import pytest
+
+from threadsafe import ThreadSafeChessVar
+
+
+@pytest.mark.parametrize('square', ['z9', 'a0', 'a9', 'i1', 'e', '', 'E2'])
+def test_get_square_rejects_squares_off_the_board(square):
+    with pytest.raises(KeyError):
+        ThreadSafeChessVar().get_square(square)
+
+
+def test_get_square_reads_pieces():
+    game = ThreadSafeChessVar()
+    assert game.get_square('e1') == 'wK'
+    assert game.make_move('e2', 'e4')
+    assert game.get_square('e4') == 'wp'
+    assert game.get_square('e2') is None
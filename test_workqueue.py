@@ -0,0 +1,34 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: Tests for workqueue.py: unit keys, and local runs that lose their workers.
+
+import pytest
+
+import workqueue
+from movegen import FastBoard
+
+
+def test_units_of_the_same_position_do_not_collide():
+    coordinator = workqueue.Coordinator()
+    processes = workqueue.start_local_workers(coordinator.get_address(), 1)
+    try:
+        board = FastBoard()
+        keys = [coordinator.submit('perft', board, 2), coordinator.submit('perft', board, 3),
+                coordinator.submit('search', board, 1)]
+        assert len(set(keys)) == 3
+        assert coordinator.submit('perft', board.copy(), 2) == keys[0]
+        results = coordinator.wait(keys, 60)
+    finally:
+        coordinator.close()
+        for process in processes:
+            process.join(5)
+    assert results[keys[0]] == 400
+    assert results[keys[1]] == 8902
+    assert isinstance(results[keys[2]], list)
+
+
+def test_distributed_perft_matches_and_gives_up_when_every_worker_dies():
+    assert workqueue.distributed_perft(FastBoard(), 3, workers=2)['nodes'] == 8902
+    with pytest.raises(RuntimeError, match='every worker died'):
+        workqueue.distributed_perft(FastBoard(), 3, workers=1, crash_after=0)
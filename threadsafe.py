@@ -0,0 +1,99 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A thread-safe wrapper for ChessVar. make_move changes the board, the turn, the lost piece lists, and
+#              the game state in separate steps, so a thread reading a shared game in the middle of a move could see
+#              a torn state. The wrapper validates and commits each move under a per-game lock, then publishes an
+#              immutable Position snapshot. Readers only ever look at the latest snapshot, so they never take the
+#              lock, which also lets them scale on free-threaded CPython builds.
+
+import threading
+
+from ChessVar import ChessVar
+from position import CODE_NAMES
+from movegen import SQUARE_INDEX
+
+
+class ThreadSafeChessVar:
+    """A ThreadSafeChessVar object shares one ChessVar game between threads. It is responsible for letting only one
+        writer change the game at a time, and for publishing a new snapshot after every accepted move so readers
+        always see a whole move or none of it. It is not a drop-in replacement for ChessVar: get_square reports a
+        piece as its color and type ('wq', 'bK', ...) rather than returning a ChessPiece."""
+
+    def __init__(self, game=None):
+        """Initialize a wrapper around a game (a new game by default).
+            Parameters: game (ChessVar)
+            Returns: None"""
+        self._game = game if game is not None else ChessVar()
+        self._lock = threading.Lock()
+        self._snapshot = self._game.snapshot()
+        self._moves = 0
+
+    def make_move(self, moved_from, move_to):
+        """Validate and make a move atomically, like ChessVar.make_move.
+            Parameters: moved_from and move_to
+            Returns: True or False"""
+        with self._lock:
+            if not self._game.make_move(moved_from, move_to):
+                return False
+            self._publish()
+            return True
+
+    def enter_fairy_piece(self, piece_type, move_to):
+        """Validate and enter a fairy piece atomically, like ChessVar.enter_fairy_piece.
+            Parameters: piece_type and move_to
+            Returns: True or False"""
+        with self._lock:
+            if not self._game.enter_fairy_piece(piece_type, move_to):
+                return False
+            self._publish()
+            return True
+
+    def _publish(self):
+        """Replace the published snapshot. Called with the lock held; swapping one attribute is atomic, so a reader
+            gets either the old snapshot or the new one.
+            Parameters: None
+            Returns: None"""
+        self._moves += 1
+        self._snapshot = self._game.snapshot()
+
+    def reset(self, game=None):
+        """Replace the game (a new game by default), for example when a finished game is restarted.
+            Parameters: game (ChessVar)
+            Returns: None"""
+        with self._lock:
+            self._game = game if game is not None else ChessVar()
+            self._publish()
+
+    def snapshot(self):
+        """Return the latest snapshot without locking.
+            Parameters: None
+            Returns: Position"""
+        return self._snapshot
+
+    def get_game_state(self):
+        """Return the game state from the latest snapshot without locking.
+            Parameters: None
+            Returns: 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'"""
+        return self._snapshot.get_game_state()
+
+    def get_turn(self):
+        """Return whose turn it is from the latest snapshot without locking.
+            Parameters: None
+            Returns: 'WHITE' or 'BLACK'"""
+        return 'BLACK' if self._snapshot.get_turn() else 'WHITE'
+
+    def get_square(self, square):
+        """Return the piece on a spot from the latest snapshot without locking, as its color and type ('wq', 'bK',
+            ...), or None if the spot is empty. Like ChessVar.get_square, a square that is not on the board raises
+            KeyError.
+            Parameters: square
+            Returns: str or None"""
+        code = self._snapshot.get_board()[SQUARE_INDEX[square]]
+        return CODE_NAMES[code] if code else None
+
+    def get_move_count(self):
+        """Return how many snapshots have been published (accepted moves and resets).
+            Parameters: None
+            Returns: int"""
+        return self._moves
@@ -0,0 +1,177 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A self-play tournament runner for ChessVar. Two move-selection policies play a number of games across
+#              a process pool, switching colors every game. Every game is played through ChessVar.make_move and
+#              ChessVar.enter_fairy_piece, its get_game_state() result and length are streamed to a game archive as
+#              soon as it finishes, and the runner reports an Elo difference with a confidence interval and the
+#              throughput in games per hour per core.
+
+import contextlib
+import io
+import math
+import multiprocessing
+import random
+import time
+
+from ChessVar import ChessVar
+from archive import GameArchiveWriter
+from movegen import FastBoard, TYPE_MASK, KING, DROP_SHIFT, move_name
+from search import Searcher, TranspositionTable, PIECE_VALUES, MATE
+
+# games that reach this many plies without a king capture are scored as draws
+DEFAULT_MAX_PLIES = 300
+
+
+def random_policy(board, rng):
+    """Pick a random legal move.
+        Parameters: board (FastBoard) and rng (random.Random)
+        Returns: move int"""
+    return rng.choice(board.generate_moves())
+
+
+def greedy_policy(board, rng):
+    """Pick the capture of the most valuable piece (a king first), or a random move when nothing can be captured.
+        Parameters: board (FastBoard) and rng (random.Random)
+        Returns: move int"""
+    squares = board.get_squares()
+    moves = board.generate_moves()
+    best_value, best_moves = 0, []
+    for move in moves:
+        if move >> DROP_SHIFT:
+            continue
+        victim = squares[(move >> 6) & 63] & TYPE_MASK
+        if victim:
+            value = MATE if victim == KING else PIECE_VALUES[victim]
+            if value > best_value:
+                best_value, best_moves = value, [move]
+            elif value == best_value:
+                best_moves.append(move)
+    return rng.choice(best_moves or moves)
+
+
+def make_search_policy(depth):
+    """Make a policy that plays the best move of an alpha-beta search to a fixed depth.
+        Parameters: depth
+        Returns: policy function"""
+    table = TranspositionTable(1 << 16)
+
+    def search_policy(board, rng):
+        """Pick the move chosen by the search, or a random move if the search finds none."""
+        move = Searcher(table).search(board.copy(), depth)[1]
+        return move if move is not None else rng.choice(board.generate_moves())
+
+    return search_policy
+
+
+def make_policy(spec):
+    """Build a policy from its name: 'random', 'greedy', or 'search:<depth>'. Policies are passed to worker
+        processes by name, so they never need to be pickled.
+        Parameters: spec
+        Returns: policy function"""
+    if spec == 'random':
+        return random_policy
+    if spec == 'greedy':
+        return greedy_policy
+    if spec.startswith('search:'):
+        return make_search_policy(int(spec.split(':', 1)[1]))
+    raise ValueError(f"unknown policy {spec!r}")
+
+
+def play_game(game_id, white_spec, black_spec, seed, max_plies=DEFAULT_MAX_PLIES):
+    """Play one game between two policies through ChessVar.
+        Parameters: game_id, white_spec, black_spec, seed, and max_plies
+        Returns: dict with id, white, black, result, plies, and moves"""
+    rng = random.Random(seed)
+    policies = (make_policy(white_spec), make_policy(black_spec))
+    game = ChessVar()
+    board = FastBoard()
+    moves = []
+    with contextlib.redirect_stdout(io.StringIO()):  # ChessVar prints when a player's last fairy piece enters
+        while game.get_game_state() == 'UNFINISHED' and len(moves) < max_plies:
+            move = policies[board.get_turn()](board, rng)
+            method, first, second = board.to_chess_var_move(move)
+            if not getattr(game, method)(first, second):
+                raise RuntimeError(f"ChessVar rejected {move_name(move)} in game {game_id}")
+            board.make_move(move)
+            moves.append(move_name(move))
+    return {'id': game_id, 'white': white_spec, 'black': black_spec, 'result': game.get_game_state(),
+            'plies': len(moves), 'moves': moves}
+
+
+def _play_game_task(task):
+    """Unpack a pool task and play its game.
+        Parameters: task (tuple of play_game arguments)
+        Returns: dict"""
+    return play_game(*task)
+
+
+def elo_difference(wins, draws, losses, z=1.96):
+    """Estimate the Elo difference from a score, with a normal-approximation confidence interval.
+        Parameters: wins, draws, losses, and z (1.96 for 95%)
+        Returns: (elo, low, high), using +/- infinity when a side scored every point"""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, -math.inf, math.inf
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = z * math.sqrt(variance / games)
+
+    def to_elo(value):
+        """Convert an expected score to an Elo difference."""
+        if value <= 0:
+            return -math.inf
+        if value >= 1:
+            return math.inf
+        return -400 * math.log10(1 / value - 1)
+
+    return to_elo(score), to_elo(score - margin), to_elo(score + margin)
+
+
+def run_tournament(policy_a, policy_b, games, archive_path=None, processes=None, max_plies=DEFAULT_MAX_PLIES,
+                   seed=0):
+    """Play games between two policies across a process pool. Policy A plays white in even games and black in odd
+        games. Each finished game is written to the archive right away.
+        Parameters: policy_a, policy_b (policy names), games, archive_path, processes (defaults to the CPU count),
+            max_plies, and seed
+        Returns: dict with the score for policy A, the Elo estimate, and throughput"""
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    tasks = [(index, policy_a if index % 2 == 0 else policy_b, policy_b if index % 2 == 0 else policy_a,
+              seed * 1000003 + index, max_plies) for index in range(games)]
+    wins = draws = losses = total_plies = 0
+    writer = GameArchiveWriter(archive_path) if archive_path else None
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(_play_game_task, tasks):
+                if writer is not None:
+                    writer.write_game(result['id'], result['white'], result['black'], result['result'],
+                                      result['moves'], plies=result['plies'])
+                total_plies += result['plies']
+                a_color = 'WHITE' if result['id'] % 2 == 0 else 'BLACK'
+                if result['result'] == 'UNFINISHED':
+                    draws += 1
+                elif result['result'] == a_color + '_WON':
+                    wins += 1
+                else:
+                    losses += 1
+    finally:
+        if writer is not None:
+            writer.close()
+    seconds = time.perf_counter() - start
+    elo, low, high = elo_difference(wins, draws, losses)
+    return {'policy_a': policy_a, 'policy_b': policy_b, 'games': games, 'wins': wins, 'draws': draws,
+            'losses': losses, 'elo': elo, 'elo_low': low, 'elo_high': high,
+            'average_plies': total_plies / games if games else 0.0, 'seconds': seconds,
+            'games_per_hour_per_core': games * 3600 / seconds / processes if seconds else 0.0}
+
+
+def format_summary(summary):
+    """Return a one-paragraph report of a tournament summary.
+        Parameters: summary (from run_tournament)
+        Returns: str"""
+    return (f"{summary['policy_a']} vs {summary['policy_b']}: +{summary['wins']} ={summary['draws']} "
+            f"-{summary['losses']} in {summary['games']} games, Elo {summary['elo']:+.0f} "
+            f"[{summary['elo_low']:+.0f}, {summary['elo_high']:+.0f}], average length "
+            f"{summary['average_plies']:.1f} plies, {summary['games_per_hour_per_core']:.0f} games/hour/core")
@@ -0,0 +1,428 @@
+# Author: Kaia Reichard
+# GitHub username: kaiathekiwi
+# Date: 10/19/26
+# Description: A coordinator and workers for spreading perft and analysis of ChessVar positions over several
+#              processes or machines. The coordinator splits a search tree (or takes a batch of positions) into work
+#              units keyed by kind, depth, and position hash, so transpositions are only worked on once, and hands
+#              them to workers that connect over TCP. Messages are length-prefixed JSON. Every unit handed out has a
+#              lease; a unit whose worker disconnects or whose lease runs out goes back on the queue, up to a number
+#              of attempts, and results are merged as they come back. Run python workqueue.py worker HOST PORT to
+#              join a coordinator from another machine; start_local_workers starts worker processes on this one.
+
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from movegen import FastBoard, perft
+from search import Searcher, TranspositionTable
+
+LENGTH = struct.Struct('>I')
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+POLL_SECONDS = 0.05
+LIVENESS_SECONDS = 0.5  # how often local runs check that a worker process is still alive
+
+
+def send_message(connection, message):
+    """Send one message as a 4-byte length followed by JSON.
+        Parameters: connection (socket) and message (dict)
+        Returns: None"""
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    connection.sendall(LENGTH.pack(len(data)) + data)
+
+
+def receive_message(connection):
+    """Receive one message sent by send_message.
+        Parameters: connection (socket)
+        Returns: dict, or None if the other side closed the connection"""
+    header = _receive_exactly(connection, LENGTH.size)
+    if header is None:
+        return None
+    data = _receive_exactly(connection, LENGTH.unpack(header)[0])
+    return None if data is None else json.loads(data)
+
+
+def _receive_exactly(connection, size):
+    """Read exactly size bytes from a socket.
+        Parameters: connection and size
+        Returns: bytes, or None if the connection closed first"""
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def run_unit(kind, board, depth):
+    """Do one unit of work.
+        Parameters: kind ('perft' or 'search'), board (FastBoard), and depth
+        Returns: node count for perft, or [score, move, completed depth, nodes] for search"""
+    if kind == 'perft':
+        return perft(board, depth)
+    searcher = Searcher(TranspositionTable(1 << 16))
+    score, move, completed = searcher.search(board, depth)
+    return [score, move, completed, searcher.get_nodes()]
+
+
+class Coordinator:
+    """A Coordinator object owns a queue of work units and the TCP server workers connect to. It is responsible
+        for handing units out under leases, taking them back from workers that disconnect or run out of time,
+        retrying them a limited number of times, and collecting their results by unit key."""
+
+    def __init__(self, host='127.0.0.1', port=0, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Start listening for workers. Port 0 picks a free port (see get_address).
+            Parameters: host, port, lease_seconds, and max_attempts (per unit, counting the first)
+            Returns: None"""
+        self._server = socket.create_server((host, port))
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._lock = threading.Condition()
+        self._units = {}  # unit key -> (kind, board bytes hex, depth)
+        self._queue = []  # unit keys waiting for a worker
+        self._leases = {}  # unit key -> (worker number, lease deadline)
+        self._attempts = {}  # unit key -> times handed out
+        self._results = {}  # unit key -> result
+        self._failed = set()
+        self._closing = False
+        self._stats = {'workers': 0, 'lost_workers': 0, 'expired_leases': 0, 'retries': 0, 'duplicate_results': 0,
+                       'units_by_worker': {}}
+        self._threads = [threading.Thread(target=self._accept_loop, daemon=True),
+                         threading.Thread(target=self._lease_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def get_address(self):
+        """Return the address workers should connect to.
+            Parameters: None
+            Returns: (host, port)"""
+        return self._server.getsockname()[:2]
+
+    def submit(self, kind, board, depth):
+        """Queue a unit of work, unless a unit for the same position, kind, and depth is already queued or done.
+            Parameters: kind ('perft' or 'search'), board (FastBoard), and depth
+            Returns: the unit's key (kind, depth, and position hash)"""
+        key = f"{kind}:{depth}:{board.get_hash():016x}"
+        with self._lock:
+            if key not in self._units:
+                self._units[key] = (kind, board.to_bytes().hex(), depth)
+                self._queue.append(key)
+                self._attempts[key] = 0
+                self._lock.notify_all()
+        return key
+
+    def wait(self, keys, timeout=None):
+        """Wait until every unit in keys has a result or has failed every attempt.
+            Parameters: keys and timeout (seconds, or None to wait as long as it takes)
+            Returns: dict of key -> result for the units that finished"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            while not all(key in self._results or key in self._failed for key in keys):
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return {key: self._results[key] for key in keys if key in self._results}
+
+    def fail_pending(self):
+        """Give up on every unit that has no result yet, for when no worker is left to do them.
+            Parameters: None
+            Returns: None"""
+        with self._lock:
+            for key in self._units:
+                if key not in self._results:
+                    self._failed.add(key)
+            self._queue.clear()
+            self._leases.clear()
+            self._lock.notify_all()
+
+    def get_failed(self):
+        """Return the keys of units that were given up on after max_attempts.
+            Parameters: None
+            Returns: set"""
+        with self._lock:
+            return set(self._failed)
+
+    def get_stats(self):
+        """Return counters for the work done so far.
+            Parameters: None
+            Returns: dict with units, completed, failed, queued, leased, workers, lost_workers, expired_leases,
+                retries, duplicate_results, and units_by_worker"""
+        with self._lock:
+            stats = dict(self._stats, units_by_worker=dict(self._stats['units_by_worker']))
+            stats.update(units=len(self._units), completed=len(self._results), failed=len(self._failed),
+                         queued=len(self._queue), leased=len(self._leases))
+            return stats
+
+    def close(self):
+        """Tell connected workers to stop and stop listening.
+            Parameters: None
+            Returns: None"""
+        with self._lock:
+            self._closing = True
+            self._lock.notify_all()
+        self._server.close()
+
+    def _accept_loop(self):
+        """Accept worker connections, one thread per worker.
+            Parameters: None
+            Returns: None"""
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                worker = self._stats['workers']
+                self._stats['workers'] += 1
+            threading.Thread(target=self._serve_worker, args=(connection, worker), daemon=True).start()
+
+    def _lease_loop(self):
+        """Put units whose lease has run out back on the queue.
+            Parameters: None
+            Returns: None"""
+        while True:
+            with self._lock:
+                if self._closing:
+                    return
+                now = time.monotonic()
+                for key, (worker, deadline) in list(self._leases.items()):
+                    if deadline < now:
+                        self._stats['expired_leases'] += 1
+                        self._release(key)
+                self._lock.wait(min(self._lease_seconds / 4, 1.0))
+
+    def _release(self, key):
+        """Take a unit back from its worker and queue it again, or give up on it. Called with the lock held.
+            Parameters: key
+            Returns: None"""
+        del self._leases[key]
+        if key in self._results:
+            return
+        if self._attempts[key] >= self._max_attempts:
+            self._failed.add(key)
+        else:
+            self._stats['retries'] += 1
+            self._queue.append(key)
+        self._lock.notify_all()
+
+    def _next_unit(self, worker):
+        """Wait for a unit to hand to a worker and lease it.
+            Parameters: worker (number)
+            Returns: message for the worker (a unit, or stop once the coordinator closes)"""
+        with self._lock:
+            while not self._queue and not self._closing:
+                self._lock.wait()
+            if self._closing:
+                return {'type': 'stop'}
+            key = self._queue.pop(0)
+            self._attempts[key] += 1
+            self._leases[key] = (worker, time.monotonic() + self._lease_seconds)
+            kind, board, depth = self._units[key]
+            return {'type': 'unit', 'key': key, 'kind': kind, 'board': board, 'depth': depth}
+
+    def _serve_worker(self, connection, worker):
+        """Talk to one worker: hand it a unit, wait for the result, repeat. If the worker disconnects, its unit is
+            queued again.
+            Parameters: connection (socket) and worker (number)
+            Returns: None"""
+        key = None
+        try:
+            with connection:
+                if receive_message(connection) is None:
+                    return
+                while True:
+                    message = self._next_unit(worker)
+                    key = message.get('key')
+                    send_message(connection, message)
+                    if message['type'] == 'stop':
+                        key = None
+                        return
+                    reply = receive_message(connection)
+                    if reply is None:
+                        return
+                    self._finish(worker, reply['key'], reply['result'])
+                    key = None
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                if key is not None:
+                    self._stats['lost_workers'] += 1
+                    if self._leases.get(key, (None,))[0] == worker:
+                        self._release(key)
+
+    def _finish(self, worker, key, result):
+        """Record a unit's result. A result for a unit that already has one (after a lease ran out and the unit was
+            retried) is counted and dropped.
+            Parameters: worker (number), key, and result
+            Returns: None"""
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == worker:
+                del self._leases[key]
+            if key in self._results:
+                self._stats['duplicate_results'] += 1
+                return
+            self._results[key] = result
+            self._failed.discard(key)
+            if key in self._queue:
+                self._queue.remove(key)
+            by_worker = self._stats['units_by_worker']
+            by_worker[worker] = by_worker.get(worker, 0) + 1
+            self._lock.notify_all()
+
+
+def run_worker(address, crash_after=None):
+    """Connect to a coordinator and do units until it says stop. crash_after makes the worker exit without
+        answering once it has received that many units, to test how the coordinator copes with losing a worker.
+        Parameters: address ((host, port)) and crash_after
+        Returns: number of units done"""
+    done = 0
+    with socket.create_connection(tuple(address)) as connection:
+        send_message(connection, {'type': 'hello', 'pid': os.getpid()})
+        while True:
+            message = receive_message(connection)
+            if message is None or message['type'] == 'stop':
+                return done
+            if crash_after is not None and done >= crash_after:
+                os._exit(1)
+            result = run_unit(message['kind'], FastBoard.from_bytes(bytes.fromhex(message['board'])),
+                              message['depth'])
+            send_message(connection, {'type': 'result', 'key': message['key'], 'result': result})
+            done += 1
+
+
+def start_local_workers(address, count, crash_after=None):
+    """Start worker processes on this machine, standing in for a cluster.
+        Parameters: address, count, and crash_after (for the first worker only)
+        Returns: list of multiprocessing.Process"""
+    processes = []
+    for number in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(address, crash_after if number == 0 else None),
+                                          daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def split_tree(board, split_depth):
+    """Walk a position's tree to split_depth and collect the positions there, counting how many move sequences
+        reach each one (different sequences reaching the same position are one unit).
+        Parameters: board (FastBoard) and split_depth
+        Returns: dict of position hash -> [FastBoard, number of sequences]"""
+    found = {}
+
+    def walk(depth):
+        if depth == 0:
+            entry = found.get(board.get_hash())
+            if entry is None:
+                found[board.get_hash()] = [board.copy(), 1]
+            else:
+                entry[1] += 1
+            return
+        for move in board.generate_moves():
+            board.make_move(move)
+            walk(depth - 1)
+            board.unmake_move()
+
+    walk(split_depth)
+    return found
+
+
+def _wait_for_local_workers(coordinator, processes, keys):
+    """Wait for units done by local worker processes. If every worker process has died, the units still waiting
+        are failed instead of waiting for a worker that will never come.
+        Parameters: coordinator, processes, and keys
+        Returns: dict of key -> result for the units that finished"""
+    while True:
+        results = coordinator.wait(keys, LIVENESS_SECONDS)
+        failed = coordinator.get_failed()
+        if all(key in results or key in failed for key in keys):
+            return results
+        if not any(process.is_alive() for process in processes):
+            coordinator.fail_pending()
+            return coordinator.wait(keys, 0)
+
+
+def _finish_run(coordinator, processes, start):
+    """Stop the workers of a local run and return its timing and counters.
+        Parameters: coordinator, processes, and start (perf_counter at the start of the run)
+        Returns: dict with seconds and the coordinator's stats"""
+    seconds = time.perf_counter() - start
+    coordinator.close()
+    for process in processes:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+    return dict(coordinator.get_stats(), seconds=seconds)
+
+
+def distributed_perft(board, depth, workers=None, split_depth=2, lease_seconds=DEFAULT_LEASE_SECONDS,
+                      crash_after=None):
+    """Count perft(depth) of a position with local worker processes. The tree is split split_depth plies down and
+        each distinct position there is one unit.
+        Parameters: board (FastBoard or ChessVar), depth, workers (default: one per CPU), split_depth,
+            lease_seconds, and crash_after (make the first worker crash, for testing)
+        Returns: dict with nodes, units, sequences, seconds, nps, and the coordinator's stats"""
+    if not isinstance(board, FastBoard):
+        board = FastBoard.from_game(board)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    split_depth = min(split_depth, depth)
+    start = time.perf_counter()
+    coordinator = Coordinator(lease_seconds=lease_seconds)
+    processes = start_local_workers(coordinator.get_address(), workers, crash_after)
+    leaves = split_tree(board, split_depth)
+    keys = {coordinator.submit('perft', position, depth - split_depth): count
+            for position, count in leaves.values()}
+    results = _wait_for_local_workers(coordinator, processes, list(keys))
+    summary = _finish_run(coordinator, processes, start)
+    if len(results) < len(keys):
+        raise RuntimeError(f"{len(keys) - len(results)} perft units failed (every attempt failed or every worker died)")
+    nodes = sum(results[key] * count for key, count in keys.items())
+    return dict(summary, nodes=nodes, sequences=sum(keys.values()),
+                nps=nodes / summary['seconds'] if summary['seconds'] else 0.0)
+
+
+def distributed_analysis(boards, depth, workers=None, lease_seconds=DEFAULT_LEASE_SECONDS, crash_after=None):
+    """Search a batch of positions to a depth with local worker processes, one unit per distinct position.
+        Parameters: boards (FastBoards or ChessVars), depth, workers (default: one per CPU), lease_seconds, and
+            crash_after (make the first worker crash, for testing)
+        Returns: dict with analysis (list of (score, move, completed depth) per board, or None where a unit
+            failed), nodes, seconds, and the coordinator's stats"""
+    boards = [board if isinstance(board, FastBoard) else FastBoard.from_game(board) for board in boards]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    start = time.perf_counter()
+    coordinator = Coordinator(lease_seconds=lease_seconds)
+    processes = start_local_workers(coordinator.get_address(), workers, crash_after)
+    keys = [coordinator.submit('search', board, depth) for board in boards]
+    results = _wait_for_local_workers(coordinator, processes, keys)
+    summary = _finish_run(coordinator, processes, start)
+    analysis = [tuple(results[key][:3]) if key in results else None for key in keys]
+    return dict(summary, analysis=analysis, nodes=sum(result[3] for result in results.values()))
+
+
+def main(args):
+    """Run from the command line: python workqueue.py worker HOST PORT, or python workqueue.py perft DEPTH [WORKERS]
+        Parameters: args (command line arguments without the program name)
+        Returns: None"""
+    if len(args) == 3 and args[0] == 'worker':
+        print(f"{run_worker((args[1], int(args[2])))} units done")
+    elif len(args) in (2, 3) and args[0] == 'perft':
+        result = distributed_perft(FastBoard(), int(args[1]), int(args[2]) if len(args) == 3 else None)
+        print(f"perft {args[1]} = {result['nodes']:,} in {result['seconds']:.2f} s ({result['nps']:,.0f} nodes/s, "
+              f"{result['units']} units for {result['sequences']} sequences, {result['retries']} retries)")
+    else:
+        print("usage: python workqueue.py worker HOST PORT | python workqueue.py perft DEPTH [WORKERS]")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])